@@ -0,0 +1,156 @@
+"""End-to-end benchmark of login, import and extraction against mock_scival.py
+
+    python benchmark.py --researchers 20 --import-ids 10 --latency 0.2 --concurrency 2 --fast
+    python benchmark.py --compare-fast-mode 5 --import-ids 0 --not-found-ids 0 --researchers 0
+
+Reports researchers/hour for the extraction phase and per-step latency (p50/p95/max)
+from the run telemetry; --compare-fast-mode also measures the researchers page with and
+without resource blocking. Everything is written to a scratch working directory.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from mock_scival import MockSciValState, start_mock_server, mock_urls
+
+BENCHMARK_IMPORT_FIRST_ID = 58000000000
+
+def benchmark_import_ids(count, not_found=0):
+    """IDs to push through the import wizard - not_found of them start with 9 and are rejected by the mock"""
+    ids = [str(BENCHMARK_IMPORT_FIRST_ID + n) for n in range(count)]
+    ids += [str(90000000000 + n) for n in range(not_found)]
+    return ids
+
+async def run_benchmark(args):
+    """Start the mock server, run the automation against it and return the benchmark result"""
+    state = MockSciValState(args.researchers, args.latency, args.jitter, args.ui_delay, seed=args.seed)
+    server, base_url = start_mock_server(state)
+    print(f"🧪 Mock SciVal at {base_url} (latency {args.latency}s + up to {args.jitter}s jitter)")
+
+    # Point the automation at the mock before config is imported; never send real credentials there
+    os.environ.update(mock_urls(base_url))
+    for name in ('ELSEVIER_USERNAME', 'ELSEVIER_PASSWORD', 'ELSEVIER_EMAIL', 'ELSEVIER_SECOND_PASSWORD'):
+        os.environ[name] = 'benchmark@example.com' if name == 'ELSEVIER_EMAIL' else 'benchmark'
+
+    # Relative paths in config (downloads, profile, telemetry, manifest) all land in the scratch directory
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix='scival-benchmark-')).resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+    os.chdir(workdir)
+    print(f"📁 Working directory: {workdir}")
+
+    from config import DOWNLOAD_DIR, RESEARCHERS_URL
+    from browser_utils import create_browser, safe_browser_cleanup, compare_fast_mode
+    from login import ensure_logged_in
+    from import_researchers import import_researchers_batch
+    from extract_researchers import extract_all_researchers_info, extract_researchers_parallel
+    from collaborator_parser import iter_collaborator_files
+    from telemetry import start_run, end_run, emit, span
+
+    result = {
+        'researchers_preloaded': args.researchers,
+        'import_ids': args.import_ids,
+        'latency_s': args.latency,
+        'jitter_s': args.jitter,
+        'ui_delay_s': args.ui_delay,
+        'concurrency': args.concurrency,
+        'fast_mode': args.fast,
+    }
+    telemetry_path = start_run(run_id=f"benchmark-{time.strftime('%Y%m%d-%H%M%S')}")
+    browser = None
+    try:
+        browser = await create_browser(fast_mode=args.fast)
+
+        with span('benchmark.login') as step:
+            tab = await ensure_logged_in(browser)
+            if not tab:
+                step['outcome'] = 'failed'
+        if not tab:
+            print("❌ Login against the mock failed")
+            return None
+
+        if args.compare_fast_mode:
+            with span('benchmark.page_load', runs=args.compare_fast_mode):
+                result['page_load'] = await compare_fast_mode(browser, RESEARCHERS_URL, args.compare_fast_mode)
+
+        if args.import_ids or args.not_found_ids:
+            ids = benchmark_import_ids(args.import_ids, args.not_found_ids)
+            started = time.perf_counter()
+            with span('benchmark.import', ids=len(ids)):
+                outcomes = await import_researchers_batch(tab, ids, args.chunk_size)
+            result['import_seconds'] = round(time.perf_counter() - started, 3)
+            result['import_outcomes'] = {
+                outcome: sum(1 for o in outcomes.values() if o == outcome) for outcome in set(outcomes.values())
+            }
+
+        started = time.perf_counter()
+        with span('benchmark.extract', concurrency=args.concurrency):
+            if args.concurrency > 1:
+                await extract_researchers_parallel(browser, tab, args.concurrency)
+            else:
+                await extract_all_researchers_info(tab)
+        extract_seconds = time.perf_counter() - started
+
+        extracted = sum(1 for _ in iter_collaborator_files(DOWNLOAD_DIR))
+        result['researchers_expected'] = len(state.researchers)
+        result['researchers_extracted'] = extracted
+        result['extract_seconds'] = round(extract_seconds, 3)
+        result['researchers_per_hour'] = round(extracted / extract_seconds * 3600, 1) if extract_seconds else None
+        return result
+
+    finally:
+        result['steps'] = end_run()
+        emit('benchmark_result', **result)
+        await safe_browser_cleanup(browser)
+        server.shutdown()
+        result['telemetry'] = str(telemetry_path)
+
+def print_result(result):
+    """Print the headline benchmark numbers"""
+    print("\n🏁 BENCHMARK RESULT")
+    if 'import_seconds' in result:
+        print(f"   Import: {result['import_ids']} IDs in {result['import_seconds']:.1f}s - {result['import_outcomes']}")
+    print(f"   Extracted: {result['researchers_extracted']}/{result['researchers_expected']} researchers "
+          f"in {result['extract_seconds']:.1f}s")
+    print(f"   Throughput: {result['researchers_per_hour']} researchers/hour")
+    if 'page_load' in result:
+        normal, fast = result['page_load']['normal'], result['page_load']['fast']
+        print(f"   Page load: {normal['load_ms']:.0f} ms -> {fast['load_ms']:.0f} ms with fast mode, "
+              f"{normal['resources']:.0f} -> {fast['resources']:.0f} resources, "
+              f"{normal['transferred_bytes'] / 1024:.0f} -> {fast['transferred_bytes'] / 1024:.0f} KiB")
+    print(f"   Telemetry: {result['telemetry']}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the SciVal automation against an offline mock')
+    parser.add_argument('--researchers', type=int, default=10, help='researchers already in My SciVal')
+    parser.add_argument('--import-ids', type=int, default=5, help='new Scopus IDs to import')
+    parser.add_argument('--not-found-ids', type=int, default=1, help='extra IDs the mock reports as not found')
+    parser.add_argument('--chunk-size', type=int, default=25, help='IDs per import wizard pass')
+    parser.add_argument('--concurrency', type=int, default=1, help='extraction tabs (1 = serial loop)')
+    parser.add_argument('--latency', type=float, default=0.1, help='seconds added to every mock response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random latency per response (seconds)')
+    parser.add_argument('--ui-delay', type=float, default=0.05, help='seconds before client-side UI updates render')
+    parser.add_argument('--fast', action='store_true', help='headless browser with resource blocking')
+    parser.add_argument('--compare-fast-mode', type=int, default=0, metavar='RUNS',
+                        help='also time the researchers page RUNS times with and without resource blocking')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the latency jitter')
+    parser.add_argument('--workdir', help='scratch directory (default: a new temporary directory)')
+    parser.add_argument('--output', help='also write the result as JSON to this file')
+    args = parser.parse_args()
+    output = Path(args.output).resolve() if args.output else None
+
+    result = asyncio.run(run_benchmark(args))
+    if not result or 'researchers_extracted' not in result:
+        print("❌ Benchmark did not complete")
+        raise SystemExit(1)
+
+    print_result(result)
+    if output:
+        output.write_text(json.dumps(result, indent=2), encoding='utf-8')
+        print(f"   Result: {output}")
+
+if __name__ == "__main__":
+    main()
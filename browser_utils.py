@@ -1,19 +1,42 @@
 """Browser utilities for SciVal automation"""
 
 import asyncio
+import json
 import nodriver as uc
 from pathlib import Path
-from config import BROWSER_ARGS, DOWNLOAD_DIR
+from config import (
+    BROWSER_ARGS, DOWNLOAD_DIR, REUSE_SESSION, BROWSER_PROFILE_DIR, FAST_MODE, BLOCKED_URL_PATTERNS,
+    PAGE_LOAD_TIMEOUT
+)
+from download_manager import DownloadManager
+from wait_utils import wait_for_js
 
-async def create_browser():
-    """Create and configure browser instance"""
+async def create_browser(user_data_dir=None, download_dir=DOWNLOAD_DIR, fast_mode=FAST_MODE):
+    """Create and configure browser instance - uses the persistent profile when REUSE_SESSION is on"""
+    if user_data_dir is None and REUSE_SESSION:
+        user_data_dir = BROWSER_PROFILE_DIR
+    if user_data_dir:
+        Path(user_data_dir).mkdir(parents=True, exist_ok=True)
+        user_data_dir = str(Path(user_data_dir).resolve())
+    
     try:
         browser = await uc.start(
-            headless=False,
+            headless=fast_mode,
             no_sandbox=True,
+            user_data_dir=user_data_dir,
             args=BROWSER_ARGS
         )
         print("Browser started successfully")
+        # Remembered so tabs opened later (and steps that skip visual-only clicks) follow this browser's mode
+        browser.fast_mode = fast_mode
+        
+        # Downloads go straight into download_dir and complete on the browser's download events
+        browser.download_manager = DownloadManager(browser, download_dir)
+        await browser.download_manager.enable()
+        
+        if fast_mode:
+            await apply_fast_mode(browser.main_tab, enabled=True)
+            print("⚡ Fast mode: headless, images/fonts/trackers blocked")
         return browser
     except Exception as e:
         print(f"Failed to start browser: {e}")
@@ -26,3 +49,64 @@ async def safe_browser_cleanup(browser):
             await browser.stop()
         except Exception as cleanup_error:
             print(f"Error during browser cleanup: {cleanup_error}")
+
+def fast_mode_enabled(browser):
+    """Fast mode the browser was created with - FAST_MODE for browsers not started by create_browser"""
+    return getattr(browser, 'fast_mode', FAST_MODE)
+
+async def apply_fast_mode(tab, enabled=FAST_MODE, blocked_patterns=BLOCKED_URL_PATTERNS):
+    """Block images, fonts and trackers in a tab when fast mode is on"""
+    if not enabled or not blocked_patterns:
+        return
+    try:
+        # Blocking happens inside the browser, so blocked requests never round-trip through Python
+        await tab.send(uc.cdp.network.enable())
+        await tab.send(uc.cdp.network.set_blocked_ur_ls(urls=list(blocked_patterns)))
+    except Exception as e:
+        print(f"⚠ Could not enable resource blocking: {e}")
+
+async def measure_page_load(tab, url):
+    """Load url and return navigation timings (ms), resource count and transferred bytes"""
+    await tab.get(url)
+    if not await wait_for_js(
+        tab,
+        "document.readyState === 'complete' && performance.getEntriesByType('navigation')[0].loadEventEnd > 0",
+        timeout=PAGE_LOAD_TIMEOUT,
+        description=f"load of {url}"
+    ):
+        raise TimeoutError(f"{url} did not finish loading")
+    metrics = await tab.evaluate("""
+        (function() {
+            const nav = performance.getEntriesByType('navigation')[0];
+            const resources = performance.getEntriesByType('resource');
+            return JSON.stringify({
+                dom_content_loaded_ms: Math.round(nav.domContentLoadedEventEnd),
+                load_ms: Math.round(nav.loadEventEnd),
+                resources: resources.length,
+                transferred_bytes: resources.reduce((sum, r) => sum + (r.transferSize || 0), nav.transferSize || 0)
+            });
+        })()
+    """)
+    return json.loads(metrics)
+
+async def compare_fast_mode(browser, url, runs=3):
+    """Measure page load of url with and without resource blocking and print the comparison"""
+    tab = await browser.get('about:blank', new_tab=True)
+    results = {}
+    try:
+        await tab.send(uc.cdp.network.enable())
+        # Cold cache for every load so the second configuration does not benefit from the first
+        await tab.send(uc.cdp.network.set_cache_disabled(cache_disabled=True))
+        for label, patterns in (('normal', []), ('fast', BLOCKED_URL_PATTERNS)):
+            await tab.send(uc.cdp.network.set_blocked_ur_ls(urls=list(patterns)))
+            samples = [await measure_page_load(tab, url) for _ in range(runs)]
+            results[label] = {key: sum(s[key] for s in samples) / runs for key in samples[0]}
+    finally:
+        await tab.close()
+    
+    print(f"📊 Page load comparison for {url} (mean of {runs} runs)")
+    for key in results['normal']:
+        before, after = results['normal'][key], results['fast'][key]
+        change = f"{(after - before) / before * 100:+.0f}%" if before else "n/a"
+        print(f"   {key}: {before:.0f} -> {after:.0f} ({change})")
+    return results
@@ -0,0 +1,67 @@
+"""Checkpoint manifest for resumable researcher extraction"""
+
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from config import CHECKPOINT_MANIFEST, CHECKPOINT_TTL_HOURS
+from collaborator_parser import parse_collaborators_export
+
+def load_manifest(manifest_path=CHECKPOINT_MANIFEST):
+    """Load the extraction manifest - returns {'researchers': {name: entry}}"""
+    path = Path(manifest_path)
+    if not path.exists():
+        return {'researchers': {}}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        manifest.setdefault('researchers', {})
+        print(f"📒 Loaded checkpoint manifest with {len(manifest['researchers'])} researchers")
+        return manifest
+    except Exception as e:
+        print(f"⚠ Could not read checkpoint manifest ({e}), starting fresh")
+        return {'researchers': {}}
+
+def save_manifest(manifest, manifest_path=CHECKPOINT_MANIFEST):
+    """Write the manifest atomically so a crash never leaves a half-written file"""
+    path = Path(manifest_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def count_collaborator_rows(file_path):
+    """Count table rows in a collaborators export"""
+    _, rows = parse_collaborators_export(file_path)
+    return sum(1 for _ in rows)
+
+def record_extraction(manifest, researcher_name, file_path, position=None, manifest_path=CHECKPOINT_MANIFEST):
+    """Record a successful extraction and persist the manifest immediately"""
+    try:
+        row_count = count_collaborator_rows(file_path)
+    except Exception as e:
+        print(f"⚠ Could not count rows in {file_path}: {e}")
+        row_count = None
+
+    manifest['researchers'][researcher_name] = {
+        'name': researcher_name,
+        'position': position,
+        'file_path': str(file_path),
+        'extracted_at': datetime.now().isoformat(timespec='seconds'),
+        'row_count': row_count,
+    }
+    save_manifest(manifest, manifest_path)
+
+def is_fresh(manifest, researcher_name, ttl_hours=CHECKPOINT_TTL_HOURS):
+    """True when the researcher was extracted within ttl_hours and the output file still exists"""
+    entry = manifest['researchers'].get(researcher_name)
+    if not entry:
+        return False
+    try:
+        extracted_at = datetime.fromisoformat(entry['extracted_at'])
+    except (KeyError, ValueError):
+        return False
+    if datetime.now() - extracted_at > timedelta(hours=ttl_hours):
+        return False
+    return Path(entry.get('file_path', '')).is_file()
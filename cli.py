@@ -0,0 +1,226 @@
+"""Command-line entry point - each subcommand imports only what it needs
+
+    python cli.py login-check
+    python cli.py export
+    python cli.py import [--csv researcher_ids.csv]
+    python cli.py extract [--shards K]
+    python cli.py full [--csv researcher_ids.csv] [--keep-open]
+    python cli.py retry-failed
+    python cli.py refresh [--once] [--budget MINUTES] [--interval HOURS]
+    python cli.py daemon [--host 127.0.0.1] [--port 8765]
+    python cli.py reconcile --targets researcher_ids.csv --existing mySciVal_Researchers_Export.csv
+    python cli.py parse [FILE ...] [--consolidate]
+    python cli.py analyze [--top 20] [--output-dir graph_tables]
+    python cli.py catalog [--scan] [--link-export mySciVal_Researchers_Export.csv] [--researcher NAME | --scopus-id ID]
+    python cli.py report [telemetry/run-<id>.jsonl]
+
+Browser subcommands load nodriver and the workflow modules; reconcile, parse, analyze, catalog and report stay offline
+(analyze additionally needs numpy and scipy).
+"""
+
+import argparse
+import asyncio
+import sys
+
+BROWSER_COMMANDS = {
+    'login-check': 'log in (or reuse the saved session) and report whether it worked',
+    'export': 'export the researchers already in My SciVal',
+    'import': 'reconcile the target CSV against My SciVal and import the missing IDs',
+    'extract': 'download the collaborators of every researcher in My SciVal',
+    'full': 'import then extract',
+    'retry-failed': 'process only the imports and extractions left in the retry queue',
+}
+
+def run_browser_command(args):
+    """Run one workflow mode in the browser"""
+    if getattr(args, 'shards', None):
+        from shard import main as run_sharded
+        return asyncio.run(run_sharded(args.shards))
+
+    from main import run_workflow
+    from config import RESEARCHER_IDS_CSV
+    return asyncio.run(run_workflow(args.command, keep_open=args.keep_open, csv_file_path=args.csv or RESEARCHER_IDS_CSV))
+
+def run_refresh(args):
+    """Re-extract stale researchers within a time budget, once or on a schedule"""
+    from refresh import main as run_refresh_main
+    from config import REFRESH_TIME_BUDGET_MINUTES, REFRESH_INTERVAL_HOURS
+    budget = REFRESH_TIME_BUDGET_MINUTES if args.budget is None else args.budget
+    return asyncio.run(run_refresh_main(args.once, args.interval or REFRESH_INTERVAL_HOURS, budget))
+
+def run_daemon(args):
+    """Log in once and serve jobs over the local HTTP API"""
+    from daemon import main as run_daemon_main
+    from config import DAEMON_HOST, DAEMON_PORT
+    return asyncio.run(run_daemon_main(args.host or DAEMON_HOST, args.port or DAEMON_PORT))
+
+def run_reconcile(args):
+    """Diff a target CSV against a researcher export without opening a browser"""
+    from reconcile import (
+        load_target_ids, read_existing_scopus_ids, reconcile_ids,
+        print_target_summary, print_reconciliation, write_reconciliation
+    )
+    targets = load_target_ids(args.targets)
+    print_target_summary(targets)
+    existing_ids = read_existing_scopus_ids(args.existing) if args.existing else []
+    result = reconcile_ids(targets['ids'], existing_ids)
+    print_reconciliation(result)
+    if args.output_dir:
+        write_reconciliation(result, args.output_dir)
+    return True
+
+def run_parse(args):
+    """Summarize collaborators exports and optionally load them into the consolidated store"""
+    from collaborator_parser import parse_collaborators_export, iter_collaborator_files
+    from config import DOWNLOAD_DIR, COLLABORATORS_DB
+
+    files = args.files or list(iter_collaborator_files(args.download_dir or DOWNLOAD_DIR))
+    if not files:
+        print("❌ No collaborators exports found")
+        return False
+
+    ok = True
+    for file_path in files:
+        try:
+            metadata, rows = parse_collaborators_export(file_path)
+            print(f"✅ {metadata.get('Entity') or file_path}: {sum(1 for _ in rows)} collaborators "
+                  f"(exported {metadata.get('date_exported')}, {metadata.get('Author numbers') or 'all'} authors)")
+        except Exception as e:
+            print(f"❌ Could not parse {file_path}: {e}")
+            ok = False
+
+    if args.consolidate:
+        from collaborator_store import connect, append_export
+        db_path = args.db or COLLABORATORS_DB
+        conn = connect(db_path)
+        try:
+            for file_path in files:
+                try:
+                    append_export(conn, file_path)
+                except Exception as e:
+                    print(f"❌ Could not load {file_path}: {e}")
+                    ok = False
+        finally:
+            conn.close()
+        print(f"📦 Consolidated {len(files)} exports into {db_path}")
+    return ok
+
+def run_analyze(args):
+    """Co-authorship graph rankings over the consolidated store"""
+    from coauthor_graph import analyze
+    from config import COLLABORATORS_DB
+    results = analyze(args.db or COLLABORATORS_DB, top=args.top, output_dir=args.output_dir)
+    return bool(results['degree_ranking'])
+
+def run_catalog(args):
+    """Index the download directory and show the latest export per researcher"""
+    from download_catalog import connect, catalog_directory, latest_download, latest_downloads, link_scopus_ids
+    from config import DOWNLOAD_DIR, DOWNLOAD_CATALOG_DB
+
+    db_path = args.db or DOWNLOAD_CATALOG_DB
+    if args.scan:
+        catalog_directory(args.download_dir or DOWNLOAD_DIR, db_path)
+
+    conn = connect(db_path)
+    try:
+        if args.link_export:
+            from reconcile import read_researcher_name_ids
+            link_scopus_ids(conn, read_researcher_name_ids(args.link_export))
+        if args.researcher or args.scopus_id:
+            record = latest_download(conn, researcher_name=args.researcher, scopus_author_id=args.scopus_id)
+            records = [record] if record else []
+        else:
+            records = latest_downloads(conn)
+    finally:
+        conn.close()
+
+    if not records:
+        print("❌ No cataloged exports found")
+        return False
+    for record in records:
+        print(f"🗃 {record['researcher_name']}: {record['row_count']} collaborators, "
+              f"exported {record['date_exported']}, SciVal updated {record['date_last_updated']}, "
+              f"sha256 {record['content_hash'][:12]} - {record['file_path']}")
+    return True
+
+def run_report(args):
+    """Step timings and outcomes of a finished run, read back from its telemetry file"""
+    from telemetry import load_spans, summarize_spans, print_step_timings, latest_run_file
+    from config import TELEMETRY_DIR
+
+    path = args.file or latest_run_file(args.telemetry_dir or TELEMETRY_DIR)
+    if not path:
+        print("❌ No telemetry files found")
+        return False
+    summary = summarize_spans(load_spans(path))
+    print(f"📈 {path}: {sum(stats['count'] for stats in summary.values())} spans")
+    print_step_timings(summary)
+    return bool(summary)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description='SciVal automation')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    for command, help_text in BROWSER_COMMANDS.items():
+        sub = subcommands.add_parser(command, help=help_text)
+        sub.add_argument('--keep-open', action='store_true', help='keep the browser open afterwards')
+        if command in ('import', 'full'):
+            sub.add_argument('--csv', help='target researcher IDs (default: RESEARCHER_IDS_CSV)')
+        else:
+            sub.set_defaults(csv=None)
+        if command == 'extract':
+            sub.add_argument('--shards', type=int, help='spread extraction over this many browser processes')
+        sub.set_defaults(handler=run_browser_command)
+
+    sub = subcommands.add_parser('refresh', help='re-extract only stale researchers, most stale first, on a schedule')
+    sub.add_argument('--once', action='store_true', help='run one refresh and exit')
+    sub.add_argument('--budget', type=float, help='minutes per run (default: REFRESH_TIME_BUDGET_MINUTES, 0 = no limit)')
+    sub.add_argument('--interval', type=float, help='hours between runs (default: REFRESH_INTERVAL_HOURS)')
+    sub.set_defaults(handler=run_refresh)
+
+    sub = subcommands.add_parser('daemon', help='keep a logged-in browser open and run jobs posted to a local HTTP API')
+    sub.add_argument('--host', help='interface to bind (default: DAEMON_HOST)')
+    sub.add_argument('--port', type=int, help='port to listen on (default: DAEMON_PORT)')
+    sub.set_defaults(handler=run_daemon)
+
+    sub = subcommands.add_parser('reconcile', help='diff target IDs against a researcher export (offline)')
+    sub.add_argument('--targets', required=True, help='CSV of target Scopus IDs (first column)')
+    sub.add_argument('--existing', help='mySciVal_Researchers_Export.csv; omit to treat SciVal as empty')
+    sub.add_argument('--output-dir', help='also write reconcile_to_import.csv / reconcile_to_remove.csv here')
+    sub.set_defaults(handler=run_reconcile)
+
+    sub = subcommands.add_parser('parse', help='summarize collaborators exports (offline)')
+    sub.add_argument('files', nargs='*', help='export files (default: every export in DOWNLOAD_DIR)')
+    sub.add_argument('--download-dir', help='directory to scan when no files are given')
+    sub.add_argument('--consolidate', action='store_true', help='also load the exports into the SQLite store')
+    sub.add_argument('--db', help='SQLite store path (default: COLLABORATORS_DB)')
+    sub.set_defaults(handler=run_parse)
+
+    sub = subcommands.add_parser('analyze', help='co-authorship graph rankings over the consolidated store (offline)')
+    sub.add_argument('--top', type=int, default=20, help='rows to print per ranking')
+    sub.add_argument('--output-dir', help='also write the full rankings as CSV here')
+    sub.add_argument('--db', help='SQLite store path (default: COLLABORATORS_DB)')
+    sub.set_defaults(handler=run_analyze)
+
+    sub = subcommands.add_parser('catalog', help='show the latest export per researcher from the download catalog (offline)')
+    sub.add_argument('--scan', action='store_true', help='first catalog every export in the download directory')
+    sub.add_argument('--download-dir', help='directory to scan (default: DOWNLOAD_DIR)')
+    sub.add_argument('--link-export', help='researcher export used to attach Scopus IDs to cataloged names')
+    sub.add_argument('--researcher', help='only this researcher (display name)')
+    sub.add_argument('--scopus-id', help='only this researcher (Scopus Author ID)')
+    sub.add_argument('--db', help='catalog path (default: DOWNLOAD_CATALOG_DB)')
+    sub.set_defaults(handler=run_catalog)
+
+    sub = subcommands.add_parser('report', help='step timings and outcomes of a past run from its telemetry file (offline)')
+    sub.add_argument('file', nargs='?', help='run telemetry file (default: the newest in TELEMETRY_DIR)')
+    sub.add_argument('--telemetry-dir', help='directory searched for the newest run (default: TELEMETRY_DIR)')
+    sub.set_defaults(handler=run_report)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    sys.exit(0 if args.handler(args) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Co-authorship graph analytics over the consolidated collaborator exports (NumPy / SciPy sparse)
+
+Every focal researcher's latest export becomes one row of a sparse incidence matrix
+(focal researcher x collaborator Scopus ID, weighted by co-authored publications), and the
+symmetric co-authorship adjacency is built from it. All aggregates are computed with sparse
+products and bincounts, so thousands of focal researchers need no Python-level pair loops.
+"""
+
+import csv
+import sqlite3
+from pathlib import Path
+import numpy as np
+from scipy import sparse
+from config import COLLABORATORS_DB, DOWNLOAD_CATALOG_DB
+
+LATEST_EXPORT_ROWS_SQL = """
+SELECT c.focal_researcher, c.scopus_author_id, c.author, c.institution_id, c.institution,
+       c.coauthored_publications, c.citations, c.fwci
+FROM collaborators c
+JOIN (
+    SELECT export_id FROM (
+        SELECT export_id, ROW_NUMBER() OVER (
+            PARTITION BY focal_researcher ORDER BY date_exported DESC, export_id DESC
+        ) AS rank FROM exports
+    ) WHERE rank = 1
+) latest ON latest.export_id = c.export_id
+"""
+
+def _numeric_column(values, dtype, missing):
+    """Array of values with NULLs replaced by missing"""
+    return np.array([missing if value is None else value for value in values], dtype=dtype)
+
+def load_collaborations(db_path=COLLABORATORS_DB):
+    """Rows of every focal researcher's latest export as column arrays"""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(LATEST_EXPORT_ROWS_SQL).fetchall()
+    finally:
+        conn.close()
+
+    columns = list(zip(*rows)) if rows else [()] * 8
+    return {
+        'focal': np.array(columns[0], dtype=object),
+        'scopus_author_id': _numeric_column(columns[1], np.int64, -1),
+        'author': np.array(columns[2], dtype=object),
+        'institution_id': _numeric_column(columns[3], np.int64, -1),
+        'institution': np.array(columns[4], dtype=object),
+        'coauthored_publications': _numeric_column(columns[5], np.float64, 0),
+        'citations': _numeric_column(columns[6], np.float64, 0),
+        'fwci': _numeric_column(columns[7], np.float64, np.nan),
+    }
+
+def focal_scopus_ids(catalog_db=DOWNLOAD_CATALOG_DB):
+    """Focal researcher name -> Scopus ID, as linked in the download catalog"""
+    if not Path(catalog_db).exists():
+        return {}
+    conn = sqlite3.connect(catalog_db)
+    try:
+        rows = conn.execute(
+            'SELECT researcher_name, scopus_author_id FROM latest_downloads WHERE scopus_author_id IS NOT NULL'
+        ).fetchall()
+    except sqlite3.Error:
+        rows = []
+    finally:
+        conn.close()
+    return {name: str(scopus_id) for name, scopus_id in rows}
+
+class CoauthorGraph:
+    """Sparse co-authorship graph keyed by Scopus author ID
+
+    incidence: focal x collaborator CSR matrix of co-authored publications
+    adjacency: symmetric node x node CSR matrix over every focal researcher and collaborator
+    nodes: node keys - the Scopus ID, or "name:<focal researcher>" when a focal researcher's ID is unknown
+    """
+
+    def __init__(self, collaborations, scopus_ids=None):
+        scopus_ids = scopus_ids or {}
+        has_id = collaborations['scopus_author_id'] >= 0
+        focal = collaborations['focal'][has_id]
+        collaborator_ids = collaborations['scopus_author_id'][has_id]
+        weights = collaborations['coauthored_publications'][has_id]
+
+        self.focal_names, focal_index = np.unique(focal.astype(str), return_inverse=True)
+        self.collaborator_ids, collaborator_index = np.unique(collaborator_ids, return_inverse=True)
+        self.incidence = sparse.csr_matrix(
+            (weights, (focal_index, collaborator_index)),
+            shape=(len(self.focal_names), len(self.collaborator_ids))
+        )
+
+        # One node per Scopus ID; focal researchers whose ID is known merge with their collaborator node
+        focal_keys = np.array([scopus_ids.get(name, f"name:{name}") for name in self.focal_names], dtype=str)
+        self.nodes, node_index = np.unique(
+            np.concatenate([focal_keys, self.collaborator_ids.astype(str)]), return_inverse=True
+        )
+        self.focal_nodes = node_index[:len(focal_keys)]
+        self.collaborator_nodes = node_index[len(focal_keys):]
+
+        directed = sparse.csr_matrix(
+            (weights, (self.focal_nodes[focal_index], self.collaborator_nodes[collaborator_index])),
+            shape=(len(self.nodes), len(self.nodes))
+        )
+        directed.setdiag(0)
+        directed.eliminate_zeros()
+        # Two focal researchers listing each other report the same publications - keep the larger count
+        self.adjacency = directed.maximum(directed.T).tocsr()
+
+    def degree_ranking(self, top=20):
+        """Nodes by weighted degree (co-authored publications), top=None for all - [{'node', 'degree', 'weighted_degree', 'focal'}]"""
+        degree = np.diff(self.adjacency.indptr)
+        weighted = np.asarray(self.adjacency.sum(axis=1)).ravel()
+        order = np.lexsort((-degree, -weighted))[:top]
+        is_focal = np.zeros(len(self.nodes), dtype=bool)
+        is_focal[self.focal_nodes] = True
+        return [
+            {'node': str(self.nodes[i]), 'degree': int(degree[i]), 'weighted_degree': float(weighted[i]), 'focal': bool(is_focal[i])}
+            for i in order
+        ]
+
+    def shared_collaborators(self, top=20):
+        """Focal researcher pairs with the most collaborators in common, top=None for all - [{'researcher_a', 'researcher_b', 'shared'}]"""
+        binary = (self.incidence > 0).astype(np.int32)
+        shared = sparse.triu(binary @ binary.T, k=1).tocoo()
+        if not shared.nnz:
+            return []
+        order = np.argsort(-shared.data, kind='stable')[:top]
+        return [
+            {'researcher_a': str(self.focal_names[shared.row[i]]), 'researcher_b': str(self.focal_names[shared.col[i]]),
+             'shared': int(shared.data[i])}
+            for i in order
+        ]
+
+    def collaborators_in_common(self, researcher_a, researcher_b):
+        """Scopus IDs collaborating with both focal researchers"""
+        index = {name: i for i, name in enumerate(self.focal_names)}
+        both = self.incidence[index[researcher_a]].multiply(self.incidence[index[researcher_b]])
+        return self.collaborator_ids[both.indices].tolist()
+
+def institution_aggregates(collaborations, top=None):
+    """Per-institution totals - [{'institution_id', 'institution', 'collaborators', 'focal_researchers',
+    'coauthored_publications', 'citations', 'fwci'}] by co-authored publications, FWCI publication-weighted"""
+    has_institution = collaborations['institution_id'] >= 0
+    institution_ids = collaborations['institution_id'][has_institution]
+    if not len(institution_ids):
+        return []
+    names = collaborations['institution'][has_institution]
+    publications = collaborations['coauthored_publications'][has_institution]
+    citations = collaborations['citations'][has_institution]
+    fwci = collaborations['fwci'][has_institution]
+    _, focal_index = np.unique(collaborations['focal'][has_institution].astype(str), return_inverse=True)
+    authors = collaborations['scopus_author_id'][has_institution]
+
+    unique_ids, first, codes = np.unique(institution_ids, return_index=True, return_inverse=True)
+    count = len(unique_ids)
+
+    total_publications = np.bincount(codes, weights=publications, minlength=count)
+    total_citations = np.bincount(codes, weights=citations, minlength=count)
+    has_fwci = ~np.isnan(fwci)
+    fwci_weight = np.bincount(codes[has_fwci], weights=publications[has_fwci], minlength=count)
+    fwci_sum = np.bincount(codes[has_fwci], weights=(fwci * publications)[has_fwci], minlength=count)
+    mean_fwci = np.divide(fwci_sum, fwci_weight, out=np.full(count, np.nan), where=fwci_weight > 0)
+
+    # Distinct (institution, author) and (institution, focal researcher) pairs
+    distinct_authors = np.unique(np.stack([codes[authors >= 0], authors[authors >= 0]]), axis=1)[0]
+    distinct_focal = np.unique(np.stack([codes, focal_index]), axis=1)[0]
+    collaborator_counts = np.bincount(distinct_authors, minlength=count)
+    focal_counts = np.bincount(distinct_focal, minlength=count)
+
+    order = np.argsort(-total_publications, kind='stable')[:top]
+    return [
+        {
+            'institution_id': int(unique_ids[i]),
+            'institution': names[first[i]],
+            'collaborators': int(collaborator_counts[i]),
+            'focal_researchers': int(focal_counts[i]),
+            'coauthored_publications': int(total_publications[i]),
+            'citations': int(total_citations[i]),
+            'fwci': None if np.isnan(mean_fwci[i]) else round(float(mean_fwci[i]), 3),
+        }
+        for i in order
+    ]
+
+def write_rows(rows, file_path):
+    """Write a list of dicts as CSV"""
+    path = Path(file_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else [])
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+def analyze(db_path=COLLABORATORS_DB, catalog_db=DOWNLOAD_CATALOG_DB, top=20, output_dir=None):
+    """Build the graph, print the rankings and optionally write full CSVs - returns the results"""
+    collaborations = load_collaborations(db_path)
+    graph = CoauthorGraph(collaborations, focal_scopus_ids(catalog_db))
+    print(f"🕸 Graph: {len(graph.focal_names)} focal researchers, {len(graph.collaborator_ids)} collaborators, "
+          f"{len(graph.nodes)} nodes, {graph.adjacency.nnz // 2} edges")
+
+    # Keep everything when writing the full tables
+    limit = None if output_dir else top
+    results = {
+        'degree_ranking': graph.degree_ranking(limit),
+        'shared_collaborators': graph.shared_collaborators(limit),
+        'institutions': institution_aggregates(collaborations, limit),
+    }
+
+    print(f"\n🏆 Top {top} by weighted degree (co-authored publications):")
+    for row in results['degree_ranking'][:top]:
+        print(f"   {row['node']:<40} {row['weighted_degree']:>8.0f} pubs {row['degree']:>6} co-authors{' (focal)' if row['focal'] else ''}")
+    print(f"\n🤝 Top {top} focal researcher pairs by shared collaborators:")
+    for row in results['shared_collaborators'][:top]:
+        print(f"   {row['researcher_a']} / {row['researcher_b']}: {row['shared']}")
+    print(f"\n🏛 Top {top} institutions by co-authored publications:")
+    for row in results['institutions'][:top]:
+        print(f"   {str(row['institution']):<40} {row['coauthored_publications']:>8} pubs {row['collaborators']:>6} authors "
+              f"{row['focal_researchers']:>5} focal, FWCI {row['fwci']}")
+
+    if output_dir:
+        for name, rows in results.items():
+            write_rows(rows, Path(output_dir) / f"graph_{name}.csv")
+        print(f"\n📁 Full tables written to {output_dir}")
+    return results
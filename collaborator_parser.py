@@ -0,0 +1,84 @@
+"""Streaming parser for Authors_collaborating_with_*.csv exports"""
+
+import csv
+import io
+from datetime import datetime
+from pathlib import Path
+
+COLLABORATOR_COLUMNS = {
+    # CSV header -> (field name, type)
+    'Author': ('author', str),
+    'Institution ID': ('institution_id', int),
+    'Institution': ('institution', str),
+    'Sector': ('sector', str),
+    'Co-authored publications': ('coauthored_publications', int),
+    'Citations': ('citations', int),
+    'Citations per Publication': ('citations_per_publication', float),
+    'Field-Weighted Citation Impact': ('fwci', float),
+    'Scopus author ID': ('scopus_author_id', int),
+}
+
+def _iter_lines(source):
+    """Yield text lines from a file path or raw CSV bytes, dropping the UTF-8 BOM"""
+    if isinstance(source, bytes):
+        yield from io.StringIO(source.decode('utf-8-sig'), newline='')
+        return
+    with open(source, 'r', newline='', encoding='utf-8-sig') as f:
+        yield from f
+
+def _convert(value, value_type):
+    """Convert a CSV cell to value_type - empty or non-numeric placeholders ('-', 'n/a') become None"""
+    value = value.strip()
+    if value_type is str:
+        return value or None
+    try:
+        return value_type(value.replace(',', ''))
+    except ValueError:
+        return None
+
+def _parse_date(value):
+    """Parse SciVal preamble dates such as '28 July 2025' into ISO format"""
+    try:
+        return datetime.strptime(value.strip(), '%d %B %Y').date().isoformat()
+    except (ValueError, AttributeError):
+        return None
+
+def parse_collaborators_export(source):
+    """Split an export into (metadata, rows) - metadata is read eagerly, rows is a lazy iterator of typed dicts"""
+    lines = _iter_lines(source)
+    metadata = {}
+    header = None
+
+    # Preamble: "Key,Value" lines until the table header starting with "Author,"
+    for line in lines:
+        if line.startswith('Author,'):
+            header = next(csv.reader([line]))
+            break
+        fields = next(csv.reader([line]), [])
+        if len(fields) >= 2 and fields[0].strip():
+            metadata[fields[0].strip()] = fields[1].strip()
+
+    metadata['date_exported'] = _parse_date(metadata.get('Date exported'))
+    metadata['date_last_updated'] = _parse_date(metadata.get('Date last updated'))
+
+    def rows():
+        if header is None:
+            return
+        columns = [COLLABORATOR_COLUMNS.get(name, (name, str)) for name in header]
+        # The table ends at the first blank line; the copyright footer follows it
+        for record in csv.reader(lines):
+            if not record or not any(cell.strip() for cell in record):
+                break
+            yield {name: _convert(value, value_type) for (name, value_type), value in zip(columns, record)}
+
+    return metadata, rows()
+
+def read_collaborators_metadata(source):
+    """Read only the preamble metadata of an export"""
+    metadata, rows = parse_collaborators_export(source)
+    rows.close()
+    return metadata
+
+def iter_collaborator_files(download_dir):
+    """Yield collaborators export files in download_dir, sorted by name"""
+    yield from sorted(Path(download_dir).glob('Authors_collaborating_with_*.csv'))
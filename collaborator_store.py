@@ -0,0 +1,113 @@
+"""Consolidated SQLite store of all collaborator exports"""
+
+import sqlite3
+from pathlib import Path
+from config import DOWNLOAD_DIR, COLLABORATORS_DB, DOWNLOAD_CATALOG_DB
+from collaborator_parser import parse_collaborators_export, iter_collaborator_files
+import download_catalog
+
+# Consumer name under which the download catalog remembers what was consolidated
+CATALOG_CONSUMER = 'collaborator_store'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS exports (
+    export_id INTEGER PRIMARY KEY,
+    focal_researcher TEXT NOT NULL,
+    date_exported TEXT,
+    date_last_updated TEXT,
+    year_range TEXT,
+    author_numbers TEXT,
+    source_file TEXT NOT NULL,
+    row_count INTEGER,
+    UNIQUE (focal_researcher, date_exported)
+);
+CREATE TABLE IF NOT EXISTS collaborators (
+    export_id INTEGER NOT NULL REFERENCES exports(export_id) ON DELETE CASCADE,
+    focal_researcher TEXT NOT NULL,
+    date_exported TEXT,
+    author TEXT,
+    institution_id INTEGER,
+    institution TEXT,
+    sector TEXT,
+    coauthored_publications INTEGER,
+    citations INTEGER,
+    citations_per_publication REAL,
+    fwci REAL,
+    scopus_author_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_collaborators_focal ON collaborators (focal_researcher, date_exported);
+CREATE INDEX IF NOT EXISTS idx_collaborators_scopus ON collaborators (scopus_author_id);
+"""
+
+ROW_FIELDS = (
+    'author', 'institution_id', 'institution', 'sector', 'coauthored_publications',
+    'citations', 'citations_per_publication', 'fwci', 'scopus_author_id',
+)
+
+def connect(db_path=COLLABORATORS_DB):
+    """Open the consolidated database, creating the schema if needed"""
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA foreign_keys = ON')
+    conn.executescript(SCHEMA)
+    return conn
+
+def append_export(conn, source, source_name=None):
+    """Stream one collaborators export into the store - replaces an earlier load of the same researcher and date"""
+    metadata, rows = parse_collaborators_export(source)
+    focal_researcher = metadata.get('Entity') or metadata.get('Data set') or str(source_name or source)
+    date_exported = metadata.get('date_exported')
+
+    with conn:
+        conn.execute(
+            'DELETE FROM exports WHERE focal_researcher = ? AND date_exported IS ?',
+            (focal_researcher, date_exported)
+        )
+        cursor = conn.execute(
+            'INSERT INTO exports (focal_researcher, date_exported, date_last_updated, year_range, '
+            'author_numbers, source_file) VALUES (?, ?, ?, ?, ?, ?)',
+            (focal_researcher, date_exported, metadata.get('date_last_updated'),
+             metadata.get('Year range'), metadata.get('Author numbers'), str(source_name or source))
+        )
+        export_id = cursor.lastrowid
+        cursor = conn.executemany(
+            f'INSERT INTO collaborators (export_id, focal_researcher, date_exported, {", ".join(ROW_FIELDS)}) '
+            f'VALUES (?, ?, ?, {", ".join("?" for _ in ROW_FIELDS)})',
+            ((export_id, focal_researcher, date_exported, *(row.get(field) for field in ROW_FIELDS)) for row in rows)
+        )
+        conn.execute('UPDATE exports SET row_count = ? WHERE export_id = ?', (cursor.rowcount, export_id))
+
+    return focal_researcher, cursor.rowcount
+
+def has_export(conn, focal_researcher, date_exported):
+    """True when the store holds an export of this researcher and date"""
+    row = conn.execute('SELECT 1 FROM exports WHERE focal_researcher = ? AND date_exported IS ?',
+                       (focal_researcher, date_exported)).fetchone()
+    return row is not None
+
+def consolidate_collaborators(download_dir=DOWNLOAD_DIR, db_path=COLLABORATORS_DB, catalog_db=DOWNLOAD_CATALOG_DB):
+    """Append every new or changed collaborators export in download_dir into the consolidated store"""
+    conn = connect(db_path)
+    catalog = download_catalog.connect(catalog_db)
+    loaded = unchanged = 0
+    try:
+        for file_path in iter_collaborator_files(download_dir):
+            try:
+                # Hashing is much cheaper than re-parsing - skip content this store already holds
+                record, _ = download_catalog.catalog_file(catalog, file_path)
+                if (download_catalog.is_processed(catalog, CATALOG_CONSUMER, record['download_id'])
+                        and has_export(conn, record['researcher_name'], record['date_exported'])):
+                    unchanged += 1
+                    continue
+                focal_researcher, row_count = append_export(conn, file_path)
+                download_catalog.mark_processed(catalog, CATALOG_CONSUMER, record['download_id'])
+                loaded += 1
+                print(f"✅ {focal_researcher}: {row_count} collaborators")
+            except Exception as e:
+                print(f"❌ Could not load {file_path.name}: {e}")
+    finally:
+        catalog.close()
+        conn.close()
+
+    print(f"📦 Consolidated {loaded} exports into {db_path} ({unchanged} unchanged skipped)")
+    return loaded
@@ -0,0 +1,79 @@
+"""AIMD concurrency limiter for the extraction tab pool"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from config import ADAPTIVE_MAX_CONCURRENCY, ADAPTIVE_LATENCY_FACTOR
+from telemetry import emit
+
+# Weight of the newest sample in the latency moving average
+LATENCY_EWMA_ALPHA = 0.3
+
+class AIMDLimiter:
+    """Caps in-flight researchers; grows by one per window of fast successes and halves on congestion
+
+    Congestion is a failed attempt (missing button, no download within the wait, timeout) or an attempt
+    slower than latency_factor x the best moving-average latency seen so far. Signals from attempts that
+    started before the last decrease are ignored, so one burst of errors halves the limit only once.
+    """
+
+    def __init__(self, initial, minimum=1, maximum=ADAPTIVE_MAX_CONCURRENCY, latency_factor=ADAPTIVE_LATENCY_FACTOR, name='extract'):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = min(self.maximum, max(minimum, initial))
+        self.latency_factor = latency_factor
+        self.in_flight = 0
+        self.successes = 0
+        self.latency_average = None
+        self.best_average = None
+        self.last_decrease = float('-inf')
+        self.limits_seen = [self.limit]
+        self._condition = asyncio.Condition()
+        emit('concurrency_limit', limiter=name, limit=self.limit, reason='initial')
+
+    @asynccontextmanager
+    async def slot(self):
+        """Wait until fewer than limit researchers are in flight"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        try:
+            yield self
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    async def record(self, ok, latency, started):
+        """Feed one attempt's outcome and latency (started is its time.perf_counter() start)"""
+        async with self._condition:
+            slow = bool(self.best_average) and latency > self.latency_factor * self.best_average
+            if ok:
+                self.latency_average = latency if self.latency_average is None else (
+                    LATENCY_EWMA_ALPHA * latency + (1 - LATENCY_EWMA_ALPHA) * self.latency_average)
+                self.best_average = min(self.best_average or self.latency_average, self.latency_average)
+
+            if ok and not slow:
+                self.successes += 1
+                if self.successes >= self.limit and self.limit < self.maximum:
+                    self._set_limit(self.limit + 1, 'increase', latency)
+            elif started > self.last_decrease:
+                self._set_limit(max(self.minimum, self.limit // 2), 'slow' if ok else 'failure', latency)
+                self.last_decrease = time.perf_counter()
+            self._condition.notify_all()
+
+    def _set_limit(self, limit, reason, latency):
+        self.successes = 0
+        if limit == self.limit:
+            return
+        print(f"🎚 Concurrency {self.limit} -> {limit} ({reason}, {latency:.1f}s)")
+        emit('concurrency_limit', limiter=self.name, limit=limit, previous=self.limit, reason=reason,
+             latency_s=round(latency, 3), best_average_s=round(self.best_average or 0, 3), in_flight=self.in_flight)
+        self.limit = limit
+        self.limits_seen.append(limit)
+
+    def summary(self):
+        """Final, lowest and highest limit of the run"""
+        return {'limiter': self.name, 'final': self.limit, 'min': min(self.limits_seen), 'max': max(self.limits_seen),
+                'changes': len(self.limits_seen) - 1}
@@ -12,19 +12,127 @@ ELSEVIER_PASSWORD = os.getenv('ELSEVIER_PASSWORD')
 ELSEVIER_EMAIL = os.getenv('ELSEVIER_EMAIL')
 ELSEVIER_SECOND_PASSWORD = os.getenv('ELSEVIER_SECOND_PASSWORD')
 
-# URLs
-CITYU_LOGIN_URL = 'https://lbsystem.lib.cityu.edu.hk/ezlogin/index.aspx?url=https%3a%2f%2fwww.scival.com'
-OAUTH2_URL = 'https://id-elsevier-com.ezproxy.cityu.edu.hk/as/authorization.oauth2?platSite=SVE%2FSciVal&ui_locales=en-US&scope=openid+profile+email+els_auth_info+els_analytics_info&response_type=code&redirect_uri=https%3A%2F%2Fwww.scival.com%2Fidp%2Fcode&prompt=login&client_id=SCIVAL'
-RESEARCHERS_URL = 'https://www-scival-com.ezproxy.cityu.edu.hk/mySciVal?selection=researchers'
+# URLs (each can be overridden from the environment, e.g. to point at mock_scival.py)
+CITYU_LOGIN_URL = os.getenv('CITYU_LOGIN_URL', 'https://lbsystem.lib.cityu.edu.hk/ezlogin/index.aspx?url=https%3a%2f%2fwww.scival.com')
+OAUTH2_URL = os.getenv('OAUTH2_URL', 'https://id-elsevier-com.ezproxy.cityu.edu.hk/as/authorization.oauth2?platSite=SVE%2FSciVal&ui_locales=en-US&scope=openid+profile+email+els_auth_info+els_analytics_info&response_type=code&redirect_uri=https%3A%2F%2Fwww.scival.com%2Fidp%2Fcode&prompt=login&client_id=SCIVAL')
+RESEARCHERS_URL = os.getenv('RESEARCHERS_URL', 'https://www-scival-com.ezproxy.cityu.edu.hk/mySciVal?selection=researchers')
+OVERVIEW_URL = os.getenv('OVERVIEW_URL', 'https://www-scival-com.ezproxy.cityu.edu.hk/overview/summary?uri=Institution%2F205002')
 
 # Paths
 DOWNLOAD_DIR = "./scival_downloads"
+DOWNLOAD_TIMEOUT = 60  # Upper bound for an export to finish downloading
 RESEARCHER_IDS_CSV = 'researcher_ids.csv'
+COLLABORATORS_DB = "./scival_downloads/collaborators.sqlite"  # Consolidated store of all collaborator exports
+DOWNLOAD_CATALOG_DB = "./scival_downloads/catalog.sqlite"  # Index of every export file with its content hash
+TELEMETRY_DIR = "./telemetry"  # One JSON-lines file of step timings per run
+
+# Export capture
+# When enabled, export responses are intercepted through DevTools and parsed from memory
+# instead of going through a browser download (no "Allow multiple downloads" prompt).
+EXPORT_CAPTURE_MODE = False
+EXPORT_CAPTURE_PERSIST = True  # Also write the captured researcher export CSV to DOWNLOAD_DIR
+
+# Session reuse
+# Keep a persistent browser profile and saved cookie jar so later runs can skip the login flow
+REUSE_SESSION = True
+BROWSER_PROFILE_DIR = "./browser_profile"
+SESSION_COOKIES_FILE = "./.scival_session.dat"
+SESSION_PROBE_TIMEOUT = 15  # Upper bound for the "is the session still valid" check
 
 # Browser configuration
 BROWSER_ARGS = ['--no-sandbox', '--disable-setuid-sandbox']
 
+# Fast mode
+# Headless browser, blocked images/fonts/analytics and no visual-only steps - for unattended batch nodes
+FAST_MODE = False
+BLOCKED_URL_PATTERNS = [
+    # Images, fonts and media
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.ico', '*.webp',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot', '*.mp4', '*.webm',
+    # Analytics and third-party trackers
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*hotjar.com*', '*nr-data.net*', '*newrelic.com*', '*pendo.io*',
+    '*adobedtm.com*', '*omtrdc.net*', '*demdex.net*', '*everesttech.net*',
+    '*fullstory.com*', '*qualtrics.com*', '*cookielaw.org*', '*onetrust.com*',
+]
+
+# Wait configuration (seconds)
+# Every step waits for a page condition instead of sleeping a fixed time,
+# so each step finishes as soon as the site is ready and never exceeds its timeout.
+WAIT_TIMEOUT = 20          # Upper bound for an element/condition on an already loaded page
+PAGE_LOAD_TIMEOUT = 45     # Upper bound for a navigation or login redirect to settle
+WAIT_POLL_INTERVAL = 0.25  # How often conditions are re-checked
+NETWORK_IDLE_TIME = 0.5    # Quiet period without new network requests that counts as idle
+
+# Import configuration
+# Number of Scopus IDs pushed through one import wizard pass (failed batches are split in half)
+IMPORT_CHUNK_SIZE = 25
+# After each import, the researcher list is exported once and missing IDs are re-imported;
+# IDs still missing after IMPORT_VERIFY_ROUNDS list checks go to the retry queue (0 = trust the wizard)
+IMPORT_VERIFY_ROUNDS = 2
+
+# Extraction configuration
+# Number of tabs extracting researchers in parallel within the logged-in browser (1 = serial)
+EXTRACTION_CONCURRENCY = 1
+
+# Adaptive concurrency
+# With ADAPTIVE_CONCURRENCY on, parallel extraction starts with EXTRACTION_CONCURRENCY researchers in flight and
+# adjusts AIMD-style: +1 after a full window of fast successes, halved on a failed/timed-out researcher or one that
+# took more than ADAPTIVE_LATENCY_FACTOR x the best average so far; always between 1 and ADAPTIVE_MAX_CONCURRENCY.
+ADAPTIVE_CONCURRENCY = True
+ADAPTIVE_MAX_CONCURRENCY = 6
+ADAPTIVE_LATENCY_FACTOR = 2.0
+
+# Retry configuration
+# Failed imports and extractions are retried within the run after RETRY_BASE_DELAY * 2^n seconds
+# (capped at RETRY_MAX_DELAY); whatever still fails is queued for `python cli.py retry-failed`.
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 5
+RETRY_MAX_DELAY = 60
+RETRY_QUEUE_FILE = "./scival_downloads/retry_queue.json"
+
+# Sharding configuration
+# Number of independent browser processes for sharded extraction (cli.py extract --shards K);
+# each shard keeps its own profile, session and download directory under SHARD_ROOT.
+SHARD_COUNT = 2
+SHARD_ROOT = "./shards"
+
+# Resume configuration
+# A checkpoint manifest is written after every researcher; with RESUME_EXTRACTION on,
+# researchers extracted less than CHECKPOINT_TTL_HOURS ago are skipped.
+CHECKPOINT_MANIFEST = "./scival_downloads/extraction_manifest.json"
+RESUME_EXTRACTION = True
+CHECKPOINT_TTL_HOURS = 24
+
+# Direct navigation
+# Entity URIs and the collaborators URL pattern are learned from the first researcher and cached,
+# so later researchers (and later runs) open the collaborators view without the summary page.
+DIRECT_NAVIGATION = True
+ENTITY_CACHE_FILE = "./scival_downloads/entity_cache.json"
+
+# Refresh scheduler
+# `python cli.py refresh` re-extracts only stale researchers, most stale first, and stops starting new ones
+# once REFRESH_TIME_BUDGET_MINUTES is used up. A researcher is stale when never extracted, when the newest
+# export shows SciVal data updated after their last export's "Date last updated", or when their export is
+# older than REFRESH_MAX_AGE_DAYS. The scheduler repeats every REFRESH_INTERVAL_HOURS in the same browser.
+REFRESH_TIME_BUDGET_MINUTES = 60
+REFRESH_MAX_AGE_DAYS = 30
+REFRESH_INTERVAL_HOURS = 24
+
+# Daemon configuration
+# `python cli.py daemon` keeps one logged-in browser open and runs jobs posted to a local HTTP API.
+# The session is probed every DAEMON_KEEPALIVE_INTERVAL seconds while idle and re-established if it expired.
+# Every request needs "Authorization: Bearer <token>" - SCIVAL_DAEMON_TOKEN, or a random token generated at
+# startup and written to DAEMON_TOKEN_FILE. Browser (Origin) requests and non-JSON POSTs are always rejected.
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+DAEMON_KEEPALIVE_INTERVAL = 300
+DAEMON_JOB_HISTORY = 200  # Finished jobs kept for the status endpoint
+DAEMON_TOKEN = os.getenv('SCIVAL_DAEMON_TOKEN')
+DAEMON_TOKEN_FILE = "./scival_downloads/daemon_token"
+
 # Operation Mode Selection
 # Set to "full" for complete workflow (export -> import -> extract)
 # Set to "extract" for login -> extract only
+# Set to "daemon" to stay logged in and serve jobs over the local HTTP API (see daemon.py)
 OPERATION_MODE = "full"  # Change this to "full" or "extract"
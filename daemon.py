@@ -0,0 +1,331 @@
+"""Logged-in browser daemon - runs jobs posted to a local HTTP API without restarting the browser
+
+    POST /jobs       {"type": "import", "ids": ["57201194512", ...]}
+                     {"type": "extract", "researchers": ["Doe, Jane", ...]}  (omit researchers for everyone)
+                     {"type": "export"}
+                     {"type": "refresh", "budget_minutes": 30}  (stale researchers only, see refresh.py)
+    GET  /jobs       recent jobs, newest first
+    GET  /jobs/<id>  one job with its result
+    GET  /status     session state, current job and queue length
+    POST /shutdown   finish the current job and stop
+
+Jobs run one at a time in the authenticated tab; while idle the session is probed and renewed.
+Every request needs "Authorization: Bearer <token>" (SCIVAL_DAEMON_TOKEN, or the token written to
+DAEMON_TOKEN_FILE at startup); POST bodies must be application/json and browser requests are refused.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import secrets
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+from config import (
+    DOWNLOAD_DIR, DAEMON_HOST, DAEMON_PORT, DAEMON_KEEPALIVE_INTERVAL, DAEMON_JOB_HISTORY, DAEMON_TOKEN,
+    DAEMON_TOKEN_FILE, REFRESH_TIME_BUDGET_MINUTES
+)
+from browser_utils import create_browser, safe_browser_cleanup
+from login import ensure_logged_in, is_session_valid
+from export_researchers import export_existing_researchers
+from import_researchers import import_and_verify, check_if_no_existing_researchers
+from extract_researchers import run_extraction, extract_selected_researchers, reset_researcher_list
+from reconcile import normalize_scopus_id, reconcile_ids
+from refresh import run_refresh
+from retry_queue import pending
+from telemetry import start_run, end_run, span
+
+JOB_TYPES = ('import', 'extract', 'export', 'refresh')
+MAX_BODY_BYTES = 1 << 20
+
+HTTP_REASONS = {
+    200: 'OK', 202: 'Accepted', 400: 'Bad Request', 401: 'Unauthorized', 403: 'Forbidden', 404: 'Not Found',
+    405: 'Method Not Allowed', 415: 'Unsupported Media Type'
+}
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+class SciValDaemon:
+    """One logged-in browser, a FIFO job queue and the job history served by the HTTP API"""
+
+    def __init__(self, browser, tab, token=None):
+        self.browser = browser
+        self.tab = tab
+        self.token = token or DAEMON_TOKEN or secrets.token_urlsafe(32)
+        self.lock = asyncio.Lock()  # one job or session probe at a time in the shared tab
+        self.queue = asyncio.Queue()
+        self.jobs = {}
+        self.job_ids = itertools.count(1)
+        self.current_job = None
+        self.session_checked = _now()
+        self.session_valid = True
+        self.stopping = asyncio.Event()
+
+    async def ensure_session(self, force=False):
+        """Probe the session when the last check is stale (or force) and log in again if it expired"""
+        age = (datetime.now() - datetime.fromisoformat(self.session_checked)).total_seconds()
+        if not force and self.session_valid and age < DAEMON_KEEPALIVE_INTERVAL:
+            return True
+
+        with span('daemon.session_probe') as probe:
+            self.session_valid = await is_session_valid(self.tab)
+            if not self.session_valid:
+                print("🔑 Session expired - logging in again")
+                tab = await ensure_logged_in(self.browser)
+                if tab:
+                    self.tab = tab
+                    self.session_valid = True
+                probe['outcome'] = 'renewed' if tab else 'failed'
+        self.session_checked = _now()
+        return self.session_valid
+
+    def submit(self, payload):
+        """Validate and queue a job - returns the job or raises ValueError"""
+        job_type = payload.get('type')
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"type must be one of {', '.join(JOB_TYPES)}")
+
+        params = {}
+        if job_type == 'import':
+            ids = list(dict.fromkeys(filter(None, map(normalize_scopus_id, payload.get('ids') or []))))
+            if not ids:
+                raise ValueError("import needs a non-empty 'ids' list of Scopus Author IDs")
+            params['ids'] = ids
+        elif job_type == 'extract':
+            researchers = payload.get('researchers')
+            if researchers is not None and not (isinstance(researchers, list) and all(isinstance(n, str) for n in researchers)):
+                raise ValueError("'researchers' must be a list of display names")
+            params['researchers'] = researchers
+            params['force'] = bool(payload.get('force', True))
+        elif job_type == 'refresh':
+            budget_minutes = payload.get('budget_minutes', REFRESH_TIME_BUDGET_MINUTES)
+            if not isinstance(budget_minutes, (int, float)) or budget_minutes < 0:
+                raise ValueError("'budget_minutes' must be a non-negative number (0 = no limit)")
+            params['budget_minutes'] = budget_minutes
+
+        job = {
+            'id': str(next(self.job_ids)),
+            'type': job_type,
+            'params': params,
+            'status': 'queued',
+            'submitted': _now(),
+            'started': None,
+            'finished': None,
+            'result': None,
+            'error': None,
+        }
+        self.jobs[job['id']] = job
+        self.queue.put_nowait(job['id'])
+        print(f"📥 Job {job['id']} queued: {job_type}")
+        return job
+
+    async def run_import(self, ids):
+        """Import the given IDs that are not yet in My SciVal"""
+        existing_ids = []
+        if not await check_if_no_existing_researchers(self.tab):
+            existing_ids, _ = await export_existing_researchers(self.tab, DOWNLOAD_DIR)
+        reconciliation = reconcile_ids(ids, existing_ids)
+        outcomes = await import_and_verify(self.tab, reconciliation['to_import']) if reconciliation['to_import'] else {}
+        return {'already_present': reconciliation['already_present'], 'outcomes': outcomes}
+
+    async def run_extract(self, researchers=None, force=True):
+        """Extract the named researchers, or everyone when researchers is None"""
+        if researchers is None:
+            await run_extraction(self.tab, self.browser)
+            return {'scope': 'all', 'queued_failures': len(pending('extract'))}
+        return await extract_selected_researchers(self.tab, researchers, force)
+
+    async def run_export(self):
+        """Re-export the researcher list"""
+        if await check_if_no_existing_researchers(self.tab):
+            return {'count': 0, 'file': None}
+        existing_ids, export_file = await export_existing_researchers(self.tab, DOWNLOAD_DIR)
+        return {'count': len(existing_ids), 'file': str(export_file) if export_file else None}
+
+    async def run_refresh(self, budget_minutes=REFRESH_TIME_BUDGET_MINUTES):
+        """Refresh stale researchers within the time budget"""
+        return await run_refresh(self.tab, budget_minutes)
+
+    async def run_jobs(self):
+        """Worker: run queued jobs one at a time"""
+        handlers = {'import': self.run_import, 'extract': self.run_extract, 'export': self.run_export, 'refresh': self.run_refresh}
+        while True:
+            job = self.jobs[await self.queue.get()]
+            job.update(status='running', started=_now())
+            self.current_job = job['id']
+            print(f"▶ Job {job['id']} started: {job['type']}")
+            try:
+                async with self.lock:
+                    if not await self.ensure_session():
+                        raise RuntimeError("session could not be re-established")
+                    # Each job is its own run - re-read the researcher list so earlier imports are visible
+                    reset_researcher_list()
+                    with span('daemon.job', job_type=job['type'], job_id=job['id']):
+                        job['result'] = await handlers[job['type']](**job['params'])
+                job['status'] = 'done'
+            except Exception as e:
+                print(f"❌ Job {job['id']} failed: {e}")
+                job.update(status='failed', error=str(e))
+            finally:
+                job['finished'] = _now()
+                self.current_job = None
+                self.queue.task_done()
+                self.trim_history()
+            print(f"⏹ Job {job['id']} {job['status']}")
+
+    def trim_history(self):
+        """Forget the oldest finished jobs beyond DAEMON_JOB_HISTORY"""
+        finished = [job_id for job_id, job in self.jobs.items() if job['status'] in ('done', 'failed')]
+        for job_id in finished[:max(0, len(finished) - DAEMON_JOB_HISTORY)]:
+            del self.jobs[job_id]
+
+    async def keep_session_warm(self):
+        """Probe the session while idle so jobs start on a live login"""
+        while True:
+            await asyncio.sleep(DAEMON_KEEPALIVE_INTERVAL)
+            if self.lock.locked():
+                continue
+            async with self.lock:
+                try:
+                    await self.ensure_session(force=True)
+                except Exception as e:
+                    print(f"⚠ Keepalive probe failed: {e}")
+                    self.session_valid = False
+
+    def status(self):
+        return {
+            'session_valid': self.session_valid,
+            'session_checked': self.session_checked,
+            'current_job': self.current_job,
+            'queued': self.queue.qsize(),
+            'jobs': len(self.jobs),
+        }
+
+    async def route(self, method, path, headers, body):
+        """Dispatch one API request - returns (HTTP status, JSON payload)"""
+        # Web pages can reach 127.0.0.1 too - anything a browser sends carries Origin, API clients do not
+        if 'origin' in headers:
+            return 403, {'error': 'cross-origin requests are not accepted'}
+        if not secrets.compare_digest(headers.get('authorization', ''), f"Bearer {self.token}"):
+            return 401, {'error': 'missing or wrong bearer token'}
+        if method == 'POST' and headers.get('content-type', '').split(';')[0].strip().lower() != 'application/json':
+            return 415, {'error': 'POST bodies must be Content-Type: application/json'}
+
+        parts = [part for part in path.split('/') if part]
+        if parts == ['status']:
+            return (200, self.status()) if method == 'GET' else (405, {'error': 'use GET'})
+        if parts == ['jobs']:
+            if method == 'GET':
+                return 200, {'jobs': list(reversed(self.jobs.values()))}
+            if method == 'POST':
+                try:
+                    return 202, self.submit(json.loads(body or b'{}'))
+                except (ValueError, AttributeError) as e:
+                    return 400, {'error': str(e)}
+            return 405, {'error': 'use GET or POST'}
+        if len(parts) == 2 and parts[0] == 'jobs':
+            job = self.jobs.get(parts[1])
+            return (200, job) if job else (404, {'error': f"no job {parts[1]}"})
+        if parts == ['shutdown']:
+            if method != 'POST':
+                return 405, {'error': 'use POST'}
+            self.stopping.set()
+            return 202, {'stopping': True, 'current_job': self.current_job}
+        return 404, {'error': f"no route {path}"}
+
+    async def handle_connection(self, reader, writer):
+        """Minimal HTTP/1.1: one JSON request, one JSON response, then close"""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=10)
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get('content-length') or 0)
+            if length > MAX_BODY_BYTES:
+                raise ValueError("request body too large")
+            body = await reader.readexactly(length) if length else b''
+            status, payload = await self.route(method.upper(), urlsplit(target).path, headers, body)
+        except Exception as e:
+            status, payload = 400, {'error': str(e)}
+
+        data = json.dumps(payload, indent=2, ensure_ascii=False).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: close\r\n\r\n".encode('latin-1') + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+def write_token_file(token, token_file=DAEMON_TOKEN_FILE):
+    """Store a generated token where only the current user can read it - returns the path"""
+    path = Path(token_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(token)
+    os.chmod(path, 0o600)
+    return path
+
+async def stop_workers(workers):
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+
+async def serve(browser, tab, host=DAEMON_HOST, port=DAEMON_PORT):
+    """Serve the job API until POST /shutdown or Ctrl+C"""
+    daemon = SciValDaemon(browser, tab)
+    server = await asyncio.start_server(daemon.handle_connection, host, port)
+    workers = [asyncio.create_task(daemon.run_jobs()), asyncio.create_task(daemon.keep_session_warm())]
+    print(f"🛰 Daemon listening on http://{host}:{port} - POST /jobs, GET /status, POST /shutdown")
+    if not DAEMON_TOKEN:
+        print(f"🔐 Generated bearer token written to {write_token_file(daemon.token)}")
+    try:
+        await daemon.stopping.wait()
+        print("🛑 Shutdown requested - finishing the current job")
+        # Holding the lock means no job is mid-flight when the workers are cancelled
+        async with daemon.lock:
+            await stop_workers(workers)
+    finally:
+        await stop_workers(workers)
+        server.close()
+        await server.wait_closed()
+        for job in daemon.jobs.values():
+            if job['status'] in ('queued', 'running'):
+                job.update(status='cancelled', finished=_now())
+    return True
+
+async def main(host=DAEMON_HOST, port=DAEMON_PORT):
+    """Log in once and serve jobs"""
+    browser = None
+    start_run()
+    try:
+        browser = await create_browser()
+        tab = await ensure_logged_in(browser)
+        if not tab:
+            print("❌ Login failed, exiting...")
+            return False
+        print("✅ Login successful!")
+        return await serve(browser, tab, host, port)
+    except Exception as e:
+        print(f"❌ Daemon error: {e}")
+        return False
+    finally:
+        end_run()
+        await safe_browser_cleanup(browser)
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Received keyboard interrupt, closing browser...")
@@ -0,0 +1,207 @@
+"""SQLite catalog of downloaded collaborator exports with content hashes"""
+
+import hashlib
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from config import DOWNLOAD_DIR, DOWNLOAD_CATALOG_DB
+from collaborator_parser import parse_collaborators_export, iter_collaborator_files
+from reconcile import normalize_scopus_id
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS downloads (
+    download_id INTEGER PRIMARY KEY,
+    researcher_name TEXT NOT NULL,
+    scopus_author_id TEXT,
+    entity_uri TEXT,
+    file_path TEXT NOT NULL,
+    file_size INTEGER,
+    content_hash TEXT NOT NULL,
+    row_count INTEGER,
+    date_exported TEXT,
+    date_last_updated TEXT,
+    author_numbers TEXT,
+    cataloged_at TEXT NOT NULL,
+    UNIQUE (researcher_name, content_hash)
+);
+CREATE TABLE IF NOT EXISTS latest_downloads (
+    researcher_name TEXT PRIMARY KEY,
+    scopus_author_id TEXT,
+    download_id INTEGER NOT NULL REFERENCES downloads(download_id)
+);
+CREATE TABLE IF NOT EXISTS processed (
+    consumer TEXT NOT NULL,
+    download_id INTEGER NOT NULL REFERENCES downloads(download_id),
+    processed_at TEXT NOT NULL,
+    PRIMARY KEY (consumer, download_id)
+);
+CREATE INDEX IF NOT EXISTS idx_downloads_hash ON downloads (content_hash);
+CREATE INDEX IF NOT EXISTS idx_latest_scopus ON latest_downloads (scopus_author_id);
+"""
+
+def connect(db_path=DOWNLOAD_CATALOG_DB):
+    """Open the catalog, creating the schema if needed"""
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+def hash_file(file_path, chunk_size=1 << 16):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def catalog_file(conn, file_path, researcher_name=None, scopus_author_id=None, entity_uri=None):
+    """Record one export - returns (download row, changed) where changed is False when the content was already cataloged"""
+    path = Path(file_path).resolve()
+    content_hash = hash_file(path)
+    metadata, rows = parse_collaborators_export(path)
+    row_count = sum(1 for _ in rows)
+    # The preamble names the focal researcher the same way the consolidated store does
+    researcher_name = metadata.get('Entity') or researcher_name or path.stem
+
+    with conn:
+        existing = conn.execute(
+            'SELECT * FROM downloads WHERE researcher_name = ? AND content_hash = ?',
+            (researcher_name, content_hash)
+        ).fetchone()
+        changed = existing is None
+        if changed:
+            conn.execute(
+                'INSERT INTO downloads (researcher_name, scopus_author_id, entity_uri, file_path, file_size, '
+                'content_hash, row_count, date_exported, date_last_updated, author_numbers, cataloged_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (researcher_name, scopus_author_id, entity_uri, str(path), path.stat().st_size, content_hash,
+                 row_count, metadata.get('date_exported'), metadata.get('date_last_updated'),
+                 metadata.get('Author numbers'), datetime.now().isoformat(timespec='seconds'))
+            )
+        else:
+            # Same content under a possibly new path - keep the record pointing at the file on disk
+            conn.execute(
+                'UPDATE downloads SET file_path = ?, scopus_author_id = COALESCE(?, scopus_author_id), '
+                'entity_uri = COALESCE(?, entity_uri) WHERE download_id = ?',
+                (str(path), scopus_author_id, entity_uri, existing['download_id'])
+            )
+        record = conn.execute(
+            'SELECT * FROM downloads WHERE researcher_name = ? AND content_hash = ?',
+            (researcher_name, content_hash)
+        ).fetchone()
+        conn.execute(
+            'INSERT INTO latest_downloads (researcher_name, scopus_author_id, download_id) VALUES (?, ?, ?) '
+            'ON CONFLICT (researcher_name) DO UPDATE SET download_id = excluded.download_id, '
+            'scopus_author_id = COALESCE(excluded.scopus_author_id, latest_downloads.scopus_author_id)',
+            (researcher_name, record['scopus_author_id'], record['download_id'])
+        )
+    return dict(record), changed
+
+def researcher_scopus_id(researcher):
+    """Scopus ID of an enumerated researcher - explicit, else taken from a Researcher/<id> entity URI"""
+    if researcher.get('scopus_author_id'):
+        return normalize_scopus_id(researcher['scopus_author_id'])
+    uri = researcher.get('uri') or ''
+    return normalize_scopus_id(uri.split('/', 1)[1]) if uri.startswith('Researcher/') else None
+
+def catalog_download(file_path, researcher=None, db_path=DOWNLOAD_CATALOG_DB):
+    """Catalog a freshly downloaded export for an enumerated researcher - returns changed, or None on error"""
+    researcher = researcher or {}
+    try:
+        conn = connect(db_path)
+        try:
+            _, changed = catalog_file(conn, file_path, researcher.get('name'),
+                                      researcher_scopus_id(researcher), researcher.get('uri'))
+        finally:
+            conn.close()
+        if not changed:
+            print(f"🗃 {researcher.get('name') or Path(file_path).name}: content unchanged since the last export")
+        return changed
+    except Exception as e:
+        print(f"⚠ Could not catalog {file_path}: {e}")
+        return None
+
+def catalog_directory(download_dir=DOWNLOAD_DIR, db_path=DOWNLOAD_CATALOG_DB):
+    """Catalog every collaborators export in download_dir - returns (cataloged, changed)"""
+    conn = connect(db_path)
+    cataloged = changed_count = 0
+    try:
+        for file_path in iter_collaborator_files(download_dir):
+            try:
+                _, changed = catalog_file(conn, file_path)
+                cataloged += 1
+                changed_count += changed
+            except Exception as e:
+                print(f"❌ Could not catalog {file_path.name}: {e}")
+    finally:
+        conn.close()
+    print(f"🗃 Cataloged {cataloged} exports ({changed_count} new or changed) in {db_path}")
+    return cataloged, changed_count
+
+def latest_download(conn, researcher_name=None, scopus_author_id=None):
+    """Latest cataloged export of one researcher by name or Scopus ID - one indexed lookup, None if unknown"""
+    if researcher_name is not None:
+        condition, value = 'l.researcher_name = ?', researcher_name
+    else:
+        condition, value = 'l.scopus_author_id = ?', str(scopus_author_id)
+    row = conn.execute(
+        f'SELECT d.* FROM latest_downloads l JOIN downloads d ON d.download_id = l.download_id WHERE {condition}',
+        (value,)
+    ).fetchone()
+    return dict(row) if row else None
+
+def latest_downloads(conn):
+    """Latest export of every researcher"""
+    rows = conn.execute(
+        'SELECT d.* FROM latest_downloads l JOIN downloads d ON d.download_id = l.download_id '
+        'ORDER BY d.researcher_name'
+    )
+    return [dict(row) for row in rows]
+
+def newest_data_update(conn):
+    """Latest SciVal "Date last updated" across every researcher's latest export - the current data release"""
+    row = conn.execute(
+        'SELECT MAX(d.date_last_updated) FROM latest_downloads l JOIN downloads d ON d.download_id = l.download_id'
+    ).fetchone()
+    return row[0]
+
+def download_history(conn, researcher_name):
+    """Every distinct export content cataloged for a researcher, newest first"""
+    rows = conn.execute(
+        'SELECT * FROM downloads WHERE researcher_name = ? ORDER BY cataloged_at DESC, download_id DESC',
+        (researcher_name,)
+    )
+    return [dict(row) for row in rows]
+
+def is_unchanged(conn, researcher_name, content_hash):
+    """True when content_hash is already the latest cataloged content for the researcher"""
+    latest = latest_download(conn, researcher_name=researcher_name)
+    return bool(latest) and latest['content_hash'] == content_hash
+
+def relocate_files(conn, moved):
+    """Point cataloged files at their new paths after a move - moved maps old path to new path"""
+    with conn:
+        conn.executemany('UPDATE downloads SET file_path = ? WHERE file_path = ?',
+                         ((str(Path(new).resolve()), str(Path(old).resolve())) for old, new in moved.items()))
+
+def is_processed(conn, consumer, download_id):
+    """True when consumer already handled this exact content"""
+    row = conn.execute('SELECT 1 FROM processed WHERE consumer = ? AND download_id = ?',
+                       (consumer, download_id)).fetchone()
+    return row is not None
+
+def mark_processed(conn, consumer, download_id):
+    """Remember that consumer handled this content so unchanged re-downloads can be skipped"""
+    with conn:
+        conn.execute('INSERT OR REPLACE INTO processed (consumer, download_id, processed_at) VALUES (?, ?, ?)',
+                     (consumer, download_id, datetime.now().isoformat(timespec='seconds')))
+
+def link_scopus_ids(conn, name_to_scopus_id):
+    """Attach Scopus IDs (e.g. from the My SciVal researcher export) to cataloged researchers by display name"""
+    with conn:
+        for researcher_name, scopus_author_id in name_to_scopus_id.items():
+            conn.execute('UPDATE downloads SET scopus_author_id = ? WHERE researcher_name = ?',
+                         (scopus_author_id, researcher_name))
+            conn.execute('UPDATE latest_downloads SET scopus_author_id = ? WHERE researcher_name = ?',
+                         (scopus_author_id, researcher_name))
@@ -0,0 +1,96 @@
+"""Browser-driven downloads for SciVal automation"""
+
+import asyncio
+import re
+from pathlib import Path
+import nodriver as uc
+from config import DOWNLOAD_DIR, DOWNLOAD_TIMEOUT
+
+class DownloadManager:
+    """Saves downloads straight into the download directory and completes on the browser's own events"""
+
+    def __init__(self, browser, download_dir=DOWNLOAD_DIR):
+        self.browser = browser
+        self.download_dir = Path(download_dir).resolve()
+        self._waiters = []    # Expected downloads that have not started yet
+        self._active = {}     # guid -> waiter for downloads in progress
+
+    async def enable(self):
+        """Point the browser's downloads at download_dir and subscribe to download events"""
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        self.browser.add_handler(uc.cdp.browser.DownloadWillBegin, self._on_download_will_begin)
+        self.browser.add_handler(uc.cdp.browser.DownloadProgress, self._on_download_progress)
+        # allowAndName stores each download under its guid, so concurrent downloads never collide
+        await self.browser.send(uc.cdp.browser.set_download_behavior(
+            behavior='allowAndName',
+            download_path=str(self.download_dir),
+            events_enabled=True
+        ))
+        print(f"✅ Downloads will be saved to {self.download_dir}")
+
+    def expect(self, filename_pattern, tab=None, target_dir=None):
+        """Register interest in the next download whose file name matches - call before clicking"""
+        waiter = {
+            'pattern': re.compile(filename_pattern, re.IGNORECASE),
+            'frame_id': str(tab.target.target_id) if tab is not None and tab.target else None,
+            'target_dir': Path(target_dir).resolve() if target_dir else self.download_dir,
+            'filename': None,
+            'future': asyncio.get_running_loop().create_future(),
+        }
+        self._waiters.append(waiter)
+        return waiter
+
+    async def wait(self, waiter, timeout=DOWNLOAD_TIMEOUT):
+        """Wait for an expected download to finish - returns the saved file path or None"""
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter['future']), timeout)
+        except asyncio.TimeoutError:
+            print(f"❌ No download finished within {timeout}s")
+            return None
+        finally:
+            self.cancel(waiter)
+
+    def cancel(self, waiter):
+        """Forget an expected download"""
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+        if not waiter['future'].done():
+            waiter['future'].set_result(None)
+
+    def _on_download_will_begin(self, event, connection=None):
+        """Match a starting download to the waiter registered for its tab (or the oldest matching one)"""
+        candidates = [w for w in self._waiters if w['pattern'].match(event.suggested_filename)]
+        if not candidates:
+            return
+        same_frame = [w for w in candidates if w['frame_id'] == str(event.frame_id)]
+        waiter = (same_frame or candidates)[0]
+        self._waiters.remove(waiter)
+        waiter['filename'] = event.suggested_filename
+        self._active[event.guid] = waiter
+
+    def _on_download_progress(self, event, connection=None):
+        """Resolve the waiter when the browser reports the download finished"""
+        if event.state == 'inProgress':
+            return
+        waiter = self._active.pop(event.guid, None)
+        if not waiter or waiter['future'].done():
+            return
+
+        if event.state != 'completed':
+            print(f"❌ Download of {waiter['filename']} {event.state}")
+            waiter['future'].set_result(None)
+            return
+
+        try:
+            # Rename the guid-named file to the name SciVal suggested (overwriting earlier exports)
+            waiter['target_dir'].mkdir(parents=True, exist_ok=True)
+            target_file = waiter['target_dir'] / waiter['filename']
+            (self.download_dir / event.guid).replace(target_file)
+            waiter['future'].set_result(target_file)
+        except Exception as e:
+            print(f"❌ Could not store download {waiter['filename']}: {e}")
+            waiter['future'].set_result(None)
+
+def get_download_manager(tab):
+    """Return the download manager of the browser that owns tab"""
+    return tab.browser.download_manager
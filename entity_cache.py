@@ -0,0 +1,90 @@
+"""On-disk cache of researcher entity URIs and the collaborators URL pattern"""
+
+import json
+import os
+from pathlib import Path
+from urllib.parse import quote
+from config import ENTITY_CACHE_FILE
+
+URI_PLACEHOLDER = '{uri}'          # URL-encoded entity URI, e.g. Researcher%2F123
+RAW_URI_PLACEHOLDER = '{raw_uri}'  # Entity URI as-is, e.g. Researcher/123
+
+_cache = {'data': None, 'path': ENTITY_CACHE_FILE}
+
+def load_entity_cache(cache_path=ENTITY_CACHE_FILE):
+    """Load the cache once per run - returns {'collaborators_url_template': str|None, 'researchers': {name: uri}}"""
+    if _cache['data'] is not None and _cache['path'] == cache_path:
+        return _cache['data']
+
+    data = {'collaborators_url_template': None, 'researchers': {}}
+    path = Path(cache_path)
+    if path.exists():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data.update(json.load(f))
+            print(f"🗂 Loaded {len(data['researchers'])} cached entity URIs")
+        except Exception as e:
+            print(f"⚠ Could not read entity cache ({e}), starting fresh")
+
+    _cache['data'] = data
+    _cache['path'] = cache_path
+    return data
+
+def save_entity_cache():
+    """Write the cache atomically"""
+    if _cache['data'] is None:
+        return
+    path = Path(_cache['path'])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(_cache['data'], f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def remember_researchers(researchers):
+    """Fill missing URIs from the cache by name and store newly seen ones - updates researchers in place"""
+    cache = load_entity_cache(_cache['path'])
+    changed = False
+    for researcher in researchers:
+        if not researcher.get('uri'):
+            researcher['uri'] = cache['researchers'].get(researcher['name'])
+        elif cache['researchers'].get(researcher['name']) != researcher['uri']:
+            cache['researchers'][researcher['name']] = researcher['uri']
+            changed = True
+    if changed:
+        save_entity_cache()
+    return researchers
+
+def learn_collaborators_url(entity_uri, collaborators_href):
+    """Derive the collaborators URL pattern from one researcher's link - True when a pattern was learned"""
+    if not entity_uri or not collaborators_href:
+        return False
+
+    encoded_uri = quote(entity_uri, safe='')
+    if encoded_uri in collaborators_href:
+        template = collaborators_href.replace(encoded_uri, URI_PLACEHOLDER)
+    elif entity_uri in collaborators_href:
+        template = collaborators_href.replace(entity_uri, RAW_URI_PLACEHOLDER)
+    else:
+        return False
+
+    cache = load_entity_cache(_cache['path'])
+    if cache['collaborators_url_template'] != template:
+        cache['collaborators_url_template'] = template
+        save_entity_cache()
+        print(f"🗂 Learned collaborators URL pattern: {template}")
+    return True
+
+def collaborators_url(entity_uri):
+    """Direct collaborators URL of an entity, or None until the pattern has been learned"""
+    template = load_entity_cache(_cache['path'])['collaborators_url_template']
+    if not entity_uri or not template:
+        return None
+    return template.replace(URI_PLACEHOLDER, quote(entity_uri, safe='')).replace(RAW_URI_PLACEHOLDER, entity_uri)
+
+def forget_collaborators_url():
+    """Drop a pattern that no longer leads to the collaborators page"""
+    cache = load_entity_cache(_cache['path'])
+    if cache['collaborators_url_template']:
+        cache['collaborators_url_template'] = None
+        save_entity_cache()
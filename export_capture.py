@@ -0,0 +1,102 @@
+"""In-memory capture of SciVal export responses through the DevTools Fetch domain"""
+
+import asyncio
+import base64
+import re
+from pathlib import Path
+from urllib.parse import unquote
+import nodriver as uc
+from config import DOWNLOAD_TIMEOUT
+
+FALLBACK_EXPORT_NAME = 'SciVal_export.csv'  # Used when the Content-Disposition name has no usable file name
+
+class ExportCapture:
+    """Intercepts the next export response on a tab and keeps its bytes instead of downloading them
+
+    Use as an async context manager around the export click:
+
+        async with ExportCapture(tab, r'^mySciVal_Researchers_Export.*\\.csv$') as capture:
+            await csv_button.click()
+            captured = await capture.wait()
+    """
+
+    def __init__(self, tab, filename_pattern):
+        self.tab = tab
+        self.pattern = re.compile(filename_pattern, re.IGNORECASE)
+        self._future = None
+
+    async def __aenter__(self):
+        self._future = asyncio.get_running_loop().create_future()
+        self.tab.add_handler(uc.cdp.fetch.RequestPaused, self._on_request_paused)
+        # Only responses are paused, and only while the context is open
+        await self.tab.send(uc.cdp.fetch.enable(patterns=[
+            uc.cdp.fetch.RequestPattern(url_pattern='*', request_stage=uc.cdp.fetch.RequestStage.RESPONSE)
+        ]))
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            await self.tab.send(uc.cdp.fetch.disable())
+        finally:
+            self.tab.remove_handler(uc.cdp.fetch.RequestPaused, self._on_request_paused)
+            if not self._future.done():
+                self._future.set_result(None)
+
+    async def wait(self, timeout=DOWNLOAD_TIMEOUT):
+        """Wait for the export response - returns {'filename': str, 'data': bytes} or None"""
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._future), timeout)
+        except asyncio.TimeoutError:
+            print(f"❌ No export response captured within {timeout}s")
+            return None
+
+    async def _on_request_paused(self, event, connection=None):
+        """Keep the body of a matching attachment response and abort it so no download starts"""
+        try:
+            filename = self._attachment_filename(event.response_headers or [])
+            if self._future.done() or not filename or not self.pattern.match(filename):
+                await self.tab.send(uc.cdp.fetch.continue_request(request_id=event.request_id))
+                return
+
+            body, base64_encoded = await self.tab.send(uc.cdp.fetch.get_response_body(request_id=event.request_id))
+            data = base64.b64decode(body) if base64_encoded else body.encode('utf-8')
+            await self.tab.send(uc.cdp.fetch.fail_request(
+                request_id=event.request_id,
+                error_reason=uc.cdp.network.ErrorReason.ABORTED
+            ))
+            print(f"✅ Captured {filename} in memory ({len(data)} bytes)")
+            self._future.set_result({'filename': filename, 'data': data})
+
+        except Exception as e:
+            print(f"⚠ Error handling intercepted response: {e}")
+            try:
+                await self.tab.send(uc.cdp.fetch.continue_request(request_id=event.request_id))
+            except Exception:
+                pass
+
+    @staticmethod
+    def _attachment_filename(headers):
+        """Return the file name from a Content-Disposition attachment header, if any"""
+        for header in headers:
+            if header.name.lower() != 'content-disposition':
+                continue
+            match = re.search(r"filename\*=(?:UTF-8'')?([^;]+)|filename=\"?([^\";]+)\"?", header.value, re.IGNORECASE)
+            if match:
+                return unquote((match.group(1) or match.group(2)).strip())
+        return None
+
+def safe_export_filename(filename):
+    """Last path component of a server-supplied file name (either slash style) - FALLBACK_EXPORT_NAME when none is left"""
+    name = re.split(r'[\\/]', filename or '')[-1].strip()
+    return FALLBACK_EXPORT_NAME if name in ('', '.', '..') else name
+
+def save_captured_export(captured, target_dir):
+    """Write captured export bytes to target_dir - returns the file path"""
+    target_dir = Path(target_dir).resolve()
+    target_dir.mkdir(parents=True, exist_ok=True)
+    # The name comes from the server's Content-Disposition header - never let it leave target_dir
+    target_file = (target_dir / safe_export_filename(captured['filename'])).resolve()
+    if target_file.parent != target_dir:
+        raise ValueError(f"Refusing to write captured export outside {target_dir}: {captured['filename']!r}")
+    target_file.write_bytes(captured['data'])
+    return target_file
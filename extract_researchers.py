@@ -1,136 +1,304 @@
 """Extract information from all researchers - Extended collaborators process"""
 
 import asyncio
-import shutil
-import re
+import json
+import time
+from contextlib import nullcontext
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from config import (
+    PAGE_LOAD_TIMEOUT, OVERVIEW_URL, DOWNLOAD_DIR, EXTRACTION_CONCURRENCY, EXPORT_CAPTURE_MODE,
+    RESUME_EXTRACTION, DIRECT_NAVIGATION, RETRY_MAX_ATTEMPTS, ADAPTIVE_CONCURRENCY, ADAPTIVE_MAX_CONCURRENCY
+)
+from wait_utils import wait_for_selector, wait_for_xpath, wait_for_js, wait_for_network_idle
+from download_manager import get_download_manager
+from export_capture import ExportCapture, save_captured_export
+from checkpoint import load_manifest, record_extraction, is_fresh
+from collaborator_store import consolidate_collaborators
+from download_catalog import catalog_download
+from browser_utils import apply_fast_mode, fast_mode_enabled
+from entity_cache import remember_researchers, learn_collaborators_url, collaborators_url, forget_collaborators_url
+from concurrency import AIMDLimiter
+from telemetry import span, emit
+from retry_queue import record_failure, resolve, pending, classify_exception, wait_before_retry, EXTRACT_FAILED
 
-async def extract_all_researchers_info(tab):
-    """Extract information from all researchers - with extended collaborators workflow"""
-    try:
-        # Step 1: Navigate to overview page
-        overview_url = "https://www-scival-com.ezproxy.cityu.edu.hk/overview/summary?uri=Institution%2F205002"
-        await tab.get(overview_url)
-        await asyncio.sleep(5)
-        print("✅ Navigated to overview summary page")
+COLLABORATORS_LINK_XPATH = '//a[normalize-space()="Current collaborators (Authors)"]'
+COLLABORATORS_FILE_PATTERN = r'^Authors_collaborating_with_.*\.csv$'
+
+async def open_researcher_list(tab, expected_count=1):
+    """Open the entity list panel filtered to researchers - returns the number of list items"""
+    # Step 2: Click toggle button
+    toggle_btn = await tab.select('#entityListToggleBtn')
+    await toggle_btn.click()
+    print("✅ Entity list toggle button clicked")
+    if not await wait_for_selector(tab, 'label[for="entityFilter_researchers"]', visible=True):
+        raise TimeoutError("researchers filter did not appear in the entity list panel")
+    
+    # Step 3: Check researchers radio button
+    researchers_radio = await tab.select('label[for="entityFilter_researchers"]')
+    await researchers_radio.click()
+    print("✅ Researchers radio button selected")
+    if not await wait_for_js(
+        tab,
+        f"document.querySelectorAll('#entityListPanel li').length >= {expected_count}",
+        description="researcher list to load"
+    ):
+        # An empty account never reaches expected_count - the count below tells callers what is there
+        print(f"⚠ Researcher list shows fewer than {expected_count} entries")
+    if not await wait_for_network_idle(tab):
+        raise TimeoutError("researcher list did not finish loading")
+    
+    # Step 4: Get researcher count using XPath
+    researcher_count = await tab.evaluate("""
+        (function() {
+            try {
+                const xpath = '//div[@id="entityListPanel"]//li';
+                const result = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                return result.snapshotLength;
+            } catch (error) {
+                console.error('XPath evaluation error:', error);
+                return 0;
+            }
+        })()
+    """)
+    
+    print(f"XPath '//div[@id=\"entityListPanel\"]//li' found {researcher_count} researchers")
+    return researcher_count or 0
+
+# Reads every researcher in the list panel at once: position, display name and entity URI
+# (from data attributes or a uri= link, null when the panel does not expose one)
+ENTITY_LIST_JS = """
+    (function() {
+        const items = document.querySelectorAll('#entityListPanel li');
+        return JSON.stringify(Array.from(items, (li, index) => {
+            const holder = li.querySelector('[data-uri], [data-entity-uri], [data-entityuri]') || li;
+            let uri = li.dataset.uri || li.dataset.entityUri || li.dataset.entityuri ||
+                      holder.dataset.uri || holder.dataset.entityUri || holder.dataset.entityuri || null;
+            const link = li.querySelector('a[href*="uri="]');
+            if (!uri && link) {
+                uri = new URL(link.href, location.href).searchParams.get('uri');
+            }
+            return {
+                position: index + 1,
+                name: li.innerText.trim().split('\\n')[0] || `researcher_${index + 1}`,
+                uri: uri
+            };
+        }));
+    })()
+"""
+
+_entity_list = {'researchers': None}  # Enumerated once per run - cleared by reset_researcher_list()
+
+def reset_researcher_list():
+    """Forget the enumerated researchers so the next enumerate_researchers() reads the live list
+
+    Call this when a run (workflow, shard run, daemon job) starts, so a long-lived process never
+    works from a list that predates later imports.
+    """
+    _entity_list['researchers'] = None
+
+async def enumerate_researchers(tab, refresh=False):
+    """List all researchers (position, name, entity URI) in a single evaluate - cached for the run"""
+    if _entity_list['researchers'] is not None and not refresh:
+        return _entity_list['researchers']
+    
+    # Step 1: Navigate to overview page
+    await tab.get(OVERVIEW_URL)
+    if not await wait_for_selector(tab, '#entityListToggleBtn', timeout=PAGE_LOAD_TIMEOUT):
+        raise TimeoutError("overview page did not load")
+    print("✅ Navigated to overview summary page")
+    
+    if await open_researcher_list(tab) == 0:
+        return []
+    
+    entries = await tab.evaluate(ENTITY_LIST_JS)
+    researchers = remember_researchers(json.loads(entries) if isinstance(entries, str) else [])
+    _entity_list['researchers'] = researchers
+    print(f"📋 Listed {len(researchers)} researchers ({sum(1 for r in researchers if r['uri'])} with entity URIs)")
+    return researchers
+
+def entity_summary_url(entity_uri):
+    """Overview summary URL of one entity - OVERVIEW_URL with its uri parameter replaced"""
+    parts = urlsplit(OVERVIEW_URL)
+    query = dict(parse_qsl(parts.query))
+    query['uri'] = entity_uri
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+async def click_researcher_in_list(tab, position):
+    """Fallback for researchers without an entity URI - reopen the list panel and click the researcher's button"""
+    await tab.get(OVERVIEW_URL)
+    if not await wait_for_selector(tab, '#entityListToggleBtn', timeout=PAGE_LOAD_TIMEOUT):
+        raise TimeoutError("overview page did not load")
+    await open_researcher_list(tab, expected_count=position)
+    
+    # Click the button inside the li element using XPath
+    return await tab.evaluate(f"""
+        (function() {{
+            try {{
+                const xpath = '//div[@id="entityListPanel"]//li[{position}]';
+                const result = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null);
+                const li = result.singleNodeValue;
+                
+                if (li) {{
+                    const button = li.querySelector('button');
+                    if (button) {{
+                        button.click();
+                        return true;
+                    }}
+                }}
+                return false;
+            }} catch (error) {{
+                console.error('Error clicking button:', error);
+                return false;
+            }}
+        }})()
+    """)
+
+async def open_collaborators_via_summary(tab, researcher):
+    """Reach the collaborators view through the researcher's summary page, learning the URL pattern on the way"""
+    position = researcher['position']
+    if researcher.get('uri'):
+        # Straight to the researcher's summary page - no list panel round trip
+        await tab.get(entity_summary_url(researcher['uri']))
+        print(f"✅ Opened researcher {position} summary")
+    elif await click_researcher_in_list(tab, position):
+        print(f"✅ Clicked researcher {position} button")
+    else:
+        print(f"❌ No button found in researcher {position}")
+        return False
+    
+    if not await wait_for_xpath(tab, COLLABORATORS_LINK_XPATH, timeout=PAGE_LOAD_TIMEOUT):
+        print(f"❌ Summary page of researcher {position} has no 'Current collaborators (Authors)' link")
+        return False
+    
+    # Click collaborators link using JavaScript evaluation
+    collaborators_href = await tab.evaluate("""
+        (function() {
+            try {
+                const xpath = '//a[normalize-space()="Current collaborators (Authors)"]';
+                const result = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null);
+                const link = result.singleNodeValue;
+                
+                if (link) {
+                    const href = link.href || '';
+                    link.click();
+                    return href || 'clicked';
+                }
+                return '';
+            } catch (error) {
+                console.error('Error clicking collaborators link:', error);
+                return '';
+            }
+        })()
+    """)
+    
+    if not collaborators_href or not isinstance(collaborators_href, str):
+        print("❌ Could not find collaborators link")
+        return False
+    
+    print("✅ Clicked Current collaborators link")
+    if DIRECT_NAVIGATION:
+        learn_collaborators_url(researcher.get('uri'), collaborators_href)
+    return True
+
+async def process_researcher(tab, researcher, custom_download_path, manifest, force=False):
+    """Open one enumerated researcher and download their collaborators - returns 'done', 'skipped' or 'failed'"""
+    researcher_name = researcher['name']
+    position = researcher['position']
+    if RESUME_EXTRACTION and not force and is_fresh(manifest, researcher_name):
+        print(f"⏭ Skipping {researcher_name} - extracted recently")
+        return 'skipped'
+    
+    with span('extract.navigate', researcher=researcher_name) as step:
+        opened = False
+        direct_url = collaborators_url(researcher.get('uri')) if DIRECT_NAVIGATION else None
+        if direct_url:
+            # Learned URL pattern - skip the summary page entirely
+            step['route'] = 'direct'
+            await tab.get(direct_url)
+            opened = await wait_for_selector(tab, 'span[id="authorCountSel-button"]', timeout=PAGE_LOAD_TIMEOUT)
+            if opened:
+                print(f"✅ Opened collaborators of researcher {position} directly")
+            else:
+                print("⚠ Direct collaborators URL did not load, falling back to the summary page")
+                forget_collaborators_url()
         
-        # Step 2: Click toggle button
-        toggle_btn = await tab.select('#entityListToggleBtn')
-        await toggle_btn.click()
-        print("✅ Entity list toggle button clicked")
-        await asyncio.sleep(3)
+        if not opened:
+            step['route'] = 'summary'
+            if not await open_collaborators_via_summary(tab, researcher):
+                step['outcome'] = 'failed'
+                return 'failed'
+            
+            print("⏳ Waiting for collaborators page to load...")
+            if not await wait_for_selector(tab, 'span[id="authorCountSel-button"]', timeout=PAGE_LOAD_TIMEOUT):
+                print("❌ Collaborators page did not load")
+                step['outcome'] = 'failed'
+                return 'failed'
         
-        # Step 3: Check researchers radio button
-        researchers_radio = await tab.select('label[for="entityFilter_researchers"]')
-        await researchers_radio.click()
-        print("✅ Researchers radio button selected")
-        await asyncio.sleep(3)
+        if not await wait_for_network_idle(tab, timeout=PAGE_LOAD_TIMEOUT):
+            print("❌ Collaborators page did not finish loading")
+            step['outcome'] = 'failed'
+            return 'failed'
+    
+    # Extended collaborators workflow
+    downloaded_file = await process_collaborators_page(tab, custom_download_path, researcher_name)
+    if downloaded_file is None:
+        return 'failed'
+    
+    record_extraction(manifest, researcher_name, downloaded_file, position=position)
+    catalog_download(downloaded_file, researcher)
+    return 'done'
+
+async def extract_with_retry(tab, researcher, custom_download_path, manifest, force=False, limiter=None):
+    """process_researcher with bounded backoff retries - a researcher that keeps failing goes to the retry queue"""
+    for attempt in range(1, RETRY_MAX_ATTEMPTS + 1):
+        error = None
+        started = time.perf_counter()
+        try:
+            status = await process_researcher(tab, researcher, custom_download_path, manifest, force)
+            reason = EXTRACT_FAILED
+        except Exception as e:
+            print(f"❌ Error processing researcher {researcher['position']}: {e}")
+            status, reason, error = 'failed', classify_exception(e), e
         
-        # Step 4: Get researcher count using XPath
-        researcher_count = await tab.evaluate("""
-            (function() {
-                try {
-                    const xpath = '//div[@id="entityListPanel"]//li';
-                    const result = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
-                    return result.snapshotLength;
-                } catch (error) {
-                    console.error('XPath evaluation error:', error);
-                    return 0;
-                }
-            })()
-        """)
+        # Every attempt is a latency/error sample for the adaptive pool (skips never touched the site)
+        if limiter and status != 'skipped':
+            await limiter.record(status == 'done', time.perf_counter() - started, started)
         
-        print(f"XPath '//div[@id=\"entityListPanel\"]//li' found {researcher_count} researchers")
+        if status != 'failed':
+            resolve('extract', researcher['name'])
+            return status
+        if attempt < RETRY_MAX_ATTEMPTS:
+            await wait_before_retry(attempt, researcher['name'])
+    
+    record_failure('extract', researcher['name'], reason, payload=researcher, error=error, attempts=RETRY_MAX_ATTEMPTS)
+    return 'failed'
+
+async def extract_all_researchers_info(tab):
+    """Extract information from all researchers - with extended collaborators workflow"""
+    try:
+        researchers = await enumerate_researchers(tab)
         
-        if researcher_count == 0:
+        if not researchers:
             print("❌ No researchers found")
             return []
         
         # Custom download folder
-        custom_download_path = Path("./scival_downloads").resolve()
+        custom_download_path = Path(DOWNLOAD_DIR).resolve()
         custom_download_path.mkdir(exist_ok=True)
-        system_downloads = Path.home() / "Downloads"
+        manifest = load_manifest()
         
         # Step 5: Iterate through each researcher
-        for i in range(researcher_count):
-            print(f"\n--- Processing Researcher {i+1}/{researcher_count} ---")
+        for researcher in researchers:
+            print(f"\n--- Processing Researcher {researcher['position']}/{len(researchers)}: {researcher['name']} ---")
             
             try:
-                # Click the button inside the li element using XPath
-                button_clicked = await tab.evaluate(f"""
-                    (function() {{
-                        try {{
-                            const xpath = '//div[@id="entityListPanel"]//li[{i+1}]';
-                            const result = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null);
-                            const li = result.singleNodeValue;
-                            
-                            if (li) {{
-                                const button = li.querySelector('button');
-                                if (button) {{
-                                    button.click();
-                                    return true;
-                                }}
-                            }}
-                            return false;
-                        }} catch (error) {{
-                            console.error('Error clicking button:', error);
-                            return false;
-                        }}
-                    }})()
-                """)
-                
-                if button_clicked:
-                    print(f"✅ Clicked researcher {i+1} button")
-                else:
-                    print(f"❌ No button found in researcher {i+1}")
-                    continue
-                
-                await asyncio.sleep(3)
-                
-                # Click collaborators link using JavaScript evaluation
-                collaborators_clicked = await tab.evaluate("""
-                    (function() {
-                        try {
-                            const xpath = '//a[normalize-space()="Current collaborators (Authors)"]';
-                            const result = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null);
-                            const link = result.singleNodeValue;
-                            
-                            if (link) {
-                                link.click();
-                                return true;
-                            }
-                            return false;
-                        } catch (error) {
-                            console.error('Error clicking collaborators link:', error);
-                            return false;
-                        }
-                    })()
-                """)
-                
-                if collaborators_clicked:
-                    print("✅ Clicked Current collaborators link")
-                    
-                    # Wait longer for loading as requested
-                    print("⏳ Waiting longer for collaborators page to load...")
-                    await asyncio.sleep(10)
-                    
-                    # Extended collaborators workflow
-                    await process_collaborators_page(tab, system_downloads, custom_download_path)
-                    
-                else:
-                    print("❌ Could not find collaborators link")
-                
-                # Navigate back to list
-                toggle_btn = await tab.select('#entityListToggleBtn')
-                await toggle_btn.click()
-                await asyncio.sleep(2)
-                
-                researchers_radio = await tab.select('label[for="entityFilter_researchers"]')
-                await researchers_radio.click()
-                await asyncio.sleep(3)
+                with span('extract.researcher', researcher_index=researcher['position']) as researcher_span:
+                    status = await extract_with_retry(tab, researcher, custom_download_path, manifest)
+                    researcher_span['outcome'] = status
                 
             except Exception as e:
-                print(f"❌ Error processing researcher {i+1}: {e}")
+                print(f"❌ Error processing researcher {researcher['position']}: {e}")
                 continue
         
         print(f"\n🎉 Iteration complete!")
@@ -140,262 +308,450 @@ async def extract_all_researchers_info(tab):
         print(f"❌ Error in extract_all_researchers_info: {e}")
         return []
 
-async def process_collaborators_page(tab, system_downloads, custom_download_path):
-    """Process the collaborators page with BOTH programmatic change AND visual click"""
+async def extraction_worker(worker_id, browser, queue, results, custom_download_path, manifest, limiter=None):
+    """Process enumerated researchers from the shared queue in a dedicated tab (opened on first use)"""
+    tab = None
     try:
-        # Step 1: Click span[id="authorCountSel-button"] span[class="ui-selectmenu-text"]
-        print("🔸 Step 1: Clicking author count selector...")
-        try:
-            author_count_selector = await tab.select('span[id="authorCountSel-button"] span[class="ui-selectmenu-text"]')
-            await author_count_selector.click()
-            print("✅ Author count selector clicked")
-        except Exception as e:
-            print(f"❌ Failed to click author count selector: {e}")
-            return
+        while not queue.empty():
+            # With a limiter, only limiter.limit workers hold a researcher at any time
+            async with (limiter.slot() if limiter else nullcontext()):
+                try:
+                    researcher = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                
+                status = 'failed'
+                try:
+                    if tab is None:
+                        # Open blank first so resource blocking is active before SciVal loads
+                        tab = await browser.get('about:blank', new_tab=True)
+                        await apply_fast_mode(tab, enabled=fast_mode_enabled(browser))
+                        print(f"✅ Worker {worker_id}: tab ready")
+                    
+                    print(f"\n--- Worker {worker_id}: Processing Researcher {researcher['position']}: {researcher['name']} ---")
+                    with span('extract.researcher', researcher_index=researcher['position'], worker=worker_id) as researcher_span:
+                        if limiter:
+                            researcher_span['concurrency_limit'] = limiter.limit
+                        status = await extract_with_retry(tab, researcher, custom_download_path, manifest, limiter=limiter)
+                        researcher_span['outcome'] = status
+                except Exception as e:
+                    print(f"❌ Worker {worker_id}: error processing researcher {researcher['position']}: {e}")
+                    if tab is None:
+                        # No tab could be opened - hand the researcher back and stop this worker
+                        queue.put_nowait(researcher)
+                        queue.task_done()
+                        raise
+                results[status].append(researcher['position'])
+                queue.task_done()
         
-        # Wait for dropdown to appear
-        print("⏳ Waiting for dropdown to appear...")
-        await asyncio.sleep(3)
+    except Exception as e:
+        # A dead tab only stops this worker; the remaining workers keep draining the queue
+        print(f"❌ Worker {worker_id} stopped: {e}")
+    finally:
+        if tab:
+            try:
+                await tab.close()
+            except Exception as close_error:
+                print(f"Error closing worker tab: {close_error}")
+
+def create_limiter(concurrency, name='extract'):
+    """AIMD limiter starting at concurrency, or None when ADAPTIVE_CONCURRENCY is off"""
+    return AIMDLimiter(concurrency, maximum=max(concurrency, ADAPTIVE_MAX_CONCURRENCY), name=name) if ADAPTIVE_CONCURRENCY else None
+
+def report_limiter(limiter):
+    """Emit and print how the adaptive limit moved during the run"""
+    if not limiter:
+        return
+    summary = limiter.summary()
+    emit('concurrency_summary', **summary)
+    print(f"   Concurrency: {summary['final']} at the end (range {summary['min']}-{summary['max']}, {summary['changes']} changes)")
+
+async def extract_researchers_parallel(browser, tab, concurrency=EXTRACTION_CONCURRENCY):
+    """Extract all researchers with a pool of tabs sharing the logged-in session"""
+    try:
+        # Enumerate researchers once in the authenticated tab
+        researchers = await enumerate_researchers(tab)
         
-        # Step 2A: VISUAL CLICK - Show the user the dropdown interaction
-        print("🔸 Step 2A: Visual click for user feedback...")
+        if not researchers:
+            print("❌ No researchers found")
+            return []
         
-        visual_click_done = await tab.evaluate("""
-            (function() {
-                try {
-                    // Find the visual menu item by text content for user to see
-                    const menuItems = document.querySelectorAll('.ui-menu-item-wrapper');
-                    
-                    for (let item of menuItems) {
-                        const text = item.textContent.trim();
-                        
-                        // Look for "< = 10 authors" text
-                        if (text.includes('10 authors')) {
-                            console.log('Visually clicking option:', text);
-                            
-                            // Visual click for user feedback
-                            item.focus();
-                            item.click();
-                            
-                            // Dispatch visual mouse events
-                            item.dispatchEvent(new MouseEvent('mousedown', { bubbles: true }));
-                            item.dispatchEvent(new MouseEvent('mouseup', { bubbles: true }));
-                            item.dispatchEvent(new MouseEvent('click', { bubbles: true }));
-                            
-                            return true;
-                        }
-                    }
-                    return false;
-                } catch (error) {
-                    console.error('Error with visual click:', error);
-                    return false;
-                }
-            })()
-        """)
+        custom_download_path = Path(DOWNLOAD_DIR).resolve()
+        custom_download_path.mkdir(exist_ok=True)
+        
+        queue = asyncio.Queue()
+        for researcher in researchers:
+            queue.put_nowait(researcher)
         
-        if visual_click_done:
-            print("✅ Visual click completed for user feedback")
-        else:
-            print("⚠ Visual click failed, but will proceed with programmatic change")
+        results = {'done': [], 'skipped': [], 'failed': []}
+        manifest = load_manifest()
+        limiter = create_limiter(concurrency)
+        # The limiter decides how many tabs are busy; spare workers only open a tab once the limit grows
+        worker_count = max(1, min(limiter.maximum if limiter else concurrency, len(researchers)))
+        print(f"🚀 Extracting {len(researchers)} researchers with up to {worker_count} tabs")
         
-        await asyncio.sleep(1)
+        await asyncio.gather(*[
+            extraction_worker(n + 1, browser, queue, results, custom_download_path, manifest, limiter)
+            for n in range(worker_count)
+        ])
         
-        # Step 2B: PROGRAMMATIC CHANGE - Ensure the value actually changes
-        print("🔸 Step 2B: Programmatic value change (ensuring it works)...")
+        # Researchers left behind by workers whose tab died
+        unprocessed = []
+        while not queue.empty():
+            unprocessed.append(queue.get_nowait())
         
-        dropdown_changed = await tab.evaluate("""
-            (function() {
-                try {
-                    // Target the specific select element #authorCountSel
-                    const selectElement = document.querySelector('#authorCountSel');
+        print(f"\n🎉 Parallel extraction complete!")
+        print(f"   Successful: {len(results['done'])}")
+        print(f"   Skipped (fresh checkpoint): {len(results['skipped'])}")
+        print(f"   Failed: {len(results['failed'])}")
+        if unprocessed:
+            print(f"   Not processed (all tabs failed): {len(unprocessed)}")
+        report_limiter(limiter)
+        return results['done']
+        
+    except Exception as e:
+        print(f"❌ Error in extract_researchers_parallel: {e}")
+        return []
+
+async def show_author_count_dropdown(tab):
+    """Open the author count dropdown and click the 10-authors option so an operator can follow along - visual only"""
+    # Step 1: Click span[id="authorCountSel-button"] span[class="ui-selectmenu-text"]
+    print("🔸 Step 1: Clicking author count selector...")
+    try:
+        author_count_selector = await tab.select('span[id="authorCountSel-button"] span[class="ui-selectmenu-text"]')
+        await author_count_selector.click()
+        print("✅ Author count selector clicked")
+    except Exception as e:
+        print(f"❌ Failed to click author count selector: {e}")
+        return False
+    
+    # Wait for dropdown to appear
+    print("⏳ Waiting for dropdown to appear...")
+    if not await wait_for_selector(tab, '.ui-menu-item-wrapper', visible=True):
+        # Only the visual step is lost - 2B still sets the value programmatically
+        print("⚠ Dropdown did not open, skipping the visual click")
+        return True
+    
+    # Step 2A: VISUAL CLICK - Show the user the dropdown interaction
+    print("🔸 Step 2A: Visual click for user feedback...")
+    
+    visual_click_done = await tab.evaluate("""
+        (function() {
+            try {
+                // Find the visual menu item by text content for user to see
+                const menuItems = document.querySelectorAll('.ui-menu-item-wrapper');
+                
+                for (let item of menuItems) {
+                    const text = item.textContent.trim();
                     
-                    if (selectElement) {
-                        console.log('Found #authorCountSel select element');
-                        console.log('Current value:', selectElement.value);
+                    // Look for "< = 10 authors" text
+                    if (text.includes('10 authors')) {
+                        console.log('Visually clicking option:', text);
                         
-                        // Check if option[value="10"] exists
-                        const targetOption = selectElement.querySelector('option[value="10"]');
-                        if (targetOption) {
-                            console.log('Found option[value="10"]:', targetOption.text);
-                            
-                            // Set the select element value to "10"
-                            selectElement.value = '10';
-                            
-                            // Mark the option as selected
-                            targetOption.selected = true;
-                            
-                            console.log('Set select value to "10" and marked option as selected');
-                            
-                            // Trigger change events on the select element
-                            selectElement.dispatchEvent(new Event('change', { bubbles: true }));
-                            selectElement.dispatchEvent(new Event('input', { bubbles: true }));
-                            
-                            // Trigger the jQuery UI selectmenu update
-                            if (window.jQuery && window.jQuery.fn.selectmenu) {
-                                try {
-                                    window.jQuery('#authorCountSel').selectmenu('refresh');
-                                    console.log('jQuery selectmenu refreshed');
-                                } catch (e) {
-                                    console.log('jQuery selectmenu refresh failed:', e.message);
-                                }
-                            }
+                        // Visual click for user feedback
+                        item.focus();
+                        item.click();
+                        
+                        // Dispatch visual mouse events
+                        item.dispatchEvent(new MouseEvent('mousedown', { bubbles: true }));
+                        item.dispatchEvent(new MouseEvent('mouseup', { bubbles: true }));
+                        item.dispatchEvent(new MouseEvent('click', { bubbles: true }));
+                        
+                        return true;
+                    }
+                }
+                return false;
+            } catch (error) {
+                console.error('Error with visual click:', error);
+                return false;
+            }
+        })()
+    """)
+    
+    if visual_click_done:
+        print("✅ Visual click completed for user feedback")
+    else:
+        print("⚠ Visual click failed, but will proceed with programmatic change")
+    return True
+
+async def author_count_applied(tab):
+    """True when #authorCountSel already has the 10-authors option selected"""
+    applied = await tab.evaluate("(select => !!select && select.value === '10')(document.querySelector('#authorCountSel'))")
+    return applied is True
+
+async def process_collaborators_page(tab, custom_download_path, researcher=None):
+    """Process the collaborators page with BOTH programmatic change AND visual click - returns the downloaded file or None"""
+    try:
+        with span('extract.dropdown', researcher=researcher) as step:
+            # SciVal remembers the last author-count choice, so later researchers usually open with it applied
+            if await author_count_applied(tab):
+                print("✅ Author count already set to option[value='10']")
+                step['outcome'] = 'already_set'
+            else:
+                # Steps 1 and 2A only show the change to a watching operator; fast mode goes straight to 2B
+                if fast_mode_enabled(tab.browser):
+                    if not await wait_for_selector(tab, '#authorCountSel'):
+                        print("❌ Author count selector did not appear")
+                        step['outcome'] = 'failed'
+                        return None
+                elif not await show_author_count_dropdown(tab):
+                    step['outcome'] = 'failed'
+                    return None
+                
+                # Step 2B: PROGRAMMATIC CHANGE - Ensure the value actually changes
+                print("🔸 Step 2B: Programmatic value change (ensuring it works)...")
+                
+                dropdown_changed = await tab.evaluate("""
+                    (function() {
+                        try {
+                            // Target the specific select element #authorCountSel
+                            const selectElement = document.querySelector('#authorCountSel');
                             
-                            // Execute the data-callback: collaborationTable.changeAuthorCount
-                            const callback = selectElement.getAttribute('data-callback');
-                            if (callback === 'collaborationTable.changeAuthorCount') {
-                                try {
-                                    if (window.collaborationTable && typeof window.collaborationTable.changeAuthorCount === 'function') {
-                                        window.collaborationTable.changeAuthorCount();
-                                        console.log('Executed collaborationTable.changeAuthorCount()');
-                                    } else {
-                                        console.log('collaborationTable.changeAuthorCount function not found');
+                            if (selectElement) {
+                                console.log('Found #authorCountSel select element');
+                                console.log('Current value:', selectElement.value);
+                                
+                                // Check if option[value="10"] exists
+                                const targetOption = selectElement.querySelector('option[value="10"]');
+                                if (targetOption) {
+                                    console.log('Found option[value="10"]:', targetOption.text);
+                                    
+                                    // Set the select element value to "10"
+                                    selectElement.value = '10';
+                                    
+                                    // Mark the option as selected
+                                    targetOption.selected = true;
+                                    
+                                    console.log('Set select value to "10" and marked option as selected');
+                                    
+                                    // Trigger change events on the select element
+                                    selectElement.dispatchEvent(new Event('change', { bubbles: true }));
+                                    selectElement.dispatchEvent(new Event('input', { bubbles: true }));
+                                    
+                                    // Trigger the jQuery UI selectmenu update
+                                    if (window.jQuery && window.jQuery.fn.selectmenu) {
+                                        try {
+                                            window.jQuery('#authorCountSel').selectmenu('refresh');
+                                            console.log('jQuery selectmenu refreshed');
+                                        } catch (e) {
+                                            console.log('jQuery selectmenu refresh failed:', e.message);
+                                        }
+                                    }
+                                    
+                                    // Execute the data-callback: collaborationTable.changeAuthorCount
+                                    const callback = selectElement.getAttribute('data-callback');
+                                    if (callback === 'collaborationTable.changeAuthorCount') {
+                                        try {
+                                            if (window.collaborationTable && typeof window.collaborationTable.changeAuthorCount === 'function') {
+                                                window.collaborationTable.changeAuthorCount();
+                                                console.log('Executed collaborationTable.changeAuthorCount()');
+                                            } else {
+                                                console.log('collaborationTable.changeAuthorCount function not found');
+                                            }
+                                        } catch (e) {
+                                            console.log('Callback execution failed:', e.message);
+                                        }
                                     }
-                                } catch (e) {
-                                    console.log('Callback execution failed:', e.message);
+                                    
+                                    // Close the dropdown visually
+                                    const dropdownMenu = document.querySelector('.ui-selectmenu-menu');
+                                    if (dropdownMenu) {
+                                        dropdownMenu.style.display = 'none';
+                                    }
+                                    
+                                    // Verify the change
+                                    console.log('Final value:', selectElement.value);
+                                    console.log('Option selected:', targetOption.selected);
+                                    
+                                    return true;
+                                } else {
+                                    console.log('option[value="10"] not found in #authorCountSel');
+                                    return false;
                                 }
+                            } else {
+                                console.log('#authorCountSel select element not found');
+                                return false;
                             }
                             
-                            // Close the dropdown visually
-                            const dropdownMenu = document.querySelector('.ui-selectmenu-menu');
-                            if (dropdownMenu) {
-                                dropdownMenu.style.display = 'none';
-                            }
-                            
-                            // Verify the change
-                            console.log('Final value:', selectElement.value);
-                            console.log('Option selected:', targetOption.selected);
-                            
-                            return true;
-                        } else {
-                            console.log('option[value="10"] not found in #authorCountSel');
+                        } catch (error) {
+                            console.error('Error changing dropdown value:', error);
                             return false;
                         }
-                    } else {
-                        console.log('#authorCountSel select element not found');
-                        return false;
-                    }
-                    
-                } catch (error) {
-                    console.error('Error changing dropdown value:', error);
-                    return false;
-                }
-            })()
-        """)
-        
-        if dropdown_changed:
-            print("✅ Dropdown value changed programmatically to option[value='10']")
-            await asyncio.sleep(3)
-        else:
-            print("❌ Could not change dropdown value")
-            return
-        
-        # Step 3: Click div[class="header-wrapper"] button[class="link action-link"]
-        print("🔸 Step 3: Clicking header action link...")
-        try:
-            header_action_link = await tab.select('div[class="header-wrapper"] button[class="link action-link"]')
-            await header_action_link.click()
-            print("✅ Header action link clicked")
-        except Exception as e:
-            print(f"❌ Failed to click header action link: {e}")
-            return
-        
-        await asyncio.sleep(2)
-        
-        # Step 4: Click indexed XPath (//button[@data-format='spreadsheet'])[1]
-        print("🔸 Step 4: Clicking spreadsheet download button...")
-        try:
-            download_clicked = await tab.evaluate("""
-                (function() {
-                    try {
-                        const xpath = "(//button[@data-format='spreadsheet'])[1]";
-                        const result = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null);
-                        const button = result.singleNodeValue;
-                        
-                        if (button) {
-                            button.click();
-                            return true;
-                        }
-                        return false;
-                    } catch (error) {
-                        console.error('Error clicking spreadsheet button:', error);
-                        return false;
-                    }
-                })()
-            """)
-            
-            if download_clicked:
-                print("✅ Spreadsheet download button clicked")
-                
-                # Wait for download and move file
-                print("⏳ Waiting for download to complete...")
-                moved_file = await wait_and_move_collaborators_file(system_downloads, custom_download_path)
+                    })()
+                """)
                 
-                if moved_file:
-                    print(f"✅ File moved to custom folder: {moved_file}")
+                if dropdown_changed:
+                    print("✅ Dropdown value changed programmatically to option[value='10']")
+                    # Changing the author count reloads the collaborators table
+                    if not await wait_for_network_idle(tab):
+                        print("❌ Collaborators table did not reload after changing the author count")
+                        step['outcome'] = 'failed'
+                        return None
                 else:
-                    print("❌ No collaborators file found to move")
-                    
-            else:
-                print("❌ Could not click spreadsheet download button")
+                    print("❌ Could not change dropdown value")
+                    step['outcome'] = 'failed'
+                    return None
+        
+        with span('extract.download', researcher=researcher) as step:
+            # Step 3: Click div[class="header-wrapper"] button[class="link action-link"]
+            print("🔸 Step 3: Clicking header action link...")
+            try:
+                header_action_link = await tab.select('div[class="header-wrapper"] button[class="link action-link"]')
+                await header_action_link.click()
+                print("✅ Header action link clicked")
+            except Exception as e:
+                print(f"❌ Failed to click header action link: {e}")
+                step['outcome'] = 'failed'
+                return None
+            
+            if not await wait_for_xpath(tab, "//button[@data-format='spreadsheet']"):
+                print("❌ Export menu did not offer a spreadsheet download")
+                step['outcome'] = 'failed'
+                return None
+            
+            # Step 4: Click indexed XPath (//button[@data-format='spreadsheet'])[1]
+            print("🔸 Step 4: Clicking spreadsheet download button...")
+            try:
+                downloaded_file = await download_collaborators_file(tab, custom_download_path)
+                if downloaded_file is None:
+                    step['outcome'] = 'failed'
+                return downloaded_file
                 
-        except Exception as e:
-            print(f"❌ Failed to click spreadsheet button: {e}")
+            except Exception as e:
+                print(f"❌ Failed to click spreadsheet button: {e}")
+                step['outcome'] = 'error'
+                return None
         
     except Exception as e:
         print(f"❌ Error in collaborators page processing: {e}")
+        return None
 
-async def wait_and_move_collaborators_file(source_dir, target_dir, max_wait=30):
-    """Wait for Authors_collaborating_with_*.csv file and move it to custom folder"""
-    # Pattern to match: Authors_collaborating_with_[AuthorName].csv
-    pattern = re.compile(r'^Authors_collaborating_with_.*\.csv$', re.IGNORECASE)
-    
-    # Get initial files to detect new ones
-    initial_files = set()
-    if source_dir.exists():
-        for file in source_dir.glob("*.csv"):
-            if pattern.match(file.name):
-                initial_files.add(file.name)
-    
-    print(f"📁 Monitoring {source_dir} for new collaborators CSV files...")
-    
-    for i in range(max_wait):
-        if source_dir.exists():
-            current_files = []
-            for file in source_dir.glob("*.csv"):
-                if pattern.match(file.name):
-                    current_files.append(file)
-            
-            # Find new files
-            new_files = [f for f in current_files if f.name not in initial_files]
+SPREADSHEET_BUTTON_CLICK_JS = """
+    (function() {
+        try {
+            const xpath = "(//button[@data-format='spreadsheet'])[1]";
+            const result = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null);
+            const button = result.singleNodeValue;
             
-            if new_files:
-                # Get the newest file
-                newest_file = max(new_files, key=lambda x: x.stat().st_mtime)
-                
-                # Wait a bit for download to complete
-                await asyncio.sleep(3)
-                
-                # Check if file is ready
-                try:
-                    if newest_file.stat().st_size > 0:
-                        # Move file to custom directory
-                        target_file = target_dir / newest_file.name
-                        shutil.move(str(newest_file), str(target_file))
-                        print(f"✅ Moved {newest_file.name} from Downloads to {target_dir}")
-                        return target_file
-                except Exception as e:
-                    print(f"⚠ File not ready: {e}")
+            if (button) {
+                button.click();
+                return true;
+            }
+            return false;
+        } catch (error) {
+            console.error('Error clicking spreadsheet button:', error);
+            return false;
+        }
+    })()
+"""
+
+async def capture_collaborators_file(tab, custom_download_path):
+    """Click the spreadsheet export, capture the response in memory and write it to custom_download_path"""
+    async with ExportCapture(tab, COLLABORATORS_FILE_PATTERN) as capture:
+        if not await tab.evaluate(SPREADSHEET_BUTTON_CLICK_JS):
+            print("❌ Could not click spreadsheet download button")
+            return None
+        print("✅ Spreadsheet download button clicked (capture mode)")
+        captured = await capture.wait()
+    
+    if not captured:
+        print("❌ No collaborators export captured")
+        return None
+    
+    saved_file = save_captured_export(captured, custom_download_path)
+    print(f"✅ File saved to custom folder: {saved_file}")
+    return saved_file
+
+async def download_collaborators_file(tab, custom_download_path):
+    """Click the spreadsheet export and wait for the collaborators file - returns the saved file or None"""
+    if EXPORT_CAPTURE_MODE:
+        return await capture_collaborators_file(tab, custom_download_path)
+    
+    # Downloads are matched to the tab that started them, so parallel tabs never pick up each other's file
+    download_manager = get_download_manager(tab)
+    expected_download = download_manager.expect(COLLABORATORS_FILE_PATTERN, tab, custom_download_path)
+    
+    download_clicked = await tab.evaluate(SPREADSHEET_BUTTON_CLICK_JS)
+    
+    if not download_clicked:
+        download_manager.cancel(expected_download)
+        print("❌ Could not click spreadsheet download button")
+        return None
+    
+    print("✅ Spreadsheet download button clicked")
+    
+    # Wait for the browser to report the download finished
+    print("⏳ Waiting for download to complete...")
+    downloaded_file = await download_manager.wait(expected_download)
+    
+    if downloaded_file:
+        print(f"✅ File saved to custom folder: {downloaded_file}")
+    else:
+        print("❌ No collaborators file downloaded")
+    return downloaded_file
+
+async def retry_failed_extractions(tab):
+    """Extract only the researchers waiting in the retry queue"""
+    queued = pending('extract')
+    if not queued:
+        print("🔁 No queued extractions")
+        return []
+    
+    # Positions and URIs may have changed since the failure - prefer the current list entry
+    current = {researcher['name']: researcher for researcher in await enumerate_researchers(tab)}
+    custom_download_path = Path(DOWNLOAD_DIR).resolve()
+    custom_download_path.mkdir(exist_ok=True)
+    manifest = load_manifest()
+    
+    print(f"🔁 Retrying {len(queued)} queued extractions")
+    done = []
+    for entry in queued:
+        researcher = current.get(entry['key']) or entry.get('payload')
+        if not researcher:
+            print(f"⚠ {entry['key']} is no longer in the researcher list")
+            continue
         
-        if i % 5 == 0:
-            print(f"Still waiting for collaborators file... ({i}/{max_wait}s)")
+        with span('extract.researcher', researcher_index=researcher['position'], retry=True) as researcher_span:
+            status = await extract_with_retry(tab, researcher, custom_download_path, manifest)
+            researcher_span['outcome'] = status
+        if status == 'done':
+            done.append(researcher['name'])
+    
+    consolidate_collaborators()
+    return done
+
+async def extract_selected_researchers(tab, names, force=True):
+    """Extract only the named researchers (case-insensitive) - returns {'done', 'skipped', 'failed', 'unknown'} name lists"""
+    current = {researcher['name'].casefold(): researcher for researcher in await enumerate_researchers(tab)}
+    custom_download_path = Path(DOWNLOAD_DIR).resolve()
+    custom_download_path.mkdir(exist_ok=True)
+    manifest = load_manifest()
+    
+    results = {'done': [], 'skipped': [], 'failed': [], 'unknown': []}
+    for name in names:
+        researcher = current.get(name.strip().casefold())
+        if not researcher:
+            print(f"⚠ {name} is not in the researcher list")
+            results['unknown'].append(name)
+            continue
         
-        await asyncio.sleep(1)
+        with span('extract.researcher', researcher_index=researcher['position'], selected=True) as researcher_span:
+            status = await extract_with_retry(tab, researcher, custom_download_path, manifest, force)
+            researcher_span['outcome'] = status
+        results[status].append(researcher['name'])
     
-    print("❌ No new collaborators CSV file detected")
-    return None
+    if results['done']:
+        consolidate_collaborators()
+    return results
 
-async def run_extraction(tab):
-    """Run the extraction process"""
+async def run_extraction(tab, browser=None):
+    """Run the extraction process - uses a tab pool when EXTRACTION_CONCURRENCY > 1"""
     print("=== STARTING RESEARCHER EXTRACTION ===")
-    await extract_all_researchers_info(tab)
+    if browser and EXTRACTION_CONCURRENCY > 1:
+        await extract_researchers_parallel(browser, tab, EXTRACTION_CONCURRENCY)
+    else:
+        await extract_all_researchers_info(tab)
+    
+    # Fold the new exports into the consolidated store for downstream analysis
+    consolidate_collaborators()
     return []
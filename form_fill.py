@@ -0,0 +1,71 @@
+"""Fill form fields through the DevTools input domain instead of per-character JavaScript loops"""
+
+import json
+import nodriver as uc
+
+# Focus the field and clear it through the native value setter so framework-bound inputs see the change
+PREPARE_FIELD_JS = """
+    (function(selector) {
+        const field = document.querySelector(selector);
+        if (!field) {
+            return false;
+        }
+        field.focus();
+        const setValue = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(field), 'value').set;
+        setValue.call(field, '');
+        field.dispatchEvent(new Event('input', { bubbles: true }));
+        return document.activeElement === field;
+    })(%s)
+"""
+
+# Input.insertText already fired beforeinput/input; validators on these forms also listen for change and blur
+FINISH_FIELD_JS = """
+    (function(selector) {
+        const field = document.querySelector(selector);
+        if (!field) {
+            return null;
+        }
+        field.dispatchEvent(new Event('change', { bubbles: true }));
+        field.dispatchEvent(new Event('blur', { bubbles: true }));
+        return field.value;
+    })(%s)
+"""
+
+# Fallback when the inserted text did not land - the value is passed as a JSON literal, never spliced into code
+SET_FIELD_JS = """
+    (function(selector, value) {
+        const field = document.querySelector(selector);
+        if (!field) {
+            return null;
+        }
+        const setValue = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(field), 'value').set;
+        setValue.call(field, value);
+        ['input', 'change', 'blur'].forEach(type => field.dispatchEvent(new Event(type, { bubbles: true })));
+        return field.value;
+    })(%s, %s)
+"""
+
+async def fill_field(tab, selector, text, description=None, secret=False):
+    """Replace the field's value with text in one Input.insertText call and verify it - returns True when it matches"""
+    label = description or selector
+    try:
+        if not await tab.evaluate(PREPARE_FIELD_JS % json.dumps(selector)):
+            print(f"❌ Could not focus {label}")
+            return False
+
+        await tab.send(uc.cdp.input_.insert_text(text=text))
+        if await tab.evaluate(FINISH_FIELD_JS % json.dumps(selector)) == text:
+            return True
+
+        print(f"⚠ {label} did not take the inserted text, setting the value directly")
+        value = await tab.evaluate(SET_FIELD_JS % (json.dumps(selector), json.dumps(text)))
+        if value == text:
+            return True
+
+        shown = f"{len(value or '')} characters" if secret else repr(value)
+        print(f"❌ {label} holds {shown} instead of the expected {len(text)} characters")
+        return False
+
+    except Exception as e:
+        print(f"❌ Could not fill {label}: {e}")
+        return False
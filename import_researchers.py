@@ -1,22 +1,23 @@
 """Import researchers functionality"""
 
-import asyncio
-import csv
-from config import RESEARCHERS_URL, RESEARCHER_IDS_CSV
+import re
+from config import (
+    RESEARCHERS_URL, RESEARCHER_IDS_CSV, PAGE_LOAD_TIMEOUT, IMPORT_CHUNK_SIZE, RETRY_MAX_ATTEMPTS,
+    IMPORT_VERIFY_ROUNDS, DOWNLOAD_DIR
+)
+from wait_utils import wait_for_selector, wait_for_js, wait_for_network_idle
+from form_fill import fill_field
+from telemetry import span
+from reconcile import load_target_ids, print_target_summary
+from retry_queue import record_failure, resolve, wait_before_retry, WIZARD_FAILED, NOT_FOUND, NOT_VERIFIED
+from export_researchers import export_existing_researchers
 
 def read_researcher_ids_from_csv(csv_file_path=RESEARCHER_IDS_CSV):
-    """Read researcher IDs from a CSV file"""
-    researcher_ids = []
+    """Read researcher IDs from a CSV file - normalized, validated and deduped in file order"""
     try:
-        with open(csv_file_path, 'r', newline='', encoding='utf-8') as csvfile:
-            reader = csv.reader(csvfile)
-            # Skip header if exists
-            next(reader, None)
-            for row in reader:
-                if row and row[0].strip():  # Assuming IDs are in the first column
-                    researcher_ids.append(row[0].strip())
-        print(f"Read {len(researcher_ids)} researcher IDs from {csv_file_path}")
-        return researcher_ids
+        targets = load_target_ids(csv_file_path)
+        print_target_summary(targets)
+        return targets['ids']
     except Exception as e:
         print(f"Error reading CSV file: {e}")
         return []
@@ -26,7 +27,17 @@ async def check_if_no_existing_researchers(tab):
     try:
         # Navigate to researchers page
         await tab.get(RESEARCHERS_URL)
-        await asyncio.sleep(5)
+        
+        # The page is ready once either the empty-state heading or the researcher list is rendered
+        if not await wait_for_js(
+            tab,
+            "document.querySelector('label[for=\"selectAllCheckbox\"]') || "
+            "[...document.querySelectorAll('h2')].some(h => h.textContent.trim() === 'You have not defined any Researchers yet.')",
+            timeout=PAGE_LOAD_TIMEOUT,
+            description="researchers page"
+        ):
+            print("❌ Researchers page did not load - assuming researchers exist")
+            return False
         
         print("Checking if researchers already exist...")
         
@@ -64,33 +75,129 @@ async def check_if_no_existing_researchers(tab):
         print(f"❌ Error checking for existing researchers: {e}")
         return False  # Default to assuming researchers exist
 
+# Lines on the organize step that mention an ID together with one of these phrases mark it as not imported
+NOT_FOUND_PATTERN = re.compile(r'not found|could not|cannot be|invalid|unknown|no match|not recogni[sz]ed', re.IGNORECASE)
+
+def parse_organize_outcomes(organize_text, researcher_ids):
+    """Map each submitted ID to 'imported', 'not_found' or 'unconfirmed' using the organize step text"""
+    lines = (organize_text or '').splitlines()
+    outcomes = {}
+    for researcher_id in researcher_ids:
+        id_pattern = re.compile(rf'(?<!\d){re.escape(researcher_id)}(?!\d)')
+        matching_lines = [line for line in lines if id_pattern.search(line)]
+        if not matching_lines:
+            # Organize step did not list this ID - left for post-import verification
+            outcomes[researcher_id] = 'unconfirmed'
+        elif any(NOT_FOUND_PATTERN.search(line) for line in matching_lines):
+            outcomes[researcher_id] = 'not_found'
+        else:
+            outcomes[researcher_id] = 'imported'
+    return outcomes
+
 async def import_researcher(tab, researcher_id):
-    """Import a single researcher using their ID - FIXED VERSION"""
+    """Import a single researcher using their ID"""
+    outcomes = await run_import_wizard(tab, [researcher_id])
+    return bool(outcomes) and outcomes.get(researcher_id) != 'not_found'
+
+async def run_import_wizard(tab, researcher_ids):
+    """Push a list of researcher IDs through one import wizard pass - returns per-ID outcomes or None if the wizard failed"""
     try:
-        # Navigate to researchers page
-        await tab.get(RESEARCHERS_URL)
-        print(f"Importing researcher ID: {researcher_id}")
-        
-        # Wait for page to load
-        await asyncio.sleep(5)
-        
-        # Click secondary button with simple approach first
-        print("Clicking secondary button...")
-        try:
-            secondary_button = await tab.select('button[class="secondary action-link"] span')
-            await secondary_button.click()
-            print("✅ Secondary button clicked (span)")
-        except Exception as e:
+        with span('import.navigate', batch_size=len(researcher_ids)):
+            # Navigate to researchers page
+            await tab.get(RESEARCHERS_URL)
+            print(f"Importing {len(researcher_ids)} researcher ID(s): {', '.join(researcher_ids[:5])}{' ...' if len(researcher_ids) > 5 else ''}")
+            
+            # Wait for page to load
+            if not await wait_for_selector(tab, 'button[class="secondary action-link"]', timeout=PAGE_LOAD_TIMEOUT):
+                raise RuntimeError("Researchers page did not load")
+        
+        with span('import.secondary_button'):
+            # Click secondary button with simple approach first
+            print("Clicking secondary button...")
             try:
-                secondary_button = await tab.select('button[class="secondary action-link"]')
+                secondary_button = await tab.select('button[class="secondary action-link"] span')
                 await secondary_button.click()
-                print("✅ Secondary button clicked (parent)")
-            except Exception as e2:
-                # JavaScript fallback - FIXED syntax
-                await tab.evaluate("""
+                print("✅ Secondary button clicked (span)")
+            except Exception as e:
+                try:
+                    secondary_button = await tab.select('button[class="secondary action-link"]')
+                    await secondary_button.click()
+                    print("✅ Secondary button clicked (parent)")
+                except Exception as e2:
+                    # JavaScript fallback - FIXED syntax
+                    clicked = await tab.evaluate("""
+                        (function() {
+                            const button = document.querySelector('button[class="secondary action-link"] span') || 
+                                         document.querySelector('button[class="secondary action-link"]');
+                            if (button) {
+                                button.click();
+                                return true;
+                            }
+                            return false;
+                        })();
+                    """)
+                    if not clicked:
+                        raise RuntimeError("Secondary button not found")
+                    print("✅ Secondary button clicked via JavaScript")
+            
+            if not await wait_for_selector(tab, 'button[class="link primary-link importResearchersLink"]', visible=True):
+                raise RuntimeError("Define menu did not offer the import link")
+        
+        with span('import.import_link'):
+            # Click import link
+            print("Clicking import link...")
+            try:
+                import_link = await tab.select('button[class="link primary-link importResearchersLink"] span')
+                await import_link.click()
+                print("✅ Import link clicked")
+            except Exception as e:
+                try:
+                    import_link = await tab.select('button[class="link primary-link importResearchersLink"]')
+                    await import_link.click()
+                    print("✅ Import link clicked (parent)")
+                except Exception as e2:
+                    clicked = await tab.evaluate("""
+                        (function() {
+                            const link = document.querySelector('button[class="link primary-link importResearchersLink"] span') ||
+                                       document.querySelector('button[class="link primary-link importResearchersLink"]');
+                            if (link) {
+                                link.click();
+                                return true;
+                            }
+                            return false;
+                        })();
+                    """)
+                    if not clicked:
+                        raise RuntimeError("Import link not found")
+                    print("✅ Import link clicked via JavaScript")
+            
+            if not await wait_for_selector(tab, '#loadIDsArea', visible=True):
+                raise RuntimeError("Import wizard did not open")
+        
+        with span('import.enter_ids', batch_size=len(researcher_ids)):
+            # Enter researcher IDs (one per line) in a single insert
+            print("Entering researcher IDs...")
+            if not await fill_field(tab, '#loadIDsArea', '\n'.join(researcher_ids), description="researcher ID field"):
+                raise RuntimeError("Researcher ID field could not be filled")
+            
+            if not await wait_for_js(
+                tab,
+                "(btn => btn && !btn.disabled)(document.querySelector('#importNextButton'))",
+                description="import next button to enable"
+            ):
+                raise RuntimeError("Import next button stayed disabled after entering the IDs")
+        
+        with span('import.next') as step:
+            # Click import next button
+            print("Clicking import next button...")
+            try:
+                import_next_button = await tab.select('#importNextButton')
+                await import_next_button.click()
+                print("✅ Import next button clicked")
+            except Exception as e:
+                clicked = await tab.evaluate("""
                     (function() {
-                        const button = document.querySelector('button[class="secondary action-link"] span') || 
-                                     document.querySelector('button[class="secondary action-link"]');
+                        const button = document.querySelector('#importNextButton');
                         if (button) {
                             button.click();
                             return true;
@@ -98,137 +205,170 @@ async def import_researcher(tab, researcher_id):
                         return false;
                     })();
                 """)
-                print("✅ Secondary button clicked via JavaScript")
+                if not clicked:
+                    raise RuntimeError("Import next button not found")
+                print("✅ Import next button clicked via JavaScript")
+            
+            if not await wait_for_selector(tab, '#organizeFirstButton', visible=True, timeout=PAGE_LOAD_TIMEOUT):
+                print("❌ Organize step did not appear")
+                step['outcome'] = 'failed'
+                return None
         
-        await asyncio.sleep(3)
+        # Read the organize step to learn which IDs SciVal resolved
+        organize_text = await tab.evaluate("""
+            (function() {
+                const button = document.querySelector('#organizeFirstButton');
+                const container = button && (button.closest('form, section, [role="dialog"], .modal, .wizard') || document.body);
+                return container ? container.innerText : '';
+            })()
+        """)
+        outcomes = parse_organize_outcomes(organize_text if isinstance(organize_text, str) else '', researcher_ids)
         
-        # Click import link
-        print("Clicking import link...")
-        try:
-            import_link = await tab.select('button[class="link primary-link importResearchersLink"] span')
-            await import_link.click()
-            print("✅ Import link clicked")
-        except Exception as e:
+        with span('import.organize'):
+            # Click organize first button
+            print("Clicking organize first button...")
             try:
-                import_link = await tab.select('button[class="link primary-link importResearchersLink"]')
-                await import_link.click()
-                print("✅ Import link clicked (parent)")
-            except Exception as e2:
-                await tab.evaluate("""
+                organize_first_button = await tab.select('#organizeFirstButton')
+                await organize_first_button.click()
+                print("✅ Organize first button clicked")
+            except Exception as e:
+                clicked = await tab.evaluate("""
                     (function() {
-                        const link = document.querySelector('button[class="link primary-link importResearchersLink"] span') ||
-                                   document.querySelector('button[class="link primary-link importResearchersLink"]');
-                        if (link) {
-                            link.click();
+                        const button = document.querySelector('#organizeFirstButton');
+                        if (button) {
+                            button.click();
                             return true;
                         }
                         return false;
                     })();
                 """)
-                print("✅ Import link clicked via JavaScript")
-        
-        await asyncio.sleep(5)
-        
-        # Enter researcher ID using Method 3
-        print("Entering researcher ID...")
-        await tab.evaluate(f"""
-            (function() {{
-                const idField = document.querySelector('#loadIDsArea');
-                if (idField) {{
-                    idField.focus();
-                    idField.value = '';
-                    
-                    const researcherId = '{researcher_id}';
-                    let currentValue = '';
-                    
-                    for (let i = 0; i < researcherId.length; i++) {{
-                        currentValue += researcherId[i];
-                        idField.value = currentValue;
-                        
-                        idField.dispatchEvent(new KeyboardEvent('keydown', {{ key: researcherId[i], bubbles: true }}));
-                        idField.dispatchEvent(new KeyboardEvent('keypress', {{ key: researcherId[i], bubbles: true }}));
-                        idField.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                        idField.dispatchEvent(new KeyboardEvent('keyup', {{ key: researcherId[i], bubbles: true }}));
-                    }}
-                    
-                    idField.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                    idField.dispatchEvent(new Event('blur', {{ bubbles: true }}));
-                    return true;
-                }}
-                return false;
-            }})();
-        """)
-        
-        await asyncio.sleep(3)
-        
-        # Click import next button
-        print("Clicking import next button...")
-        try:
-            import_next_button = await tab.select('#importNextButton')
-            await import_next_button.click()
-            print("✅ Import next button clicked")
-        except Exception as e:
-            await tab.evaluate("""
-                (function() {
-                    const button = document.querySelector('#importNextButton');
-                    if (button) {
-                        button.click();
-                        return true;
-                    }
-                    return false;
-                })();
-            """)
-            print("✅ Import next button clicked via JavaScript")
-        
-        await asyncio.sleep(5)
-        
-        # Click organize first button
-        print("Clicking organize first button...")
-        try:
-            organize_first_button = await tab.select('#organizeFirstButton')
-            await organize_first_button.click()
-            print("✅ Organize first button clicked")
-        except Exception as e:
-            await tab.evaluate("""
-                (function() {
-                    const button = document.querySelector('#organizeFirstButton');
-                    if (button) {
-                        button.click();
-                        return true;
-                    }
-                    return false;
-                })();
-            """)
-            print("✅ Organize first button clicked via JavaScript")
-        
-        await asyncio.sleep(3)
-        
-        # Click save button
-        print("Clicking save button...")
-        try:
-            save_button = await tab.select('#saveButton')
-            await save_button.click()
-            print("✅ Save button clicked")
-        except Exception as e:
-            await tab.evaluate("""
-                (function() {
-                    const button = document.querySelector('#saveButton');
-                    if (button) {
-                        button.click();
-                        return true;
-                    }
-                    return false;
-                })();
-            """)
-            print("✅ Save button clicked via JavaScript")
+                if not clicked:
+                    raise RuntimeError("Organize first button not found")
+                print("✅ Organize first button clicked via JavaScript")
+            
+            if not await wait_for_selector(tab, '#saveButton', visible=True):
+                raise RuntimeError("Save step did not appear")
         
-        await asyncio.sleep(5)
+        with span('import.save'):
+            # Click save button
+            print("Clicking save button...")
+            try:
+                save_button = await tab.select('#saveButton')
+                await save_button.click()
+                print("✅ Save button clicked")
+            except Exception as e:
+                clicked = await tab.evaluate("""
+                    (function() {
+                        const button = document.querySelector('#saveButton');
+                        if (button) {
+                            button.click();
+                            return true;
+                        }
+                        return false;
+                    })();
+                """)
+                if not clicked:
+                    raise RuntimeError("Save button not found")
+                print("✅ Save button clicked via JavaScript")
+            
+            # Saving closes the wizard and refreshes the researcher list
+            if not await wait_for_network_idle(tab, timeout=PAGE_LOAD_TIMEOUT):
+                raise RuntimeError("Researcher list did not finish saving")
         
-        print(f"✅ Successfully imported researcher ID: {researcher_id}")
-        return True
+        print(f"✅ Import wizard saved {len(researcher_ids)} researcher ID(s)")
+        return outcomes
         
     except Exception as e:
-        print(f"❌ Error importing researcher {researcher_id}: {e}")
+        print(f"❌ Error importing researcher(s) {', '.join(researcher_ids)}: {e}")
         import traceback
         traceback.print_exc()
-        return False
+        return None
+
+async def import_researchers_batch(tab, researcher_ids, chunk_size=IMPORT_CHUNK_SIZE):
+    """Import researchers in chunks of chunk_size per wizard pass - returns {id: outcome}"""
+    outcomes = {}
+    attempts = {}  # single-ID wizard failures per ID
+    size = max(1, chunk_size)
+    pending = [researcher_ids[i:i + size] for i in range(0, len(researcher_ids), size)]
+    
+    while pending:
+        chunk = pending.pop(0)
+        with span('import.batch', batch_size=len(chunk)) as batch:
+            chunk_outcomes = await run_import_wizard(tab, chunk)
+            if chunk_outcomes is None:
+                batch['outcome'] = 'failed'
+        
+        if chunk_outcomes is not None:
+            outcomes.update(chunk_outcomes)
+            for researcher_id, outcome in chunk_outcomes.items():
+                if outcome == 'not_found':
+                    record_failure('import', researcher_id, NOT_FOUND)
+                elif outcome == 'imported':
+                    resolve('import', researcher_id)
+        elif len(chunk) > 1:
+            # Split a failed chunk in half and retry both halves before moving on
+            middle = len(chunk) // 2
+            print(f"⚠ Batch of {len(chunk)} failed, retrying as {middle} + {len(chunk) - middle}")
+            pending[:0] = [chunk[:middle], chunk[middle:]]
+        else:
+            # A single ID that keeps failing gets bounded backoff retries, then goes to the retry queue
+            researcher_id = chunk[0]
+            attempts[researcher_id] = attempts.get(researcher_id, 0) + 1
+            if attempts[researcher_id] < RETRY_MAX_ATTEMPTS:
+                await wait_before_retry(attempts[researcher_id], f"import of {researcher_id}")
+                pending.insert(0, chunk)
+            else:
+                outcomes[researcher_id] = 'failed'
+                record_failure('import', researcher_id, WIZARD_FAILED, attempts=attempts[researcher_id])
+    
+    return outcomes
+
+async def verify_imports(tab, submitted_ids):
+    """Fetch the researcher list once and return the submitted IDs missing from it (None if the list is unavailable)"""
+    with span('import.verify', submitted=len(submitted_ids)) as step:
+        existing_ids, export_file = await export_existing_researchers(tab, DOWNLOAD_DIR)
+        if not existing_ids and not export_file:
+            step['outcome'] = 'unavailable'
+            return None
+        present = set(existing_ids)
+        missing = [researcher_id for researcher_id in submitted_ids if researcher_id not in present]
+        step['missing'] = len(missing)
+    return missing
+
+async def import_and_verify(tab, researcher_ids, chunk_size=IMPORT_CHUNK_SIZE, verify_rounds=IMPORT_VERIFY_ROUNDS):
+    """Import, then check the whole batch against one researcher list fetch and re-import only what is missing"""
+    outcomes = await import_researchers_batch(tab, researcher_ids, chunk_size)
+    
+    for verify_round in range(1, verify_rounds + 1):
+        # Everything SciVal did not reject is checked, including wizard runs that reported a failure
+        submitted = [researcher_id for researcher_id, outcome in outcomes.items() if outcome != 'not_found']
+        if not submitted:
+            break
+        
+        print(f"\n🔎 Verifying {len(submitted)} imported IDs against the researcher list...")
+        missing = await verify_imports(tab, submitted)
+        if missing is None:
+            print("⚠ Could not fetch the researcher list - import left unverified")
+            break
+        
+        missing_ids = set(missing)
+        for researcher_id in submitted:
+            if researcher_id not in missing_ids:
+                outcomes[researcher_id] = 'imported'
+                resolve('import', researcher_id)
+        
+        if not missing:
+            print(f"✅ All {len(submitted)} IDs are in My SciVal")
+            break
+        
+        if verify_round == verify_rounds:
+            print(f"❌ {len(missing)} IDs still missing after {verify_rounds} checks - queued for retry")
+            for researcher_id in missing:
+                outcomes[researcher_id] = 'missing'
+                record_failure('import', researcher_id, NOT_VERIFIED)
+            break
+        
+        print(f"🔁 {len(missing)} IDs missing after import - re-importing only those")
+        outcomes.update(await import_researchers_batch(tab, missing, chunk_size))
+    
+    return outcomes
@@ -1,10 +1,14 @@
 """Login functionality for SciVal"""
 
-import asyncio
+from pathlib import Path
 from config import (
     ELSEVIER_USERNAME, ELSEVIER_PASSWORD, ELSEVIER_EMAIL, 
-    ELSEVIER_SECOND_PASSWORD, CITYU_LOGIN_URL, OAUTH2_URL
+    ELSEVIER_SECOND_PASSWORD, CITYU_LOGIN_URL, OAUTH2_URL, PAGE_LOAD_TIMEOUT,
+    RESEARCHERS_URL, REUSE_SESSION, SESSION_COOKIES_FILE, SESSION_PROBE_TIMEOUT
 )
+from wait_utils import wait_for_selector, wait_for_js, wait_for_network_idle
+from form_fill import fill_field
+from telemetry import span
 
 async def login(browser):
     """Complete login process - returns the authenticated tab"""
@@ -13,125 +17,127 @@ async def login(browser):
         return None
     
     try:
-        # Step 1: Navigate to CityU login
-        tab = await browser.get(CITYU_LOGIN_URL)
-        await asyncio.sleep(3)
-        
-        # Enter username
-        username_field = await tab.select('#cred_userid_inputtext')
-        await username_field.send_keys(ELSEVIER_USERNAME)
-        
-        # Enter password
-        password_field = await tab.select('#cred_password_inputtext')
-        await password_field.send_keys(ELSEVIER_PASSWORD)
-        await asyncio.sleep(1)
-        
-        # Click sign-in
-        sign_in_button = await tab.select('#cred_sign_in_button')
-        await sign_in_button.click()
-        await asyncio.sleep(5)
+        with span('login.cityu') as stage:
+            # Step 1: Navigate to CityU login
+            tab = await browser.get(CITYU_LOGIN_URL)
+            if not await wait_for_selector(tab, '#cred_userid_inputtext', timeout=PAGE_LOAD_TIMEOUT):
+                print("❌ CityU login page did not load")
+                stage['outcome'] = 'failed'
+                return None
+            
+            # Enter username
+            username_field = await tab.select('#cred_userid_inputtext')
+            await username_field.send_keys(ELSEVIER_USERNAME)
+            
+            # Enter password
+            password_field = await tab.select('#cred_password_inputtext')
+            await password_field.send_keys(ELSEVIER_PASSWORD)
+            
+            # Click sign-in
+            sign_in_button = await tab.select('#cred_sign_in_button')
+            await sign_in_button.click()
+            
+            # Wait until the CityU form is gone and the redirect chain has settled
+            if not await wait_for_js(
+                tab,
+                "document.querySelector('#cred_sign_in_button') === null && document.readyState === 'complete'",
+                timeout=PAGE_LOAD_TIMEOUT,
+                description="CityU sign-in redirect"
+            ):
+                print("❌ CityU sign-in did not complete - check ELSEVIER_USERNAME / ELSEVIER_PASSWORD")
+                stage['outcome'] = 'failed'
+                return None
+            if not await wait_for_network_idle(tab, timeout=PAGE_LOAD_TIMEOUT):
+                print("❌ CityU sign-in redirect did not settle")
+                stage['outcome'] = 'failed'
+                return None
         
         print("First login completed, navigating to OAuth2...")
         
-        # Step 2: Navigate to OAuth2 URL
-        await tab.get(OAUTH2_URL)
-        await asyncio.sleep(3)
-        
-        # Step 3: Enter email using Method 3
-        await tab.evaluate(f"""
-            const field = document.querySelector('#bdd-email');
-            if (field) {{
-                field.focus();
-                field.value = '';
-                
-                const email = '{ELSEVIER_EMAIL}';
-                let currentValue = '';
-                
-                for (let i = 0; i < email.length; i++) {{
-                    currentValue += email[i];
-                    field.value = currentValue;
-                    
-                    field.dispatchEvent(new KeyboardEvent('keydown', {{ key: email[i], bubbles: true }}));
-                    field.dispatchEvent(new KeyboardEvent('keypress', {{ key: email[i], bubbles: true }}));
-                    field.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                    field.dispatchEvent(new KeyboardEvent('keyup', {{ key: email[i], bubbles: true }}));
-                }}
-                
-                field.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                field.dispatchEvent(new Event('blur', {{ bubbles: true }}));
-            }}
-        """)
-        
-        await asyncio.sleep(2)
-        
-        # Step 4: Click continue
-        primary_button = await tab.select('#bdd-elsPrimaryBtn')
-        await primary_button.click()
-        print("Continue button clicked successfully")
-        await asyncio.sleep(3)
+        with span('login.elsevier_email') as stage:
+            # Step 2: Navigate to OAuth2 URL
+            await tab.get(OAUTH2_URL)
+            if not await wait_for_selector(tab, '#bdd-email', timeout=PAGE_LOAD_TIMEOUT):
+                print("❌ Elsevier sign-in page did not load")
+                stage['outcome'] = 'failed'
+                return None
+            
+            # Step 3: Enter email
+            if not await fill_field(tab, '#bdd-email', ELSEVIER_EMAIL, description="Elsevier email field"):
+                stage['outcome'] = 'failed'
+                return None
+            
+            if not await wait_for_js(
+                tab,
+                "(btn => btn && !btn.disabled)(document.querySelector('#bdd-elsPrimaryBtn'))",
+                description="continue button to enable"
+            ):
+                print("❌ Elsevier continue button stayed disabled after entering the email")
+                stage['outcome'] = 'failed'
+                return None
+            
+            # Step 4: Click continue
+            primary_button = await tab.select('#bdd-elsPrimaryBtn')
+            await primary_button.click()
+            print("Continue button clicked successfully")
+            if not await wait_for_selector(tab, '#bdd-password', timeout=PAGE_LOAD_TIMEOUT):
+                print("❌ Elsevier password step did not appear - check ELSEVIER_EMAIL")
+                stage['outcome'] = 'failed'
+                return None
         
         print("Entering second password...")
         
-        # Step 5: Enter second password using Method 3
-        await tab.evaluate(f"""
-            const passwordField = document.querySelector('#bdd-password');
-            if (passwordField) {{
-                passwordField.focus();
-                passwordField.value = '';
-                
-                const secondPassword = '{ELSEVIER_SECOND_PASSWORD}';
-                let currentValue = '';
-                
-                for (let i = 0; i < secondPassword.length; i++) {{
-                    currentValue += secondPassword[i];
-                    passwordField.value = currentValue;
-                    
-                    passwordField.dispatchEvent(new KeyboardEvent('keydown', {{ key: secondPassword[i], bubbles: true }}));
-                    passwordField.dispatchEvent(new KeyboardEvent('keypress', {{ key: secondPassword[i], bubbles: true }}));
-                    passwordField.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                    passwordField.dispatchEvent(new KeyboardEvent('keyup', {{ key: secondPassword[i], bubbles: true }}));
-                }}
+        with span('login.elsevier_password') as stage:
+            # Step 5: Enter second password
+            if not await fill_field(tab, '#bdd-password', ELSEVIER_SECOND_PASSWORD, description="Elsevier password field", secret=True):
+                stage['outcome'] = 'failed'
+                return None
+            
+            # Step 6: Uncheck "Remember Me" checkbox
+            try:
+                remember_me_checkbox = await tab.select('#rememberMe')
+                is_checked = await remember_me_checkbox.get_attribute('checked')
                 
-                passwordField.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                passwordField.dispatchEvent(new Event('blur', {{ bubbles: true }}));
-            }}
-        """)
-        
-        await asyncio.sleep(1)
-        
-        # Step 6: Uncheck "Remember Me" checkbox
-        try:
-            remember_me_checkbox = await tab.select('#rememberMe')
-            is_checked = await remember_me_checkbox.get_attribute('checked')
+                if is_checked:
+                    await remember_me_checkbox.click()
+                    print("Remember Me checkbox unchecked")
+            except Exception as e:
+                print(f"Could not uncheck Remember Me: {e}")
+                await tab.evaluate("""
+                    const rememberMeCheckbox = document.querySelector('#rememberMe');
+                    if (rememberMeCheckbox && rememberMeCheckbox.checked) {
+                        rememberMeCheckbox.checked = false;
+                        rememberMeCheckbox.dispatchEvent(new Event('change', { bubbles: true }));
+                    }
+                """)
             
-            if is_checked:
-                await remember_me_checkbox.click()
-                print("Remember Me checkbox unchecked")
-        except Exception as e:
-            print(f"Could not uncheck Remember Me: {e}")
+            # Step 7: Final submit
             await tab.evaluate("""
-                const rememberMeCheckbox = document.querySelector('#rememberMe');
-                if (rememberMeCheckbox && rememberMeCheckbox.checked) {
-                    rememberMeCheckbox.checked = false;
-                    rememberMeCheckbox.dispatchEvent(new Event('change', { bubbles: true }));
+                const button = document.querySelector('#bdd-elsPrimaryBtn');
+                if (button) {
+                    button.focus();
+                    button.dispatchEvent(new MouseEvent('mousedown', { bubbles: true }));
+                    button.dispatchEvent(new MouseEvent('mouseup', { bubbles: true }));
+                    button.dispatchEvent(new MouseEvent('click', { bubbles: true }));
                 }
             """)
-        
-        await asyncio.sleep(1)
-        
-        # Step 7: Final submit
-        await tab.evaluate("""
-            const button = document.querySelector('#bdd-elsPrimaryBtn');
-            if (button) {
-                button.focus();
-                button.dispatchEvent(new MouseEvent('mousedown', { bubbles: true }));
-                button.dispatchEvent(new MouseEvent('mouseup', { bubbles: true }));
-                button.dispatchEvent(new MouseEvent('click', { bubbles: true }));
-            }
-        """)
-        
-        print("Final submit button clicked successfully")
-        await asyncio.sleep(5)
+            
+            print("Final submit button clicked successfully")
+            
+            # Wait until the password form is gone and SciVal has finished loading
+            if not await wait_for_js(
+                tab,
+                "document.querySelector('#bdd-password') === null && document.readyState === 'complete'",
+                timeout=PAGE_LOAD_TIMEOUT,
+                description="Elsevier sign-in redirect"
+            ):
+                print("❌ Elsevier sign-in did not complete - check ELSEVIER_SECOND_PASSWORD")
+                stage['outcome'] = 'failed'
+                return None
+            if not await wait_for_network_idle(tab, timeout=PAGE_LOAD_TIMEOUT):
+                print("❌ SciVal did not finish loading after sign-in")
+                stage['outcome'] = 'failed'
+                return None
         
         title = await tab.evaluate('document.title')
         print(f"Login completed - Page title: {title}")
@@ -141,3 +147,84 @@ async def login(browser):
     except Exception as e:
         print(f"Error during login process: {e}")
         return None
+
+async def is_session_valid(tab, navigate=True):
+    """Probe RESEARCHERS_URL - True when My SciVal renders instead of a login page"""
+    try:
+        if navigate:
+            await tab.get(RESEARCHERS_URL)
+        
+        # Stop as soon as either My SciVal or a login form is on screen
+        if not await wait_for_js(
+            tab,
+            "document.querySelector('#cred_userid_inputtext, #bdd-email, #bdd-password') || "
+            "(location.hostname.includes('scival') && document.querySelector('#mySciVal, .mySciVal, button[class=\"secondary action-link\"], h2'))",
+            timeout=SESSION_PROBE_TIMEOUT,
+            description="session probe"
+        ):
+            print("⚠ Neither My SciVal nor a login page appeared - treating the session as invalid")
+            return False
+        
+        state = await tab.evaluate("""
+            (function() {
+                if (document.querySelector('#cred_userid_inputtext, #bdd-email, #bdd-password')) {
+                    return 'login';
+                }
+                if (location.hostname.includes('scival') && location.href.includes('mySciVal')) {
+                    return 'valid';
+                }
+                return 'unknown';
+            })()
+        """)
+        return state == 'valid'
+        
+    except Exception as e:
+        print(f"⚠ Session probe failed: {e}")
+        return False
+
+async def restore_session(browser, cookies_file=SESSION_COOKIES_FILE):
+    """Load the saved cookie jar and check it is still accepted - returns the authenticated tab or None"""
+    try:
+        cookies_file = Path(cookies_file)
+        if cookies_file.exists():
+            await browser.cookies.load(str(cookies_file))
+            print(f"🍪 Loaded saved session from {cookies_file}")
+        
+        tab = await browser.get(RESEARCHERS_URL)
+        if await is_session_valid(tab, navigate=False):
+            title = await tab.evaluate('document.title')
+            print(f"Session reused - Page title: {title}")
+            return tab
+        
+        print("Saved session is no longer valid")
+        return None
+        
+    except Exception as e:
+        print(f"⚠ Could not restore session: {e}")
+        return None
+
+async def save_session(browser, cookies_file=SESSION_COOKIES_FILE):
+    """Persist the browser cookie jar for the next run"""
+    try:
+        Path(cookies_file).parent.mkdir(parents=True, exist_ok=True)
+        await browser.cookies.save(str(cookies_file))
+        print(f"🍪 Session saved to {cookies_file}")
+    except Exception as e:
+        print(f"⚠ Could not save session: {e}")
+
+async def ensure_logged_in(browser, cookies_file=SESSION_COOKIES_FILE):
+    """Reuse the saved session when the probe accepts it, otherwise run the full login - returns the authenticated tab"""
+    if REUSE_SESSION:
+        with span('login.session_probe') as probe:
+            tab = await restore_session(browser, cookies_file)
+            probe['outcome'] = 'valid' if tab else 'invalid'
+        if tab:
+            return tab
+    
+    with span('login.full') as full_login:
+        tab = await login(browser)
+        if not tab:
+            full_login['outcome'] = 'failed'
+    if tab and REUSE_SESSION:
+        await save_session(browser, cookies_file)
+    return tab
@@ -2,164 +2,205 @@
 
 import asyncio
 from browser_utils import create_browser, safe_browser_cleanup
-from login import login
+from login import ensure_logged_in
 from export_researchers import export_existing_researchers
-from import_researchers import read_researcher_ids_from_csv, import_researcher, check_if_no_existing_researchers
-from extract_researchers import run_extraction
-from config import DOWNLOAD_DIR, OPERATION_MODE
+from import_researchers import read_researcher_ids_from_csv, import_and_verify, check_if_no_existing_researchers
+from extract_researchers import run_extraction, retry_failed_extractions, reset_researcher_list
+from reconcile import reconcile_ids, print_reconciliation, write_reconciliation
+from config import DOWNLOAD_DIR, OPERATION_MODE, RESEARCHER_IDS_CSV
+from telemetry import start_run, end_run
+from retry_queue import pending, print_retry_summary
+from daemon import serve
 
-async def main():
+MODES = ('login-check', 'export', 'import', 'extract', 'full', 'retry-failed', 'daemon')
+
+async def export_step(tab):
+    """Steps 2 and 2B: check for existing researchers and export them - returns (no_existing_researchers, existing_ids)"""
+    # Step 2: Check if existing researchers exist first
+    print(f"\n=== STEP 2: CHECK FOR EXISTING RESEARCHERS ===")
+    no_existing_researchers = await check_if_no_existing_researchers(tab)
+    
+    existing_ids = []
+    
+    if no_existing_researchers:
+        print("🔄 No existing researchers - skipping export step")
+    else:
+        # Step 2B: Export existing researchers
+        print(f"\n=== STEP 2B: EXPORT TO CUSTOM PATH ({DOWNLOAD_DIR}) ===")
+        existing_ids, export_file = await export_existing_researchers(tab, DOWNLOAD_DIR)
+        
+        if existing_ids:
+            print(f"✅ Found {len(existing_ids)} existing researchers")
+            print(f"📁 Export file: {export_file}")
+            # Show first few for verification
+            for i, existing_id in enumerate(existing_ids[:5]):
+                print(f"  {i+1}. {existing_id}")
+            if len(existing_ids) > 5:
+                print(f"  ... and {len(existing_ids) - 5} more")
+        else:
+            print("⚠ No existing researchers found")
+    
+    return no_existing_researchers, existing_ids
+
+async def import_step(tab, csv_file_path=RESEARCHER_IDS_CSV):
+    """Steps 2-5: export existing researchers, reconcile the target CSV against them and import the missing ones"""
+    no_existing_researchers, existing_ids = await export_step(tab)
+    
+    # Step 3: Read new researcher IDs to import
+    print("\n=== STEP 3: READ TARGET RESEARCHER IDs ===")
+    new_researcher_ids = read_researcher_ids_from_csv(csv_file_path)
+    
+    if not new_researcher_ids:
+        print("❌ No researcher IDs found in CSV file")
+        print("Skipping import step...")
+        return {}
+    
+    print(f"✅ Found {len(new_researcher_ids)} target researcher IDs")
+    
+    # Step 4: Compare and find missing IDs (or import all if no existing)
+    print("\n=== STEP 4: DETERMINE RESEARCHERS TO IMPORT ===")
+    
+    if no_existing_researchers:
+        print("🔄 No existing researchers - will import all target researchers")
+    reconciliation = reconcile_ids(new_researcher_ids, existing_ids)
+    print_reconciliation(reconciliation)
+    write_reconciliation(reconciliation)
+    ids_to_import = reconciliation['to_import']
+    
+    if not ids_to_import:
+        print("🎉 All researchers already exist!")
+        return {}
+    
+    # Step 5: Import researchers
+    print(f"\n=== STEP 5: IMPORT {len(ids_to_import)} RESEARCHERS ===")
+    outcomes = await import_and_verify(tab, ids_to_import)
+    
+    for researcher_id, outcome in outcomes.items():
+        if outcome == 'not_found':
+            print(f"❌ {researcher_id} - not found by SciVal")
+        elif outcome == 'failed':
+            print(f"❌ Failed to import {researcher_id}")
+    
+    print(f"\n🎉 IMPORT COMPLETE!")
+    print(f"   Imported: {sum(1 for o in outcomes.values() if o == 'imported')}")
+    print(f"   Submitted but not listed on organize step: {sum(1 for o in outcomes.values() if o == 'unconfirmed')}")
+    print(f"   Not found: {sum(1 for o in outcomes.values() if o == 'not_found')}")
+    print(f"   Failed: {sum(1 for o in outcomes.values() if o == 'failed')}")
+    print(f"   Missing after verification: {sum(1 for o in outcomes.values() if o == 'missing')}")
+    return outcomes
+
+async def extract_step(tab, browser):
+    """Extract every researcher's collaborators"""
+    extracted_data = await run_extraction(tab, browser)
+    
+    if extracted_data:
+        print(f"✅ Successfully extracted data from {len(extracted_data)} researchers")
+    else:
+        print("⚠ No researcher data extracted")
+
+async def retry_failed_step(tab):
+    """Process only the retry queue: queued imports first, then queued extractions"""
+    print("\n=== RETRY QUEUED FAILURES ===")
+    import_ids = [entry['key'] for entry in pending('import')]
+    if import_ids:
+        print(f"🔁 Retrying {len(import_ids)} queued imports")
+        await import_and_verify(tab, import_ids)
+    else:
+        print("🔁 No queued imports")
+    
+    await retry_failed_extractions(tab)
+    print_retry_summary()
+
+async def keep_browser_open(tab):
+    """Stay open until the browser is closed or Ctrl+C"""
+    print("\n🌐 Browser will stay open indefinitely. Press Ctrl+C to exit.")
+    try:
+        while True:
+            await asyncio.sleep(60)
+            try:
+                current_title = await tab.evaluate('document.title')
+                print(f"Still running... Current page: {current_title}")
+            except:
+                print("Browser may have been closed by user")
+                break
+    except KeyboardInterrupt:
+        print("Received keyboard interrupt, closing browser...")
+
+async def run_workflow(mode=OPERATION_MODE, keep_open=False, csv_file_path=RESEARCHER_IDS_CSV):
+    """Log in and run one operation mode - returns True when it completed"""
+    mode = mode.lower()
+    if mode not in MODES:
+        print(f"❌ Unknown operation mode: {mode}")
+        print(f"Valid modes are: {', '.join(repr(m) for m in MODES)}")
+        return False
+    
     browser = None
+    start_run()
+    reset_researcher_list()
     try:
         # Create browser
         browser = await create_browser()
         
         # Step 1: Login (always required)
         print("=== STEP 1: LOGIN ===")
-        tab = await login(browser)
+        tab = await ensure_logged_in(browser)
         
         if not tab:
             print("❌ Login failed, exiting...")
-            return
+            return False
         
         print("✅ Login successful!")
-        print(f"🔧 Operation mode: {OPERATION_MODE}")
+        print(f"🔧 Operation mode: {mode}")
         
-        if OPERATION_MODE.lower() == "extract":
+        if mode == "export":
+            await export_step(tab)
+        
+        elif mode == "import":
+            await import_step(tab, csv_file_path)
+        
+        elif mode == "extract":
             # Extract mode: Skip export/import, go directly to extraction
             print("\n📋 EXTRACT MODE: Skipping export/import, going directly to extraction")
             
             # Step 2: Extract researcher information directly
             print("\n=== STEP 2: EXTRACT RESEARCHER INFORMATION ===")
-            extracted_data = await run_extraction(tab)
-            
-            if extracted_data:
-                print(f"✅ Successfully extracted data from {len(extracted_data)} researchers")
-            else:
-                print("⚠ No researcher data extracted")
-                
-        elif OPERATION_MODE.lower() == "full":
+            await extract_step(tab, browser)
+        
+        elif mode == "retry-failed":
+            await retry_failed_step(tab)
+        
+        elif mode == "daemon":
+            # Keep this logged-in browser and serve jobs instead of exiting
+            return await serve(browser, tab)
+        
+        elif mode == "full":
             # Full mode: Complete workflow
             print("\n📋 FULL MODE: Running complete workflow")
-            
-            # Step 2: Check if existing researchers exist first
-            print(f"\n=== STEP 2: CHECK FOR EXISTING RESEARCHERS ===")
-            no_existing_researchers = await check_if_no_existing_researchers(tab)
-            
-            existing_ids = []
-            
-            if no_existing_researchers:
-                print("🔄 No existing researchers - skipping export step")
-            else:
-                # Step 2B: Export existing researchers
-                print(f"\n=== STEP 2B: EXPORT TO CUSTOM PATH ({DOWNLOAD_DIR}) ===")
-                existing_ids, export_file = await export_existing_researchers(tab, DOWNLOAD_DIR)
-                
-                if existing_ids:
-                    print(f"✅ Found {len(existing_ids)} existing researchers")
-                    print(f"📁 Export file: {export_file}")
-                    # Show first few for verification
-                    for i, existing_id in enumerate(existing_ids[:5]):
-                        print(f"  {i+1}. {existing_id}")
-                    if len(existing_ids) > 5:
-                        print(f"  ... and {len(existing_ids) - 5} more")
-                else:
-                    print("⚠ No existing researchers found")
-            
-            # Step 3: Read new researcher IDs to import
-            print("\n=== STEP 3: READ TARGET RESEARCHER IDs ===")
-            new_researcher_ids = read_researcher_ids_from_csv()
-            
-            if not new_researcher_ids:
-                print("❌ No researcher IDs found in CSV file")
-                print("Skipping import step...")
-            else:
-                print(f"✅ Found {len(new_researcher_ids)} target researcher IDs")
-                
-                # Step 4: Compare and find missing IDs (or import all if no existing)
-                print("\n=== STEP 4: DETERMINE RESEARCHERS TO IMPORT ===")
-                
-                if no_existing_researchers:
-                    # Import all researchers since none exist
-                    ids_to_import = new_researcher_ids
-                    existing_count = 0
-                    print("🔄 No existing researchers - will import all target researchers")
-                else:
-                    # Compare with existing researchers
-                    ids_to_import = []
-                    existing_count = 0
-                    
-                    for new_id in new_researcher_ids:
-                        if new_id in existing_ids:
-                            existing_count += 1
-                            print(f"✓ {new_id} - already exists")
-                        else:
-                            ids_to_import.append(new_id)
-                            print(f"+ {new_id} - MISSING, will import")
-                
-                print(f"\n📊 SUMMARY:")
-                print(f"   Total existing: {len(existing_ids)}")
-                print(f"   Total targets: {len(new_researcher_ids)}")
-                print(f"   Already exist: {existing_count}")
-                print(f"   To import: {len(ids_to_import)}")
-                
-                if not ids_to_import:
-                    print("🎉 All researchers already exist!")
-                else:
-                    # Step 5: Import researchers
-                    print(f"\n=== STEP 5: IMPORT {len(ids_to_import)} RESEARCHERS ===")
-                    successful = 0
-                    failed = 0
-                    
-                    for researcher_id in ids_to_import:
-                        success = await import_researcher(tab, researcher_id)
-                        if success:
-                            successful += 1
-                            print(f"✅ Imported {researcher_id}")
-                        else:
-                            failed += 1
-                            print(f"❌ Failed to import {researcher_id}")
-                        
-                        await asyncio.sleep(2)
-                    
-                    print(f"\n🎉 IMPORT COMPLETE!")
-                    print(f"   Successful: {successful}")
-                    print(f"   Failed: {failed}")
+            await import_step(tab, csv_file_path)
             
             # Step 6: Extract researcher information
             print("\n=== STEP 6: EXTRACT RESEARCHER INFORMATION ===")
-            extracted_data = await run_extraction(tab)
-            
-            if extracted_data:
-                print(f"✅ Successfully extracted data from {len(extracted_data)} researchers")
-            else:
-                print("⚠ No researcher data extracted")
-        
-        else:
-            print(f"❌ Unknown operation mode: {OPERATION_MODE}")
-            print("Valid modes are: 'full' or 'extract'")
-            return
+            await extract_step(tab, browser)
         
-        # Stay open infinitely
-        print("\n🌐 Browser will stay open indefinitely. Press Ctrl+C to exit.")
-        try:
-            while True:
-                await asyncio.sleep(60)
-                try:
-                    current_title = await tab.evaluate('document.title')
-                    print(f"Still running... Current page: {current_title}")
-                except:
-                    print("Browser may have been closed by user")
-                    break
-        except KeyboardInterrupt:
-            print("Received keyboard interrupt, closing browser...")
+        if mode in ("import", "extract", "full"):
+            print_retry_summary()
         
+        if keep_open:
+            # Set OPERATION_MODE = "daemon" to keep the session usable for further jobs instead
+            await keep_browser_open(tab)
+        return True
+    
     except Exception as e:
         print(f"❌ Error in main process: {e}")
         import traceback
         traceback.print_exc()
+        return False
     finally:
+        end_run()
         await safe_browser_cleanup(browser)
 
+async def main():
+    await run_workflow(OPERATION_MODE, keep_open=True)
+
 if __name__ == "__main__":
     asyncio.run(main())
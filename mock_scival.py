@@ -0,0 +1,476 @@
+"""Offline stand-in for the CityU ezproxy / SciVal pages the automation depends on
+
+Serves pages reproducing the selectors used by login, import, export and extract,
+with configurable latency. Run standalone with:
+
+    python mock_scival.py --researchers 20 --latency 0.2
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import threading
+import time
+from datetime import date
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, quote
+
+MOCK_HOST = 'scival.localhost'  # *.localhost resolves to loopback and keeps 'scival' in the hostname
+SESSION_COOKIE = 'scival_session'
+MOCK_PORT = 8766  # Standalone default - 8765 is the daemon's (config.DAEMON_PORT)
+FIRST_SCOPUS_ID = 57000000000
+
+# Decorative page chrome like the real site's logo, banner and web font - what fast mode blocks
+STATIC_ASSETS = {
+    '/static/logo.png': ('image/png', 24 * 1024),
+    '/static/banner.jpg': ('image/jpeg', 96 * 1024),
+    '/static/icons.svg': ('image/svg+xml', 16 * 1024),
+    '/static/elsevier-sans.woff2': ('font/woff2', 64 * 1024),
+}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>[hidden] {{ display: none !important; }}
+@font-face {{ font-family: 'Elsevier Sans'; src: url('/static/elsevier-sans.woff2') format('woff2'); }}
+body {{ font-family: 'Elsevier Sans', sans-serif; }}</style></head>
+<body><header><img src="/static/logo.png" alt=""><img src="/static/banner.jpg" alt=""><img src="/static/icons.svg" alt=""></header>
+{body}
+<script>
+const UI_DELAY = {ui_delay_ms};
+function later(fn) {{ setTimeout(fn, UI_DELAY); }}
+{script}
+</script></body></html>"""
+
+LOGIN_BODY = """
+<form method="post" action="/ezlogin">
+  <input id="cred_userid_inputtext" name="username" type="text">
+  <input id="cred_password_inputtext" name="password" type="password">
+  <button id="cred_sign_in_button" type="submit">Sign in</button>
+</form>"""
+
+OAUTH_BODY = """
+<form id="oauthForm" method="post" action="/oauth">
+  <div id="emailStep">
+    <input id="bdd-email" name="email" type="email">
+  </div>
+  <div id="passwordStep" hidden>
+    <input id="bdd-password" name="password" type="password">
+    <input id="rememberMe" type="checkbox" checked><label for="rememberMe">Remember me</label>
+  </div>
+  <button id="bdd-elsPrimaryBtn" type="button" disabled>Continue</button>
+</form>"""
+
+OAUTH_SCRIPT = """
+const email = document.querySelector('#bdd-email');
+const primary = document.querySelector('#bdd-elsPrimaryBtn');
+email.addEventListener('input', () => { primary.disabled = !email.value; });
+primary.addEventListener('click', () => {
+  if (document.querySelector('#passwordStep').hidden) {
+    later(() => {
+      document.querySelector('#emailStep').hidden = true;
+      document.querySelector('#passwordStep').hidden = false;
+    });
+  } else {
+    document.querySelector('#oauthForm').submit();
+  }
+});"""
+
+RESEARCHERS_BODY = """
+<section id="mySciVal">
+  <button class="secondary action-link"><span>Define new researchers</span></button>
+  <div id="addMenu" hidden>
+    <button class="link primary-link importResearchersLink"><span>Import researchers</span></button>
+  </div>
+  <div id="researcherList"></div>
+  <button id="exportButton" disabled>Export</button>
+  <div id="exportMenu" hidden><button id="entityExportCsv">Download CSV</button></div>
+  <section id="importWizard" class="wizard" hidden>
+    <div id="stepLoad">
+      <textarea id="loadIDsArea"></textarea>
+      <button id="importNextButton" disabled>Next</button>
+    </div>
+    <div id="stepOrganize" hidden>
+      <div id="organizeResults"></div>
+      <button id="organizeFirstButton">Next</button>
+    </div>
+    <div id="stepSave" hidden><button id="saveButton">Save</button></div>
+  </section>
+</section>"""
+
+RESEARCHERS_SCRIPT = """
+let resolved = [];
+function renderList() {
+  fetch('/api/researchers').then(r => r.json()).then(researchers => later(() => {
+    const list = document.querySelector('#researcherList');
+    if (!researchers.length) {
+      list.innerHTML = '<h2>You have not defined any Researchers yet.</h2>';
+      return;
+    }
+    list.innerHTML = '<input type="checkbox" id="selectAllCheckbox"><label for="selectAllCheckbox">Select all</label><ul>' +
+      researchers.map(r => `<li>${r.name} (${r.scopus_id})</li>`).join('') + '</ul>';
+    document.querySelector('#selectAllCheckbox').addEventListener('change', e => {
+      document.querySelector('#exportButton').disabled = !e.target.checked;
+    });
+  }));
+}
+document.querySelector('button[class="secondary action-link"]').addEventListener('click', () =>
+  later(() => { document.querySelector('#addMenu').hidden = false; }));
+document.querySelector('.importResearchersLink').addEventListener('click', () =>
+  later(() => { document.querySelector('#importWizard').hidden = false; }));
+const idsArea = document.querySelector('#loadIDsArea');
+idsArea.addEventListener('input', () => { document.querySelector('#importNextButton').disabled = !idsArea.value.trim(); });
+document.querySelector('#importNextButton').addEventListener('click', () => {
+  fetch('/api/resolve', {method: 'POST', body: idsArea.value}).then(r => r.json()).then(results => later(() => {
+    resolved = results.filter(r => r.found).map(r => r.scopus_id);
+    document.querySelector('#organizeResults').innerText = results.map(r => r.found
+      ? `${r.name} - Scopus Author ID ${r.scopus_id}`
+      : `${r.scopus_id} - this ID could not be found`).join('\\n');
+    document.querySelector('#stepLoad').hidden = true;
+    document.querySelector('#stepOrganize').hidden = false;
+  }));
+});
+document.querySelector('#organizeFirstButton').addEventListener('click', () => later(() => {
+  document.querySelector('#stepOrganize').hidden = true;
+  document.querySelector('#stepSave').hidden = false;
+}));
+document.querySelector('#saveButton').addEventListener('click', () => {
+  fetch('/api/import', {method: 'POST', body: JSON.stringify(resolved)}).then(() => {
+    document.querySelector('#importWizard').hidden = true;
+    renderList();
+  });
+});
+document.querySelector('#exportButton').addEventListener('click', () =>
+  later(() => { document.querySelector('#exportMenu').hidden = false; }));
+document.querySelector('#entityExportCsv').addEventListener('click', () => { location.href = '/export/researchers'; });
+renderList();"""
+
+# The entity selector panel is part of every SciVal module page
+ENTITY_LIST_BODY = """
+<button id="entityListToggleBtn">Select entities</button>
+<div id="entityListContainer" hidden>
+  <input type="radio" id="entityFilter_researchers" name="entityFilter">
+  <label for="entityFilter_researchers">Researchers</label>
+  <div id="entityListPanel"><ul></ul></div>
+</div>"""
+
+ENTITY_LIST_SCRIPT = """
+document.querySelector('#entityListToggleBtn').addEventListener('click', () => later(() => {
+  const container = document.querySelector('#entityListContainer');
+  container.hidden = !container.hidden;
+  document.querySelector('#entityListPanel ul').innerHTML = '';
+  document.querySelector('#entityFilter_researchers').checked = false;
+}));
+document.querySelector('#entityFilter_researchers').addEventListener('change', () => {
+  fetch('/api/researchers').then(r => r.json()).then(researchers => later(() => {
+    document.querySelector('#entityListPanel ul').innerHTML = researchers.map(r =>
+      `<li data-uri="Researcher/${r.scopus_id}"><button type="button" data-uri="Researcher/${r.scopus_id}">${r.name}</button></li>`).join('');
+    document.querySelectorAll('#entityListPanel button').forEach(button => button.addEventListener('click', () => {
+      location.href = '/overview/summary?uri=' + encodeURIComponent(button.dataset.uri);
+    }));
+  }));
+});"""
+
+OVERVIEW_BODY = ENTITY_LIST_BODY + """
+<div id="summary"><h1>{entity_name}</h1>{collaborators_link}</div>"""
+
+COLLABORATORS_BODY = ENTITY_LIST_BODY + """
+<h1>Current collaborators (Authors) of {entity_name}</h1>
+<select id="authorCountSel" data-callback="collaborationTable.changeAuthorCount" hidden>
+  <option value="all" selected>All authors</option>
+  <option value="10">&lt;= 10 authors</option>
+  <option value="100">&lt;= 100 authors</option>
+</select>
+<span id="authorCountSel-button" class="ui-selectmenu-button"><span class="ui-selectmenu-text">All authors</span></span>
+<div class="ui-selectmenu-menu" hidden><ul>
+  <li><div class="ui-menu-item-wrapper">All authors</div></li>
+  <li><div class="ui-menu-item-wrapper">&lt;= 10 authors</div></li>
+  <li><div class="ui-menu-item-wrapper">&lt;= 100 authors</div></li>
+</ul></div>
+<div class="header-wrapper"><button class="link action-link">Export</button></div>
+<div id="exportOptions" hidden><button data-format="spreadsheet">Download as spreadsheet</button></div>
+<table id="collaborationTable"></table>"""
+
+COLLABORATORS_SCRIPT = """
+const entityUri = {entity_uri};
+// SciVal keeps the last author-count choice across researchers
+const authorCountSel = document.querySelector('#authorCountSel');
+authorCountSel.value = {author_count};
+document.querySelector('.ui-selectmenu-text').textContent = authorCountSel.selectedOptions[0].textContent;
+window.collaborationTable = {{
+  changeAuthorCount() {{
+    const authors = document.querySelector('#authorCountSel').value;
+    fetch('/api/collaborators?uri=' + encodeURIComponent(entityUri) + '&authors=' + authors)
+      .then(r => r.text()).then(html => later(() => {{ document.querySelector('#collaborationTable').innerHTML = html; }}));
+  }}
+}};
+document.querySelector('#authorCountSel-button').addEventListener('click', () =>
+  later(() => {{ document.querySelector('.ui-selectmenu-menu').hidden = false; }}));
+document.querySelectorAll('.ui-menu-item-wrapper').forEach(item => item.addEventListener('click', () => {{
+  document.querySelector('.ui-selectmenu-text').textContent = item.textContent;
+  document.querySelector('.ui-selectmenu-menu').hidden = true;
+}}));
+document.querySelector('div[class="header-wrapper"] button').addEventListener('click', () =>
+  later(() => {{ document.querySelector('#exportOptions').hidden = false; }}));
+document.querySelector('button[data-format="spreadsheet"]').addEventListener('click', () => {{
+  const authors = document.querySelector('#authorCountSel').value;
+  location.href = '/export/collaborators?uri=' + encodeURIComponent(entityUri) + '&authors=' + authors;
+}});
+collaborationTable.changeAuthorCount();"""
+
+class MockSciValState:
+    """Researchers known to the mock My SciVal account plus the synthetic Scopus directory"""
+
+    def __init__(self, researchers=0, latency=0.0, jitter=0.0, ui_delay=0.0, not_found_prefix='9', seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.ui_delay = ui_delay
+        self.not_found_prefix = not_found_prefix
+        self.author_count = 'all'  # last author-count filter chosen on the collaborators page
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.researchers = {}  # scopus_id -> name, in import order
+        for n in range(researchers):
+            scopus_id = str(FIRST_SCOPUS_ID + n)
+            self.researchers[scopus_id] = self.name_for(scopus_id)
+
+    @staticmethod
+    def name_for(scopus_id):
+        """Deterministic synthetic display name for a Scopus ID"""
+        return f"Researcher{scopus_id[-4:]}, Test"
+
+    def resolve(self, scopus_id):
+        """IDs starting with not_found_prefix do not exist in the synthetic Scopus directory"""
+        return not (self.not_found_prefix and scopus_id.startswith(self.not_found_prefix))
+
+    def delay(self):
+        """Simulated server latency for one response"""
+        if self.latency or self.jitter:
+            time.sleep(self.latency + self.random.uniform(0, self.jitter))
+
+    def collaborators(self, scopus_id, max_authors=None):
+        """Synthetic collaborator rows for a focal researcher (stable per researcher)"""
+        rng = random.Random(scopus_id)
+        rows = []
+        for n in range(rng.randint(20, 120)):
+            publications = max(1, int(rng.paretovariate(1.5)))
+            citations = publications * rng.randint(0, 40)
+            team_size = rng.randint(2, 12) if rng.random() < 0.7 else rng.randint(13, 200)  # largest shared author list
+            row = [
+                f"Coauthor{rng.randint(0, 5000):04d}, {chr(65 + n % 26)}.",
+                str(200000 + rng.randint(0, 500)),
+                f"Institution {rng.randint(0, 500)}",
+                rng.choice(['academic', 'government', 'corporate']),
+                str(publications),
+                str(citations),
+                f"{citations / publications:.1f}",
+                f"{rng.uniform(0, 4):.2f}",
+                str(FIRST_SCOPUS_ID + 10000 + rng.randint(0, 20000)),
+            ]
+            if max_authors in (None, 'all') or team_size <= int(max_authors):
+                rows.append(row)
+        rows.sort(key=lambda row: -int(row[4]))
+        return rows
+
+def collaborators_csv(state, scopus_id, max_authors):
+    """Build a file shaped like the real Authors_collaborating_with_*.csv export"""
+    name = state.researchers.get(scopus_id, state.name_for(scopus_id))
+    today = date.today()
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator='\n')
+    out.write('\ufeff')
+    writer.writerow(['Data set', f"Authors collaborating with {name}"])
+    writer.writerow(['Entity', name])
+    writer.writerow(['Year range', f"{today.year - 3} to {today.year}"])
+    writer.writerow(['Subject classification', 'ASJC'])
+    writer.writerow(['Filtered by', 'not filtered'])
+    writer.writerow(['Types of publications included', 'all publication types'])
+    writer.writerow(['Self-citations', 'included'])
+    out.write('\n')
+    writer.writerow(['Data source', 'Scopus'])
+    writer.writerow(['Date last updated', f"{today.day} {today:%B %Y}"])
+    writer.writerow(['Date exported', f"{today.day} {today:%B %Y}"])
+    out.write('\n')
+    writer.writerow(['Author numbers', f"<= {max_authors}" if max_authors != 'all' else 'all'])
+    out.write('\n')
+    writer.writerow(['Author', 'Institution ID', 'Institution', 'Sector', 'Co-authored publications', 'Citations',
+                     'Citations per Publication', 'Field-Weighted Citation Impact', 'Scopus author ID'])
+    writer.writerows(state.collaborators(scopus_id, max_authors))
+    out.write('\n')
+    writer.writerow([f"© {today.year} Elsevier B.V. All rights reserved. SciVal, RELX Group and the RE symbol are trade marks "
+                     'of RELX Intellectual Properties SA, used under license.'])
+    return out.getvalue(), f"Authors_collaborating_with_{name.replace(' ', '_')}.csv"
+
+def researchers_csv(state):
+    """Build the My SciVal researcher export"""
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(['Name', 'Scopus Author IDs', 'Number of publications'])
+    with state.lock:
+        for scopus_id, name in state.researchers.items():
+            writer.writerow([name, scopus_id, 10])
+    return out.getvalue()
+
+def make_handler(state):
+    """Build a request handler class bound to state"""
+
+    class MockSciValHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status=200, body='', content_type='text/html; charset=utf-8', headers=None):
+            data = body.encode('utf-8') if isinstance(body, str) else body
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _redirect(self, location, cookie=None):
+            headers = {'Location': location}
+            if cookie:
+                headers['Set-Cookie'] = f"{cookie}=1; Path=/"
+            self._send(302, '', headers=headers)
+
+        def _page(self, title, body, script=''):
+            self._send(body=PAGE_TEMPLATE.format(
+                title=title, body=body, script=script, ui_delay_ms=int(state.ui_delay * 1000)))
+
+        def _authenticated(self):
+            return f"{SESSION_COOKIE}=1" in (self.headers.get('Cookie') or '')
+
+        def _read_body(self):
+            return self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode('utf-8')
+
+        def do_GET(self):
+            state.delay()
+            url = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+            if url.path in STATIC_ASSETS:
+                content_type, size = STATIC_ASSETS[url.path]
+                return self._send(body=bytes(size), content_type=content_type)
+            if url.path == '/ezlogin':
+                return self._page('CityU Login', LOGIN_BODY)
+            if url.path == '/oauth':
+                return self._page('Sign in - Elsevier', OAUTH_BODY, OAUTH_SCRIPT)
+            if not self._authenticated():
+                return self._redirect('/ezlogin')
+
+            if url.path == '/mySciVal':
+                return self._page('My SciVal', RESEARCHERS_BODY, RESEARCHERS_SCRIPT)
+            if url.path == '/overview/summary':
+                return self._overview(query.get('uri', 'Institution/205002'))
+            if url.path == '/collaboration/authors':
+                return self._collaborators_page(query.get('uri', ''))
+            if url.path == '/api/researchers':
+                with state.lock:
+                    researchers = [{'scopus_id': k, 'name': v} for k, v in state.researchers.items()]
+                return self._send(body=json.dumps(researchers), content_type='application/json')
+            if url.path == '/api/collaborators':
+                scopus_id = query.get('uri', '').split('/')[-1]
+                state.author_count = query.get('authors') or 'all'
+                rows = state.collaborators(scopus_id, state.author_count)
+                table = ''.join(f"<tr>{''.join(f'<td>{cell}</td>' for cell in row)}</tr>" for row in rows)
+                return self._send(body=table)
+            if url.path == '/export/researchers':
+                return self._send(body=researchers_csv(state), content_type='text/csv; charset=utf-8', headers={
+                    'Content-Disposition': 'attachment; filename="mySciVal_Researchers_Export.csv"'})
+            if url.path == '/export/collaborators':
+                scopus_id = query.get('uri', '').split('/')[-1]
+                body, filename = collaborators_csv(state, scopus_id, query.get('authors', 'all'))
+                return self._send(body=body, content_type='text/csv; charset=utf-8', headers={
+                    'Content-Disposition': f"attachment; filename=\"{filename}\"; filename*=UTF-8''{quote(filename)}"})
+            self._send(404, 'Not found', content_type='text/plain')
+
+        def do_POST(self):
+            state.delay()
+            url = urlparse(self.path)
+            body = self._read_body()
+
+            if url.path == '/ezlogin':
+                # Like the real proxy, CityU sign-in hands over to the Elsevier sign-in rather than to SciVal
+                return self._redirect('/oauth', cookie='ezproxy_session')
+            if url.path == '/oauth':
+                return self._redirect('/mySciVal?selection=researchers', cookie=SESSION_COOKIE)
+            if not self._authenticated():
+                return self._send(401, 'Unauthorized', content_type='text/plain')
+
+            if url.path == '/api/resolve':
+                results = []
+                for scopus_id in dict.fromkeys(line.strip() for line in body.splitlines() if line.strip()):
+                    found = state.resolve(scopus_id)
+                    results.append({'scopus_id': scopus_id, 'found': found,
+                                    'name': state.name_for(scopus_id) if found else None})
+                return self._send(body=json.dumps(results), content_type='application/json')
+            if url.path == '/api/import':
+                with state.lock:
+                    for scopus_id in json.loads(body or '[]'):
+                        state.researchers.setdefault(scopus_id, state.name_for(scopus_id))
+                return self._send(body='{}', content_type='application/json')
+            self._send(404, 'Not found', content_type='text/plain')
+
+        def _overview(self, entity_uri):
+            scopus_id = entity_uri.split('/')[-1] if entity_uri.startswith('Researcher/') else None
+            if scopus_id:
+                entity_name = state.researchers.get(scopus_id, state.name_for(scopus_id))
+                link = (f'<a href="/collaboration/authors?uri={quote(entity_uri, safe="")}">'
+                        'Current collaborators (Authors)</a>')
+            else:
+                entity_name, link = 'City University of Hong Kong', ''
+            self._page(entity_name, OVERVIEW_BODY.format(entity_name=entity_name, collaborators_link=link),
+                       ENTITY_LIST_SCRIPT)
+
+        def _collaborators_page(self, entity_uri):
+            scopus_id = entity_uri.split('/')[-1]
+            entity_name = state.researchers.get(scopus_id, state.name_for(scopus_id))
+            self._page(f"Collaboration - {entity_name}", COLLABORATORS_BODY.format(entity_name=entity_name),
+                       ENTITY_LIST_SCRIPT + COLLABORATORS_SCRIPT.format(
+                           entity_uri=json.dumps(entity_uri), author_count=json.dumps(state.author_count)))
+
+    return MockSciValHandler
+
+def start_mock_server(state, port=0):
+    """Start the mock server in a background thread - returns (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://{MOCK_HOST}:{server.server_address[1]}"
+    return server, base_url
+
+def mock_urls(base_url):
+    """Environment overrides pointing config URLs at the mock server"""
+    return {
+        'CITYU_LOGIN_URL': f"{base_url}/ezlogin",
+        'OAUTH2_URL': f"{base_url}/oauth",
+        'RESEARCHERS_URL': f"{base_url}/mySciVal?selection=researchers",
+        'OVERVIEW_URL': f"{base_url}/overview/summary?uri=Institution%2F205002",
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve an offline mock of the SciVal pages')
+    parser.add_argument('--port', type=int, default=MOCK_PORT)
+    parser.add_argument('--researchers', type=int, default=10, help='researchers already in My SciVal')
+    parser.add_argument('--latency', type=float, default=0.1, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random latency per response (seconds)')
+    parser.add_argument('--ui-delay', type=float, default=0.05, help='seconds before client-side UI updates render')
+    args = parser.parse_args()
+
+    state = MockSciValState(args.researchers, args.latency, args.jitter, args.ui_delay)
+    server, base_url = start_mock_server(state, args.port)
+    print(f"🧪 Mock SciVal running at {base_url}")
+    for name, value in mock_urls(base_url).items():
+        print(f"   {name}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
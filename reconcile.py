@@ -0,0 +1,197 @@
+"""Set-based reconciliation of target Scopus IDs against the My SciVal researcher list"""
+
+import csv
+import io
+import re
+from pathlib import Path
+from config import RESEARCHER_IDS_CSV, DOWNLOAD_DIR
+
+# Scopus author IDs are plain digit strings (currently 10-11 digits)
+SCOPUS_ID_PATTERN = re.compile(r'^\d{5,15}$')
+
+def normalize_scopus_id(value):
+    """Normalize one Scopus ID cell - returns the digit string or None when it is not a valid ID"""
+    if value is None:
+        return None
+    value = str(value).strip().strip('"\'').strip()
+    # Spreadsheet round trips turn IDs into floats such as 57201194512.0
+    if value.endswith('.0'):
+        value = value[:-2]
+    value = value.replace(' ', '')
+    return value if SCOPUS_ID_PATTERN.match(value) else None
+
+# Separators SciVal uses when one researcher carries several Scopus Author IDs
+MULTI_ID_SEPARATORS = re.compile(r'[|;,\s]+')
+
+def _iter_csv_rows(csv_source):
+    """Stream CSV rows from a file path or the raw bytes of a captured export"""
+    if isinstance(csv_source, bytes):
+        yield from csv.reader(io.StringIO(csv_source.decode('utf-8-sig'), newline=''))
+        return
+    with open(csv_source, 'r', newline='', encoding='utf-8-sig') as f:
+        yield from csv.reader(f)
+
+def _scopus_column(row):
+    """Index of the Scopus Author ID column when row is the table header, else None"""
+    return next((i for i, name in enumerate(row) if 'scopus author id' in name.lower()), None)
+
+def find_export_header(csv_source):
+    """Locate the table header below any SciVal preamble - returns (row index, Scopus column index) or (None, None)"""
+    for row_index, row in enumerate(_iter_csv_rows(csv_source)):
+        column = _scopus_column(row)
+        if column is not None:
+            return row_index, column
+    return None, None
+
+def iter_existing_scopus_ids(csv_source):
+    """Yield normalized Scopus IDs from the researcher export, reading only the Scopus Author ID column"""
+    rows = _iter_csv_rows(csv_source)
+    column = None
+    for row in rows:
+        column = _scopus_column(row)
+        if column is not None:
+            break
+    if column is None:
+        return
+    
+    for row in rows:
+        if len(row) <= column:
+            continue
+        for value in MULTI_ID_SEPARATORS.split(row[column]):
+            scopus_id = normalize_scopus_id(value)
+            if scopus_id:
+                yield scopus_id
+
+def read_existing_scopus_ids(csv_source):
+    """Read Scopus Author IDs from a CSV file path or the raw CSV bytes of a captured export"""
+    try:
+        ids = list(dict.fromkeys(iter_existing_scopus_ids(csv_source)))
+        if not ids and find_export_header(csv_source)[0] is None:
+            print("❌ No Scopus column found in researcher export")
+            return []
+        print(f"✅ Found {len(ids)} Scopus IDs")
+        return ids
+        
+    except Exception as e:
+        print(f"❌ CSV read error: {e}")
+        return []
+
+def read_researcher_name_ids(csv_source):
+    """Map each researcher's display name to their first Scopus ID from the researcher export"""
+    rows = _iter_csv_rows(csv_source)
+    name_column = column = None
+    for row in rows:
+        column = _scopus_column(row)
+        if column is not None:
+            name_column = next((i for i, name in enumerate(row) if name.strip().lower() == 'name'), 0)
+            break
+    if column is None:
+        return {}
+    
+    names = {}
+    for row in rows:
+        if len(row) <= max(column, name_column) or not row[name_column].strip():
+            continue
+        scopus_id = next(filter(None, map(normalize_scopus_id, MULTI_ID_SEPARATORS.split(row[column]))), None)
+        if scopus_id:
+            names[row[name_column].strip()] = scopus_id
+    return names
+
+def read_researchers_export_frame(csv_source):
+    """Load the full researcher export as a pandas DataFrame (pandas is only imported here)"""
+    import pandas as pd
+    header_row, _ = find_export_header(csv_source)
+    if isinstance(csv_source, bytes):
+        csv_source = io.BytesIO(csv_source)
+    return pd.read_csv(csv_source, encoding='utf-8-sig', skiprows=header_row or 0, dtype=str)
+
+def iter_target_ids(csv_file_path=RESEARCHER_IDS_CSV):
+    """Stream raw values from the first column of the target CSV, skipping a header row"""
+    with open(csv_file_path, 'r', newline='', encoding='utf-8-sig') as csvfile:
+        reader = csv.reader(csvfile)
+        first_row = next(reader, None)
+        # Only treat the first row as a header when it does not hold an ID
+        if first_row and normalize_scopus_id(first_row[0]):
+            yield first_row[0]
+        for row in reader:
+            if row and row[0].strip():
+                yield row[0]
+
+def load_target_ids(csv_file_path=RESEARCHER_IDS_CSV):
+    """Read, normalize and dedupe target IDs - returns {'ids': [...in file order], 'rows', 'duplicates', 'invalid'}"""
+    seen = {}
+    rows = duplicates = 0
+    invalid = []
+    for raw_value in iter_target_ids(csv_file_path):
+        rows += 1
+        scopus_id = normalize_scopus_id(raw_value)
+        if scopus_id is None:
+            invalid.append(raw_value)
+        elif scopus_id in seen:
+            duplicates += 1
+        else:
+            seen[scopus_id] = None
+    return {'ids': list(seen), 'rows': rows, 'duplicates': duplicates, 'invalid': invalid}
+
+def reconcile_ids(target_ids, existing_ids):
+    """Diff target IDs against the IDs already in My SciVal
+
+    Returns to_import (targets missing from SciVal, in target order), to_remove (in SciVal
+    but no longer targeted, sorted) and the number of targets already present.
+    """
+    existing = {scopus_id for scopus_id in map(normalize_scopus_id, existing_ids) if scopus_id}
+    targets = dict.fromkeys(scopus_id for scopus_id in map(normalize_scopus_id, target_ids) if scopus_id)
+
+    to_import = [scopus_id for scopus_id in targets if scopus_id not in existing]
+    return {
+        'targets': len(targets),
+        'existing': len(existing),
+        'already_present': len(targets) - len(to_import),
+        'to_import': to_import,
+        'to_remove': sorted(existing.difference(targets)),
+    }
+
+def _sample(ids, limit):
+    """First few IDs for a summary line"""
+    shown = ', '.join(ids[:limit])
+    return f"{shown}{' ...' if len(ids) > limit else ''}"
+
+def print_reconciliation(result, sample_size=5):
+    """Print a summary of the reconciliation instead of one line per ID"""
+    print(f"\n📊 SUMMARY:")
+    print(f"   Total existing: {result['existing']}")
+    print(f"   Total targets: {result['targets']}")
+    print(f"   Already exist: {result['already_present']}")
+    print(f"   To import: {len(result['to_import'])}")
+    if result['to_import']:
+        print(f"      e.g. {_sample(result['to_import'], sample_size)}")
+    print(f"   In SciVal but not targeted (candidates for removal): {len(result['to_remove'])}")
+    if result['to_remove']:
+        print(f"      e.g. {_sample(result['to_remove'], sample_size)}")
+
+def print_target_summary(targets, sample_size=5):
+    """Print what load_target_ids dropped"""
+    print(f"✅ Read {targets['rows']} rows - {len(targets['ids'])} unique valid IDs")
+    if targets['duplicates']:
+        print(f"   Duplicates dropped: {targets['duplicates']}")
+    if targets['invalid']:
+        print(f"   ⚠ Invalid values skipped: {len(targets['invalid'])} (e.g. {_sample(targets['invalid'], sample_size)})")
+
+def write_id_list(ids, file_path):
+    """Write one ID per line under a 'Scopus Author ID' header"""
+    path = Path(file_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Scopus Author ID'])
+        writer.writerows([scopus_id] for scopus_id in ids)
+    return path
+
+def write_reconciliation(result, output_dir=DOWNLOAD_DIR):
+    """Write the full to_import / to_remove lists next to the downloads - returns their paths"""
+    paths = {
+        'to_import': write_id_list(result['to_import'], Path(output_dir) / 'reconcile_to_import.csv'),
+        'to_remove': write_id_list(result['to_remove'], Path(output_dir) / 'reconcile_to_remove.csv'),
+    }
+    print(f"📁 Full lists: {paths['to_import']}, {paths['to_remove']}")
+    return paths
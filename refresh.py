@@ -0,0 +1,187 @@
+"""Staleness-driven refresh: re-extract only researchers whose export may be out of date, most stale first"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from config import (
+    DOWNLOAD_DIR, REFRESH_TIME_BUDGET_MINUTES, REFRESH_MAX_AGE_DAYS, REFRESH_INTERVAL_HOURS
+)
+from browser_utils import create_browser, safe_browser_cleanup
+from login import ensure_logged_in, is_session_valid
+from extract_researchers import enumerate_researchers, extract_with_retry
+from checkpoint import load_manifest
+from collaborator_parser import read_collaborators_metadata
+from collaborator_store import consolidate_collaborators
+from download_catalog import connect as connect_catalog, latest_download, newest_data_update
+from telemetry import start_run, end_run, emit, span
+
+# Staleness reasons, in refresh priority order
+NEVER_EXTRACTED = 'never_extracted'  # no export on disk
+DATA_UPDATED = 'data_updated'        # SciVal data was updated after this researcher's export
+MAX_AGE = 'max_age'                  # export older than REFRESH_MAX_AGE_DAYS
+PROBE = 'probe'                      # nothing is stale - re-extract the oldest export to detect a new data release
+
+REASON_PRIORITY = {NEVER_EXTRACTED: 0, DATA_UPDATED: 1, MAX_AGE: 2, PROBE: 3}
+
+def last_export_state(conn, manifest, researcher_name):
+    """(extracted_at, date_last_updated) of a researcher's last export - (None, None) when there is none on disk"""
+    entry = manifest['researchers'].get(researcher_name)
+    if not entry or not Path(entry.get('file_path', '')).is_file():
+        return None, None
+    try:
+        extracted_at = datetime.fromisoformat(entry['extracted_at'])
+    except (KeyError, ValueError):
+        return None, None
+
+    record = latest_download(conn, researcher_name=researcher_name)
+    if record and record['date_last_updated']:
+        return extracted_at, record['date_last_updated']
+    # Not cataloged under the list name - read the preamble of the checkpointed file
+    try:
+        return extracted_at, read_collaborators_metadata(entry['file_path']).get('date_last_updated')
+    except Exception:
+        return extracted_at, None
+
+def plan_refresh(researchers, manifest, conn, max_age_days=REFRESH_MAX_AGE_DAYS, probe=True):
+    """Stale researchers in refresh order - returns [{'researcher', 'reason', 'extracted_at', 'date_last_updated'}]"""
+    now = datetime.now()
+    data_release = newest_data_update(conn)
+    plan = []
+    fresh = []
+    for researcher in researchers:
+        extracted_at, date_last_updated = last_export_state(conn, manifest, researcher['name'])
+        item = {
+            'researcher': researcher,
+            'extracted_at': extracted_at.isoformat(timespec='seconds') if extracted_at else None,
+            'date_last_updated': date_last_updated,
+        }
+        if extracted_at is None:
+            item['reason'] = NEVER_EXTRACTED
+        elif data_release and date_last_updated and date_last_updated < data_release:
+            item['reason'] = DATA_UPDATED
+        elif now - extracted_at > timedelta(days=max_age_days):
+            item['reason'] = MAX_AGE
+        else:
+            fresh.append(item)
+            continue
+        plan.append(item)
+
+    # Oldest data first within each reason, then the oldest extraction
+    plan.sort(key=lambda item: (REASON_PRIORITY[item['reason']], item['date_last_updated'] or '', item['extracted_at'] or ''))
+
+    # SciVal only reveals a new data release through a fresh export, so always spend one extraction on it
+    if probe and not plan and fresh:
+        oldest = min(fresh, key=lambda item: item['extracted_at'])
+        oldest['reason'] = PROBE
+        plan.append(oldest)
+    return plan
+
+def print_refresh_plan(plan, researcher_count):
+    counts = {}
+    for item in plan:
+        counts[item['reason']] = counts.get(item['reason'], 0) + 1
+    print(f"🗓 {len(plan)} of {researcher_count} researchers to refresh")
+    for reason in sorted(counts, key=REASON_PRIORITY.get):
+        print(f"   {reason:<16} {counts[reason]}")
+
+async def run_refresh(tab, budget_minutes=REFRESH_TIME_BUDGET_MINUTES, max_age_days=REFRESH_MAX_AGE_DAYS):
+    """Refresh stale researchers until the plan or the time budget runs out - returns name lists per status"""
+    results = {'done': [], 'skipped': [], 'failed': [], 'deferred': []}
+    researchers = await enumerate_researchers(tab, refresh=True)
+    if not researchers:
+        print("❌ No researchers found")
+        return results
+
+    custom_download_path = Path(DOWNLOAD_DIR).resolve()
+    custom_download_path.mkdir(exist_ok=True)
+    manifest = load_manifest()
+    conn = connect_catalog()
+    try:
+        plan = plan_refresh(researchers, manifest, conn, max_age_days)
+        data_release = newest_data_update(conn)
+        print_refresh_plan(plan, len(researchers))
+        emit('refresh_plan', researchers=len(researchers), stale=len(plan), data_release=data_release,
+             budget_minutes=budget_minutes)
+
+        budget_seconds = budget_minutes * 60 if budget_minutes else None
+        started = time.perf_counter()
+        durations = []
+        attempted = set()
+        while plan:
+            # Stop before a researcher that would likely overrun the budget
+            expected = sum(durations) / len(durations) if durations else 0
+            if budget_seconds and time.perf_counter() - started + expected > budget_seconds:
+                results['deferred'] = [item['researcher']['name'] for item in plan]
+                print(f"⏳ Time budget used up - {len(plan)} stale researchers deferred to the next run")
+                break
+
+            item = plan.pop(0)
+            researcher = item['researcher']
+            attempted.add(researcher['name'])
+            print(f"\n--- Refreshing {researcher['name']} ({item['reason']}) ---")
+            researcher_started = time.perf_counter()
+            with span('extract.researcher', researcher_index=researcher['position'], refresh_reason=item['reason']) as researcher_span:
+                status = await extract_with_retry(tab, researcher, custom_download_path, manifest, force=True)
+                researcher_span['outcome'] = status
+            durations.append(time.perf_counter() - researcher_started)
+            results[status].append(researcher['name'])
+
+            # A newer data release makes every export taken before it stale - re-plan the rest
+            newest = newest_data_update(conn)
+            if newest != data_release:
+                print(f"🆕 SciVal data updated {newest} (was {data_release}) - re-planning")
+                data_release = newest
+                plan = [entry for entry in plan_refresh(researchers, manifest, conn, max_age_days, probe=False)
+                        if entry['researcher']['name'] not in attempted]
+    finally:
+        conn.close()
+
+    emit('refresh_result', **{status: len(names) for status, names in results.items()})
+    print(f"\n🎉 Refresh complete: {len(results['done'])} refreshed, {len(results['failed'])} failed, "
+          f"{len(results['deferred'])} deferred")
+    if results['done']:
+        consolidate_collaborators()
+    return results
+
+async def run_scheduler(browser, tab, interval_hours=REFRESH_INTERVAL_HOURS, budget_minutes=REFRESH_TIME_BUDGET_MINUTES, once=False):
+    """Run a refresh every interval_hours in one logged-in browser (once=True for a single run)"""
+    while True:
+        cycle_started = datetime.now()
+        start_run()
+        try:
+            if not await is_session_valid(tab):
+                print("🔑 Session expired - logging in again")
+                tab = await ensure_logged_in(browser)
+                if not tab:
+                    print("❌ Login failed, stopping the scheduler")
+                    return False
+            await run_refresh(tab, budget_minutes)
+        except Exception as e:
+            print(f"❌ Refresh failed: {e}")
+        finally:
+            end_run()
+
+        if once:
+            return True
+        next_run = cycle_started + timedelta(hours=interval_hours)
+        print(f"⏰ Next refresh at {next_run:%Y-%m-%d %H:%M}")
+        await asyncio.sleep(max(0, (next_run - datetime.now()).total_seconds()))
+
+async def main(once=False, interval_hours=REFRESH_INTERVAL_HOURS, budget_minutes=REFRESH_TIME_BUDGET_MINUTES):
+    browser = None
+    try:
+        browser = await create_browser()
+        tab = await ensure_logged_in(browser)
+        if not tab:
+            print("❌ Login failed, exiting...")
+            return False
+        return await run_scheduler(browser, tab, interval_hours, budget_minutes, once)
+    except Exception as e:
+        print(f"❌ Error in refresh scheduler: {e}")
+        return False
+    finally:
+        await safe_browser_cleanup(browser)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""Persistent queue of failed imports and extractions with bounded exponential backoff"""
+
+import asyncio
+import json
+import os
+import random
+from datetime import datetime
+from pathlib import Path
+from config import RETRY_QUEUE_FILE, RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY
+
+# Reason codes
+TIMEOUT = 'timeout'                # a wait or CDP call timed out
+CONNECTION = 'connection'          # the browser connection or tab went away
+EXCEPTION = 'exception'            # any other unexpected error
+WIZARD_FAILED = 'wizard_failed'    # the import wizard did not reach the save step
+NOT_FOUND = 'not_found'            # SciVal does not know the Scopus ID - not retried automatically
+EXTRACT_FAILED = 'extract_failed'  # navigation, author-count filter or download did not complete
+NOT_VERIFIED = 'not_verified'      # imported but missing from the researcher list afterwards
+
+PERMANENT_REASONS = {NOT_FOUND}
+
+_queue = {'data': None, 'path': RETRY_QUEUE_FILE}
+
+def load_retry_queue(queue_path=RETRY_QUEUE_FILE):
+    """Load the queue once per run - returns {'entries': {'kind:key': entry}}"""
+    if _queue['data'] is not None and _queue['path'] == queue_path:
+        return _queue['data']
+
+    data = {'entries': {}}
+    path = Path(queue_path)
+    if path.exists():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data.update(json.load(f))
+            print(f"🔁 Loaded retry queue with {len(data['entries'])} entries")
+        except Exception as e:
+            print(f"⚠ Could not read retry queue ({e}), starting fresh")
+
+    _queue['data'] = data
+    _queue['path'] = queue_path
+    return data
+
+def save_retry_queue():
+    """Write the queue atomically"""
+    if _queue['data'] is None:
+        return
+    path = Path(_queue['path'])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(_queue['data'], f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def record_failure(kind, key, reason, payload=None, error=None, attempts=1):
+    """Add or update a failed item ('import' Scopus ID or 'extract' researcher name)"""
+    entries = load_retry_queue(_queue['path'])['entries']
+    now = datetime.now().isoformat(timespec='seconds')
+    entry = entries.setdefault(f"{kind}:{key}", {'kind': kind, 'key': key, 'attempts': 0, 'first_failed': now})
+    entry.update({
+        'reason': reason,
+        'retryable': reason not in PERMANENT_REASONS,
+        'attempts': entry['attempts'] + attempts,
+        'last_failed': now,
+        'last_error': str(error)[:500] if error else None,
+    })
+    if payload is not None:
+        entry['payload'] = payload
+    save_retry_queue()
+
+def resolve(kind, key):
+    """Drop an item that has now succeeded"""
+    entries = load_retry_queue(_queue['path'])['entries']
+    if entries.pop(f"{kind}:{key}", None) is not None:
+        save_retry_queue()
+
+def pending(kind, include_permanent=False):
+    """Queued entries of one kind, oldest first"""
+    entries = load_retry_queue(_queue['path'])['entries'].values()
+    selected = [e for e in entries if e['kind'] == kind and (include_permanent or e.get('retryable', True))]
+    return sorted(selected, key=lambda e: e.get('first_failed', ''))
+
+def classify_exception(error):
+    """Map an exception to a reason code"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return TIMEOUT
+    if isinstance(error, ConnectionError) or 'connection' in type(error).__name__.lower():
+        return CONNECTION
+    return EXCEPTION
+
+def backoff_delay(attempt, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+    """Exponential delay before retry number attempt (1-based), capped and jittered to avoid lockstep retries"""
+    delay = min(max_delay, base_delay * (2 ** (attempt - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+async def wait_before_retry(attempt, description):
+    """Sleep the backoff delay for attempt and say so"""
+    delay = backoff_delay(attempt)
+    print(f"🔁 Retrying {description} in {delay:.1f}s (attempt {attempt + 1}/{RETRY_MAX_ATTEMPTS})")
+    await asyncio.sleep(delay)
+
+def print_retry_summary():
+    """Summarize what is left in the queue by kind and reason"""
+    entries = load_retry_queue(_queue['path'])['entries'].values()
+    if not entries:
+        print("🔁 Retry queue is empty")
+        return
+    counts = {}
+    for entry in entries:
+        counts[(entry['kind'], entry['reason'])] = counts.get((entry['kind'], entry['reason']), 0) + 1
+    print(f"🔁 Retry queue: {len(entries)} entries ({_queue['path']})")
+    for (kind, reason), count in sorted(counts.items()):
+        print(f"   {kind:<8} {reason:<16} {count}")
@@ -0,0 +1,166 @@
+"""Sharded extraction across several independent browser processes"""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from config import DOWNLOAD_DIR, SHARD_COUNT, SHARD_ROOT, EXTRACTION_CONCURRENCY
+from browser_utils import create_browser, safe_browser_cleanup
+from login import ensure_logged_in
+from extract_researchers import enumerate_researchers, extraction_worker, create_limiter, report_limiter, reset_researcher_list
+from checkpoint import load_manifest, save_manifest
+from collaborator_store import consolidate_collaborators
+from download_catalog import connect as connect_catalog, relocate_files
+from telemetry import start_run, end_run, emit, span
+
+def shard_paths(shard_id, shard_root=SHARD_ROOT):
+    """Profile, session cookie jar and download directory of one shard"""
+    root = Path(shard_root) / f"shard-{shard_id}"
+    return {
+        'profile': root / 'browser_profile',
+        'cookies': root / 'session.dat',
+        'downloads': root / 'downloads',
+    }
+
+async def start_shard(shard_id):
+    """Launch one browser process and log it in - returns the shard or None"""
+    paths = shard_paths(shard_id)
+    browser = None
+    try:
+        with span('shard.start', shard=shard_id) as step:
+            browser = await create_browser(user_data_dir=paths['profile'], download_dir=paths['downloads'])
+            tab = await ensure_logged_in(browser, cookies_file=paths['cookies'])
+            if not tab:
+                step['outcome'] = 'failed'
+        if not tab:
+            print(f"❌ Shard {shard_id}: login failed")
+            await safe_browser_cleanup(browser)
+            return None
+        print(f"✅ Shard {shard_id}: logged in")
+        return {'id': shard_id, 'browser': browser, 'tab': tab, 'paths': paths}
+    except Exception as e:
+        print(f"❌ Shard {shard_id} failed to start: {e}")
+        await safe_browser_cleanup(browser)
+        return None
+
+async def run_shard(shard, researchers, manifest, concurrency=EXTRACTION_CONCURRENCY):
+    """Extract one shard's researchers with its own tab pool - returns {'done', 'skipped', 'failed', 'unprocessed'}"""
+    queue = asyncio.Queue()
+    for researcher in researchers:
+        queue.put_nowait(researcher)
+
+    results = {'done': [], 'skipped': [], 'failed': []}
+    download_path = Path(shard['paths']['downloads']).resolve()
+    # Each shard is its own session, so it gets its own adaptive limit
+    limiter = create_limiter(concurrency, name=f"shard-{shard['id']}")
+    worker_count = max(1, min(limiter.maximum if limiter else concurrency, len(researchers)))
+    started = time.perf_counter()
+
+    with span('shard.extract', shard=shard['id'], researchers=len(researchers)):
+        await asyncio.gather(*[
+            extraction_worker(f"{shard['id']}.{n + 1}", shard['browser'], queue, results, download_path, manifest, limiter)
+            for n in range(worker_count)
+        ])
+
+    # Researchers left behind when every tab of this shard died
+    results['unprocessed'] = []
+    while not queue.empty():
+        results['unprocessed'].append(queue.get_nowait()['position'])
+
+    emit('shard_result', shard=shard['id'], seconds=round(time.perf_counter() - started, 3),
+         **{status: len(positions) for status, positions in results.items()})
+    print(f"🏁 Shard {shard['id']}: {len(results['done'])} done, {len(results['skipped'])} skipped, "
+          f"{len(results['failed'])} failed, {len(results['unprocessed'])} not processed")
+    report_limiter(limiter)
+    return results
+
+def merge_shard_outputs(shards, manifest, download_dir=DOWNLOAD_DIR):
+    """Move every shard's exports into download_dir and point the manifest at the merged files"""
+    target_dir = Path(download_dir).resolve()
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    moved = {}
+    for shard in shards:
+        shard_dir = Path(shard['paths']['downloads'])
+        if not shard_dir.is_dir():
+            continue
+        for file_path in shard_dir.iterdir():
+            if file_path.is_file():
+                merged_path = target_dir / file_path.name
+                os.replace(file_path, merged_path)
+                moved[str(file_path.resolve())] = str(merged_path)
+
+    for entry in manifest['researchers'].values():
+        if entry.get('file_path') in moved:
+            entry['file_path'] = moved[entry['file_path']]
+    save_manifest(manifest)
+
+    catalog = connect_catalog()
+    try:
+        relocate_files(catalog, moved)
+    finally:
+        catalog.close()
+
+    print(f"📦 Merged {len(moved)} shard files into {target_dir}")
+    return len(moved)
+
+async def run_sharded_extraction(shard_count=SHARD_COUNT, concurrency=EXTRACTION_CONCURRENCY):
+    """Log in shard_count browsers, split the researcher list between them and merge their outputs"""
+    shards = []
+    try:
+        started = await asyncio.gather(*[start_shard(n + 1) for n in range(shard_count)])
+        shards = [shard for shard in started if shard]
+        if not shards:
+            print("❌ No shard could log in")
+            return {}
+
+        # One enumeration for all shards; round-robin keeps each shard's share spread over the list
+        researchers = await enumerate_researchers(shards[0]['tab'])
+        if not researchers:
+            print("❌ No researchers found")
+            return {}
+
+        manifest = load_manifest()
+        assignments = [researchers[n::len(shards)] for n in range(len(shards))]
+        print(f"🚀 Extracting {len(researchers)} researchers across {len(shards)} browsers "
+              f"({concurrency} tab(s) each)")
+
+        shard_results = await asyncio.gather(*[
+            run_shard(shard, assigned, manifest, concurrency) for shard, assigned in zip(shards, assignments)
+        ])
+
+        results = {'done': [], 'skipped': [], 'failed': [], 'unprocessed': []}
+        for shard_result in shard_results:
+            for status, positions in shard_result.items():
+                results[status].extend(positions)
+
+        merge_shard_outputs(shards, manifest)
+
+        print(f"\n🎉 Sharded extraction complete!")
+        print(f"   Successful: {len(results['done'])}")
+        print(f"   Skipped (fresh checkpoint): {len(results['skipped'])}")
+        print(f"   Failed: {len(results['failed'])}")
+        if results['unprocessed']:
+            print(f"   Not processed (shard tabs failed): {len(results['unprocessed'])}")
+
+        consolidate_collaborators()
+        return results
+
+    except Exception as e:
+        print(f"❌ Error in sharded extraction: {e}")
+        return {}
+    finally:
+        for shard in shards:
+            await safe_browser_cleanup(shard['browser'])
+
+async def main(shard_count=SHARD_COUNT):
+    start_run()
+    reset_researcher_list()
+    try:
+        results = await run_sharded_extraction(shard_count)
+        return bool(results)
+    finally:
+        end_run()
+
+if __name__ == "__main__":
+    asyncio.run(main())
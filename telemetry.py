@@ -0,0 +1,125 @@
+"""Per-step timing spans and JSON-lines run telemetry"""
+
+import json
+import math
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from config import TELEMETRY_DIR
+
+_run = {
+    'run_id': None,
+    'path': None,
+    'durations': {},  # step -> [seconds]
+    'outcomes': {},   # step -> {outcome: count}
+}
+
+def start_run(telemetry_dir=TELEMETRY_DIR, run_id=None):
+    """Start a new telemetry file for this run - returns its path"""
+    _run['run_id'] = run_id or f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+    _run['path'] = Path(telemetry_dir) / f"run-{_run['run_id']}.jsonl"
+    _run['path'].parent.mkdir(parents=True, exist_ok=True)
+    _run['durations'] = {}
+    _run['outcomes'] = {}
+    emit('run_start')
+    print(f"📈 Telemetry: {_run['path']}")
+    return _run['path']
+
+def emit(event, **fields):
+    """Append one JSON line to the run's telemetry file (no-op before start_run)"""
+    if not _run['path']:
+        return
+    record = {'ts': datetime.now().isoformat(timespec='milliseconds'), 'run_id': _run['run_id'], 'event': event}
+    record.update(fields)
+    try:
+        with open(_run['path'], 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+    except Exception as e:
+        print(f"⚠ Could not write telemetry: {e}")
+
+@contextmanager
+def span(step, **fields):
+    """Time a step; set fields['outcome'] via the yielded dict to report a non-ok result
+
+        with span('import.save', researcher_id=rid) as s:
+            ...
+            if not saved:
+                s['outcome'] = 'failed'
+    """
+    record = dict(fields, outcome='ok')
+    started = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record['outcome'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        _run['durations'].setdefault(step, []).append(duration)
+        outcomes = _run['outcomes'].setdefault(step, {})
+        outcomes[record['outcome']] = outcomes.get(record['outcome'], 0) + 1
+        emit('span', step=step, duration_s=round(duration, 3), **record)
+
+def _percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def summarize_durations(durations):
+    """Compute count/p50/p95/max per step from {step: [seconds]}"""
+    summary = {}
+    for step, values in durations.items():
+        values = sorted(values)
+        summary[step] = {
+            'count': len(values),
+            'p50_s': round(_percentile(values, 0.50), 3),
+            'p95_s': round(_percentile(values, 0.95), 3),
+            'max_s': round(values[-1], 3),
+            'total_s': round(sum(values), 3),
+        }
+    return summary
+
+def end_run():
+    """Write and print the end-of-run summary with p50/p95/max per step type"""
+    summary = summarize_durations(_run['durations'])
+    for step, stats in summary.items():
+        stats['outcomes'] = _run['outcomes'].get(step, {})
+    emit('run_summary', steps=summary)
+    print_step_timings(summary)
+    return summary
+
+def print_step_timings(summary):
+    """Print a step summary as a table, slowest total first"""
+    if not summary:
+        return
+    print("\n📈 STEP TIMINGS (seconds)")
+    print(f"   {'step':<32} {'count':>6} {'p50':>8} {'p95':>8} {'max':>8} {'total':>9}  outcomes")
+    for step, stats in sorted(summary.items(), key=lambda item: -item[1]['total_s']):
+        outcomes = ', '.join(f"{outcome} {count}" for outcome, count in sorted(stats.get('outcomes', {}).items()))
+        print(f"   {step:<32} {stats['count']:>6} {stats['p50_s']:>8.2f} {stats['p95_s']:>8.2f} "
+              f"{stats['max_s']:>8.2f} {stats['total_s']:>9.1f}  {outcomes}")
+
+def load_spans(path):
+    """Read span records back from a telemetry file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [record for record in map(json.loads, f) if record.get('event') == 'span']
+
+def summarize_spans(spans):
+    """Step summary (as end_run builds it) from span records read back with load_spans"""
+    durations, outcomes = {}, {}
+    for record in spans:
+        durations.setdefault(record['step'], []).append(record['duration_s'])
+        step_outcomes = outcomes.setdefault(record['step'], {})
+        step_outcomes[record['outcome']] = step_outcomes.get(record['outcome'], 0) + 1
+    summary = summarize_durations(durations)
+    for step, stats in summary.items():
+        stats['outcomes'] = outcomes[step]
+    return summary
+
+def latest_run_file(telemetry_dir=TELEMETRY_DIR):
+    """Most recently written run telemetry file, or None"""
+    files = sorted(Path(telemetry_dir).glob('run-*.jsonl'), key=lambda path: path.stat().st_mtime)
+    return files[-1] if files else None
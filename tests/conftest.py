@@ -0,0 +1,49 @@
+"""Shared fixtures - the modules under test live at the repository root"""
+
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+SAMPLE_EXPORTS = sorted((REPO_ROOT / 'scival_downloads').glob('Authors_collaborating_with_*.csv'))
+
+from mock_scival import MockSciValState, start_mock_server
+
+@pytest.fixture(autouse=True)
+def isolated_retry_queue(tmp_path, monkeypatch):
+    """Every test gets its own empty retry queue file instead of ./scival_downloads/retry_queue.json"""
+    import retry_queue
+    monkeypatch.setitem(retry_queue._queue, 'data', None)
+    monkeypatch.setitem(retry_queue._queue, 'path', str(tmp_path / 'retry_queue.json'))
+    return retry_queue
+
+@pytest.fixture
+def mock_scival():
+    """A mock SciVal server with three researchers - yields (state, base_url)"""
+    state = MockSciValState(researchers=3)
+    server, base_url = start_mock_server(state)
+    try:
+        yield state, base_url
+    finally:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def sample_exports(tmp_path):
+    """Copy of the bundled collaborator exports in a scratch download directory"""
+    download_dir = tmp_path / 'scival_downloads'
+    download_dir.mkdir()
+    for path in SAMPLE_EXPORTS:
+        shutil.copy(path, download_dir / path.name)
+    return download_dir
+
+@pytest.fixture
+def consolidated_store(sample_exports, tmp_path):
+    """The bundled exports loaded into a scratch collaborator store - returns (store path, catalog path)"""
+    from collaborator_store import consolidate_collaborators
+    db_path, catalog_db = tmp_path / 'collaborators.sqlite', tmp_path / 'catalog.sqlite'
+    consolidate_collaborators(sample_exports, db_path, catalog_db)
+    return db_path, catalog_db
@@ -0,0 +1,114 @@
+"""Co-authorship graph and institution aggregates against hand-checked values"""
+
+from itertools import combinations
+
+import pytest
+
+import collaborator_store
+import download_catalog
+from coauthor_graph import load_collaborations, focal_scopus_ids, CoauthorGraph, institution_aggregates
+
+EXPORTS = [
+    # (export_id, focal researcher, date exported)
+    (1, 'Alpha, A.', '2025-01-01'),
+    (2, 'Alpha, A.', '2025-07-01'),
+    (3, 'Beta, B.', '2025-07-01'),
+]
+COLLABORATORS = [
+    # (export_id, author, institution_id, institution, publications, citations, fwci, scopus_author_id)
+    (1, 'Old, O.', 30, 'Superseded U', 9, 90, 3.0, 999),
+    (2, 'One, C.', 10, 'Uni Ten', 5, 50, 2.0, 1),
+    (2, 'Two, C.', 10, 'Uni Ten', 3, 30, None, 2),
+    (2, 'Three, C.', 20, 'Inst Twenty', 1, 4, 1.0, 300),
+    (3, 'One, C.', 10, 'Uni Ten', 4, 40, 1.0, 1),
+    (3, 'Alpha, A.', 20, 'Inst Twenty', 2, 10, 0.5, 100),
+    (3, 'Four, C.', None, None, 7, 70, 1.5, 3),
+    (3, 'Nobody, N.', 20, 'Inst Twenty', 1, 0, None, None),
+]
+
+@pytest.fixture
+def collaborations(tmp_path):
+    """A two-researcher store where Beta lists Alpha (Scopus ID 100) as a collaborator"""
+    db_path = tmp_path / 'collaborators.sqlite'
+    conn = collaborator_store.connect(db_path)
+    with conn:
+        exports = {export_id: (name, date) for export_id, name, date in EXPORTS}
+        conn.executemany('INSERT INTO exports (export_id, focal_researcher, date_exported, source_file) VALUES (?, ?, ?, ?)',
+                         [(export_id, name, date, f"{export_id}.csv") for export_id, name, date in EXPORTS])
+        conn.executemany(
+            'INSERT INTO collaborators (export_id, focal_researcher, date_exported, author, institution_id, institution, '
+            'coauthored_publications, citations, fwci, scopus_author_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [(row[0], *exports[row[0]], *row[1:]) for row in COLLABORATORS]
+        )
+    conn.close()
+    return load_collaborations(db_path)
+
+def test_only_latest_exports_are_loaded(collaborations):
+    assert 999 not in collaborations['scopus_author_id']
+    assert len(collaborations['focal']) == len(COLLABORATORS) - 1
+
+def test_degree_ranking_merges_known_focal_ids(collaborations):
+    graph = CoauthorGraph(collaborations, {'Alpha, A.': '100'})
+    assert [(row['node'], row['degree'], row['weighted_degree'], row['focal']) for row in graph.degree_ranking()] == [
+        ('name:Beta, B.', 3, 13.0, True),
+        ('100', 4, 11.0, True),
+        ('1', 2, 9.0, False),
+        ('3', 1, 7.0, False),
+        ('2', 1, 3.0, False),
+        ('300', 1, 1.0, False),
+    ]
+    assert graph.adjacency.nnz // 2 == 6
+    assert len(graph.degree_ranking(top=2)) == 2
+
+def test_unknown_focal_id_stays_a_separate_node(collaborations):
+    graph = CoauthorGraph(collaborations)
+    ranking = {row['node']: row for row in graph.degree_ranking(top=None)}
+    assert ranking['name:Alpha, A.']['weighted_degree'] == 9.0
+    assert ranking['100'] == {'node': '100', 'degree': 1, 'weighted_degree': 2.0, 'focal': False}
+
+def test_shared_collaborators(collaborations):
+    graph = CoauthorGraph(collaborations, {'Alpha, A.': '100'})
+    assert graph.shared_collaborators() == [{'researcher_a': 'Alpha, A.', 'researcher_b': 'Beta, B.', 'shared': 1}]
+    assert graph.collaborators_in_common('Alpha, A.', 'Beta, B.') == [1]
+
+def test_institution_aggregates(collaborations):
+    rows = institution_aggregates(collaborations)
+    assert [row['institution_id'] for row in rows] == [10, 20]
+    ten, twenty = rows
+    assert ten == {'institution_id': 10, 'institution': 'Uni Ten', 'collaborators': 2, 'focal_researchers': 2,
+                   'coauthored_publications': 12, 'citations': 120, 'fwci': round(14 / 9, 3)}
+    # The row without a Scopus ID counts towards totals but not distinct collaborators
+    assert twenty == {'institution_id': 20, 'institution': 'Inst Twenty', 'collaborators': 2, 'focal_researchers': 2,
+                      'coauthored_publications': 4, 'citations': 14, 'fwci': round(2 / 3, 3)}
+    assert institution_aggregates(collaborations, top=1) == [ten]
+
+def test_sample_store_matches_set_arithmetic(consolidated_store):
+    db_path, catalog_db = consolidated_store
+    conn = download_catalog.connect(catalog_db)
+    download_catalog.link_scopus_ids(conn, {'Liu, Chunhua': '7404500000'})
+    conn.close()
+    assert focal_scopus_ids(catalog_db) == {'Liu, Chunhua': '7404500000'}
+
+    collaborations = load_collaborations(db_path)
+    graph = CoauthorGraph(collaborations, focal_scopus_ids(catalog_db))
+    assert len(graph.focal_names) == 6
+    assert '7404500000' in graph.nodes and 'name:Liu, Chunhua' not in graph.nodes
+
+    ids = {name: set() for name in graph.focal_names}
+    for focal, scopus_id in zip(collaborations['focal'], collaborations['scopus_author_id']):
+        if scopus_id >= 0:
+            ids[focal].add(int(scopus_id))
+    expected = {tuple(sorted(pair)): len(ids[pair[0]] & ids[pair[1]]) for pair in combinations(ids, 2)}
+    pairs = graph.shared_collaborators(top=None)
+    assert pairs
+    assert {(row['researcher_a'], row['researcher_b']): row['shared'] for row in pairs} == {
+        pair: shared for pair, shared in expected.items() if shared
+    }
+    for row in pairs:
+        assert set(graph.collaborators_in_common(row['researcher_a'], row['researcher_b'])) == (
+            ids[row['researcher_a']] & ids[row['researcher_b']]
+        )
+
+    totals = {row['institution_id']: row['coauthored_publications'] for row in institution_aggregates(collaborations)}
+    has_institution = collaborations['institution_id'] >= 0
+    assert sum(totals.values()) == collaborations['coauthored_publications'][has_institution].sum()
@@ -0,0 +1,64 @@
+"""Collaborator export parsing and the consolidated store, on the bundled sample exports"""
+
+import csv
+import sqlite3
+
+from collaborator_parser import parse_collaborators_export
+from collaborator_store import connect, append_export, consolidate_collaborators
+from conftest import SAMPLE_EXPORTS
+
+LIU = next(path for path in SAMPLE_EXPORTS if 'Liu' in path.name)
+
+def table_rows(path):
+    """Collaborator rows counted straight from the CSV, independently of the parser"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.reader(f))
+    start = next(i for i, row in enumerate(rows) if row and row[0] == 'Author') + 1
+    end = next(i for i in range(start, len(rows)) if not any(cell.strip() for cell in rows[i]))
+    return end - start
+
+def test_parse_sample_export():
+    metadata, rows = parse_collaborators_export(LIU)
+    rows = list(rows)
+    assert metadata['Entity'] == 'Liu, Chunhua'
+    assert (metadata['date_exported'], metadata['date_last_updated']) == ('2025-07-28', '2025-07-16')
+    assert metadata['Author numbers'] == '<= 10'
+    assert len(rows) == table_rows(LIU) == 60
+    assert rows[0] == {
+        'author': 'Dong, Zhiping', 'institution_id': 205002, 'institution': 'City University of Hong Kong',
+        'sector': 'academic', 'coauthored_publications': 51, 'citations': 645,
+        'citations_per_publication': 12.6, 'fwci': 2.08, 'scopus_author_id': 57214728775,
+    }
+    # '-' placeholders become None; the copyright footer is not a row
+    assert rows[-1]['author'] == 'Zhou, George You' and rows[-1]['institution_id'] is None
+
+def test_bytes_and_path_parse_the_same():
+    from_path = parse_collaborators_export(LIU)
+    from_bytes = parse_collaborators_export(LIU.read_bytes())
+    assert from_path[0] == from_bytes[0]
+    assert list(from_path[1]) == list(from_bytes[1])
+
+def test_consolidation_loads_every_export_once(sample_exports, tmp_path):
+    db_path, catalog_db = tmp_path / 'collaborators.sqlite', tmp_path / 'catalog.sqlite'
+    assert consolidate_collaborators(sample_exports, db_path, catalog_db) == len(SAMPLE_EXPORTS) == 6
+    # Unchanged content is skipped on the next pass
+    assert consolidate_collaborators(sample_exports, db_path, catalog_db) == 0
+
+    conn = sqlite3.connect(db_path)
+    try:
+        counts = dict(conn.execute('SELECT focal_researcher, row_count FROM exports'))
+        stored = conn.execute('SELECT COUNT(*) FROM collaborators').fetchone()[0]
+    finally:
+        conn.close()
+    assert sum(counts.values()) == stored == sum(table_rows(path) for path in SAMPLE_EXPORTS)
+    assert counts['Liu, Chunhua'] == 60
+
+def test_reloading_an_export_replaces_it(tmp_path):
+    conn = connect(tmp_path / 'collaborators.sqlite')
+    try:
+        assert append_export(conn, LIU) == ('Liu, Chunhua', 60)
+        assert append_export(conn, LIU) == ('Liu, Chunhua', 60)
+        assert conn.execute('SELECT COUNT(*) FROM exports').fetchone()[0] == 1
+        assert conn.execute('SELECT COUNT(*) FROM collaborators').fetchone()[0] == 60
+    finally:
+        conn.close()
@@ -0,0 +1,65 @@
+"""AIMD limiter: additive increase, one halving per burst of congestion"""
+
+import asyncio
+import time
+
+from concurrency import AIMDLimiter
+
+def feed(limiter, *attempts):
+    """Record (ok, latency, started) attempts in order - returns the limit after each"""
+    async def run():
+        limits = []
+        for ok, latency, started in attempts:
+            await limiter.record(ok, latency, started)
+            limits.append(limiter.limit)
+        return limits
+    return asyncio.run(run())
+
+def test_increase_after_a_window_of_fast_successes():
+    limiter = AIMDLimiter(2, maximum=4)
+    now = time.perf_counter()
+    assert feed(limiter, *[(True, 1.0, now)] * 8) == [2, 3, 3, 3, 4, 4, 4, 4]
+    assert limiter.summary() == {'limiter': 'extract', 'final': 4, 'min': 2, 'max': 4, 'changes': 2}
+
+def test_burst_of_failures_halves_once():
+    limiter = AIMDLimiter(8, maximum=8)
+    burst_started = time.perf_counter()
+    assert feed(limiter, *[(False, 5.0, burst_started)] * 4) == [4, 4, 4, 4]
+    # An attempt started after the decrease is a fresh congestion signal
+    assert feed(limiter, (False, 5.0, time.perf_counter())) == [2]
+
+def test_limit_stays_within_bounds():
+    limiter = AIMDLimiter(3, minimum=2, maximum=3)
+    assert limiter.limit == 3
+    for _ in range(3):
+        feed(limiter, (False, 1.0, time.perf_counter()))
+    assert limiter.limit == 2
+    assert feed(limiter, *[(True, 1.0, time.perf_counter())] * 10)[-1] == 3
+    assert AIMDLimiter(10, maximum=4).limit == 4
+    assert AIMDLimiter(0, minimum=1).limit == 1
+
+def test_slow_success_counts_as_congestion():
+    limiter = AIMDLimiter(4, maximum=8, latency_factor=3)
+    now = time.perf_counter()
+    assert feed(limiter, (True, 1.0, now), (True, 2.9, now)) == [4, 4]
+    assert limiter.successes == 2
+    assert feed(limiter, (True, 3.5, time.perf_counter())) == [2]
+    assert limiter.successes == 0
+    assert limiter.summary()['min'] == 2
+
+def test_slot_caps_in_flight():
+    limiter = AIMDLimiter(2, maximum=2)
+    peak = 0
+
+    async def work():
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(work() for _ in range(6)))
+
+    asyncio.run(run())
+    assert peak == 2
+    assert limiter.in_flight == 0
@@ -0,0 +1,32 @@
+"""Request screening in the daemon's HTTP API"""
+
+import asyncio
+import json
+
+from daemon import SciValDaemon
+
+def call(daemon, method, path, headers=None, body=b''):
+    return asyncio.run(daemon.route(method, path, {k.lower(): v for k, v in (headers or {}).items()}, body))
+
+def test_requests_need_the_bearer_token():
+    daemon = SciValDaemon(None, None, token='s3cret')
+    assert call(daemon, 'GET', '/status')[0] == 401
+    assert call(daemon, 'GET', '/status', {'Authorization': 'Bearer wrong'})[0] == 401
+    assert call(daemon, 'GET', '/status', {'Authorization': 'Bearer s3cret'})[0] == 200
+
+def test_a_token_is_generated_when_none_is_configured():
+    first, second = SciValDaemon(None, None), SciValDaemon(None, None)
+    assert len(first.token) >= 32 and first.token != second.token
+
+def test_browser_and_non_json_posts_are_rejected():
+    daemon = SciValDaemon(None, None, token='s3cret')
+    auth = {'Authorization': 'Bearer s3cret'}
+    body = json.dumps({'type': 'export'}).encode()
+
+    assert call(daemon, 'POST', '/jobs', {**auth, 'Content-Type': 'text/plain'}, body)[0] == 415
+    assert call(daemon, 'POST', '/shutdown', auth)[0] == 415
+    assert call(daemon, 'POST', '/jobs', {**auth, 'Content-Type': 'application/json', 'Origin': 'https://example.com'}, body)[0] == 403
+    assert not daemon.jobs and not daemon.stopping.is_set()
+
+    status, job = call(daemon, 'POST', '/jobs', {**auth, 'Content-Type': 'application/json; charset=utf-8'}, body)
+    assert status == 202 and job['type'] == 'export'
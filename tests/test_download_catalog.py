@@ -0,0 +1,20 @@
+"""Download catalog records for extracted exports"""
+
+from coauthor_graph import focal_scopus_ids
+from download_catalog import catalog_download, latest_download, connect
+
+def test_catalog_download_takes_the_scopus_id_from_the_entity_uri(sample_exports, tmp_path):
+    db = tmp_path / 'catalog.sqlite'
+    export = sample_exports / 'Authors_collaborating_with_Liu,_Chunhua.csv'
+    researcher = {'position': 1, 'name': 'Liu, Chunhua', 'uri': 'Researcher/56950986900'}
+
+    assert catalog_download(export, researcher, db) is True
+    assert focal_scopus_ids(db) == {'Liu, Chunhua': '56950986900'}
+
+    # The same content again is not a change and keeps the ID
+    assert catalog_download(export, {'name': 'Liu, Chunhua', 'uri': 'Institution/205002'}, db) is False
+    conn = connect(db)
+    try:
+        assert latest_download(conn, 'Liu, Chunhua')['scopus_author_id'] == '56950986900'
+    finally:
+        conn.close()
@@ -0,0 +1,20 @@
+"""Captured exports are written inside the target directory whatever name the server sends"""
+
+import pytest
+
+from export_capture import FALLBACK_EXPORT_NAME, save_captured_export
+
+@pytest.mark.parametrize('filename, expected', [
+    ('Authors_collaborating_with_Doe,_Jane.csv', 'Authors_collaborating_with_Doe,_Jane.csv'),
+    ('../../etc/cron.d/evil.csv', 'evil.csv'),
+    ('/tmp/absolute.csv', 'absolute.csv'),
+    ('..\\windows\\style.csv', 'style.csv'),
+    ('..', FALLBACK_EXPORT_NAME),
+    ('', FALLBACK_EXPORT_NAME),
+])
+def test_saved_file_stays_in_target_dir(tmp_path, filename, expected):
+    target = tmp_path / 'downloads'
+    saved = save_captured_export({'filename': filename, 'data': b'a,b\n'}, target)
+    assert saved == (target / expected).resolve()
+    assert saved.read_bytes() == b'a,b\n'
+    assert sorted(p.name for p in tmp_path.rglob('*') if p.is_file()) == [expected]
@@ -0,0 +1,57 @@
+"""Batch import: organize-step parsing and chunking of the wizard passes"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import import_researchers
+from import_researchers import import_researchers_batch, parse_organize_outcomes
+from retry_queue import pending
+
+ORGANIZE_TEXT = """Organize researchers
+Doe, Jane (57000000001)
+57000000002 - Scopus author ID not found
+Researcher 570000000031 matched
+"""
+
+def test_parse_organize_outcomes():
+    outcomes = parse_organize_outcomes(ORGANIZE_TEXT, ['57000000001', '57000000002', '57000000003'])
+    # 57000000003 only appears as part of a longer number, so it is not confirmed
+    assert outcomes == {'57000000001': 'imported', '57000000002': 'not_found', '57000000003': 'unconfirmed'}
+    assert parse_organize_outcomes(None, ['1']) == {'1': 'unconfirmed'}
+
+@pytest.fixture
+def wizard(monkeypatch):
+    """Replace the browser wizard - records each pass; IDs in wizard.failing make a pass fail"""
+    wizard = SimpleNamespace(calls=[], failing=set())
+
+    async def run_import_wizard(tab, ids):
+        wizard.calls.append(list(ids))
+        if wizard.failing.intersection(ids):
+            return None
+        return {researcher_id: 'imported' for researcher_id in ids}
+
+    async def no_wait(attempt, description):
+        pass
+
+    monkeypatch.setattr(import_researchers, 'run_import_wizard', run_import_wizard)
+    monkeypatch.setattr(import_researchers, 'wait_before_retry', no_wait)
+    return wizard
+
+IDS = [str(57000000000 + n) for n in range(5)]
+
+@pytest.mark.parametrize('chunk_size, passes', [(2, [2, 2, 1]), (25, [5]), (0, [1, 1, 1, 1, 1]), (-3, [1, 1, 1, 1, 1])])
+def test_ids_are_imported_in_chunks(wizard, chunk_size, passes):
+    outcomes = asyncio.run(import_researchers_batch(None, IDS, chunk_size))
+    assert [len(call) for call in wizard.calls] == passes
+    assert outcomes == dict.fromkeys(IDS, 'imported')
+
+def test_failed_chunk_is_split_until_the_bad_id_is_isolated(wizard):
+    wizard.failing = {IDS[3]}
+    outcomes = asyncio.run(import_researchers_batch(None, IDS, 5))
+
+    assert wizard.calls[:3] == [IDS, IDS[:2], IDS[2:]]
+    assert outcomes[IDS[3]] == 'failed'
+    assert all(outcomes[researcher_id] == 'imported' for researcher_id in IDS if researcher_id != IDS[3])
+    assert [entry['key'] for entry in pending('import')] == [IDS[3]]
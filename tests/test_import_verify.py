@@ -0,0 +1,62 @@
+"""Post-import verification against one researcher list fetch per round"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import import_researchers
+from import_researchers import import_and_verify
+from retry_queue import pending, NOT_VERIFIED
+
+@pytest.fixture
+def scival(monkeypatch):
+    """A fake My SciVal list - the wizard adds every ID except those in dropped (lost once) and never_lands"""
+    scival = SimpleNamespace(present=set(), dropped=set(), never_lands=set(), wizard_calls=[], exports=0, unavailable=False)
+
+    async def run_import_wizard(tab, ids):
+        scival.wizard_calls.append(list(ids))
+        for researcher_id in ids:
+            if researcher_id.startswith('9') or researcher_id in scival.never_lands:
+                continue
+            if researcher_id in scival.dropped:
+                scival.dropped.discard(researcher_id)
+            else:
+                scival.present.add(researcher_id)
+        return {researcher_id: 'not_found' if researcher_id.startswith('9') else 'unconfirmed' for researcher_id in ids}
+
+    async def export_existing_researchers(tab, download_dir):
+        scival.exports += 1
+        if scival.unavailable:
+            return [], None
+        return sorted(scival.present), 'mySciVal_Researchers_Export.csv'
+
+    monkeypatch.setattr(import_researchers, 'run_import_wizard', run_import_wizard)
+    monkeypatch.setattr(import_researchers, 'export_existing_researchers', export_existing_researchers)
+    return scival
+
+IDS = ['57000000001', '57000000002', '57000000003', '90000000001']
+
+def test_only_missing_ids_are_reimported(scival):
+    scival.dropped = {'57000000002'}
+    outcomes = asyncio.run(import_and_verify(None, IDS, chunk_size=25, verify_rounds=2))
+
+    assert scival.wizard_calls == [IDS, ['57000000002']]
+    assert scival.exports == 2
+    assert outcomes == {'57000000001': 'imported', '57000000002': 'imported', '57000000003': 'imported',
+                        '90000000001': 'not_found'}
+
+def test_ids_still_missing_after_the_last_round_are_queued(scival):
+    scival.never_lands = {'57000000003'}
+    outcomes = asyncio.run(import_and_verify(None, IDS[:3], chunk_size=25, verify_rounds=2))
+
+    assert scival.wizard_calls == [IDS[:3], ['57000000003']]
+    assert outcomes['57000000003'] == 'missing'
+    assert [(e['key'], e['reason']) for e in pending('import')] == [('57000000003', NOT_VERIFIED)]
+    assert outcomes['57000000001'] == outcomes['57000000002'] == 'imported'
+
+def test_unavailable_list_leaves_the_import_unverified(scival):
+    scival.unavailable = True
+    outcomes = asyncio.run(import_and_verify(None, IDS[:2], chunk_size=25))
+    assert scival.exports == 1
+    assert outcomes == dict.fromkeys(IDS[:2], 'unconfirmed')
@@ -0,0 +1,66 @@
+"""The login sequence in login.py must complete against mock_scival.py"""
+
+import asyncio
+import http.cookiejar
+import urllib.parse
+import urllib.request
+
+import pytest
+
+from mock_scival import MOCK_HOST, mock_urls
+
+def loopback(url):
+    """*.localhost does not resolve everywhere outside a browser - talk to the loopback address directly"""
+    return url.replace(MOCK_HOST, '127.0.0.1')
+
+def test_cityu_sign_in_leaves_the_cityu_form_and_oauth_reaches_my_scival(mock_scival):
+    _, base_url = mock_scival
+    urls = {name: loopback(url) for name, url in mock_urls(base_url).items()}
+    client = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    assert 'cred_sign_in_button' in client.open(urls['CITYU_LOGIN_URL']).read().decode()
+
+    # login.py waits for #cred_sign_in_button to disappear after this POST
+    form = urllib.parse.urlencode({'username': 'user', 'password': 'secret'}).encode()
+    response = client.open(urls['CITYU_LOGIN_URL'], data=form)
+    page = response.read().decode()
+    assert urllib.parse.urlsplit(response.geturl()).path != '/ezlogin'
+    assert 'cred_sign_in_button' not in page
+
+    page = client.open(urls['OAUTH2_URL']).read().decode()
+    assert 'bdd-email' in page
+
+    form = urllib.parse.urlencode({'email': 'user@example.com', 'password': 'secret'}).encode()
+    response = client.open(urls['OAUTH2_URL'], data=form)
+    page = response.read().decode()
+    assert urllib.parse.urlsplit(response.geturl()).path == '/mySciVal'
+    assert 'bdd-password' not in page
+    assert 'id="mySciVal"' in page
+
+def test_login_completes_in_a_browser(mock_scival, monkeypatch, tmp_path):
+    nodriver_config = pytest.importorskip('nodriver.core.config')
+    try:
+        nodriver_config.find_chrome_executable()
+    except FileNotFoundError:
+        pytest.skip('no Chrome/Chromium installed')
+
+    import login
+    from browser_utils import create_browser, safe_browser_cleanup
+
+    _, base_url = mock_scival
+    urls = mock_urls(base_url)
+    monkeypatch.setattr(login, 'CITYU_LOGIN_URL', urls['CITYU_LOGIN_URL'])
+    monkeypatch.setattr(login, 'OAUTH2_URL', urls['OAUTH2_URL'])
+    for name in ('ELSEVIER_USERNAME', 'ELSEVIER_PASSWORD', 'ELSEVIER_SECOND_PASSWORD'):
+        monkeypatch.setattr(login, name, 'benchmark')
+    monkeypatch.setattr(login, 'ELSEVIER_EMAIL', 'benchmark@example.com')
+
+    async def run():
+        browser = await create_browser(user_data_dir=tmp_path / 'profile', download_dir=tmp_path / 'downloads', fast_mode=True)
+        try:
+            tab = await login.login(browser)
+            return tab and await tab.evaluate('location.pathname')
+        finally:
+            await safe_browser_cleanup(browser)
+
+    assert asyncio.run(run()) == '/mySciVal'
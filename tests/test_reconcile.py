@@ -0,0 +1,51 @@
+"""Scopus ID normalization and reconciliation of target IDs against My SciVal"""
+
+import pytest
+
+from mock_scival import MockSciValState, researchers_csv
+from reconcile import (
+    normalize_scopus_id, reconcile_ids, load_target_ids, read_existing_scopus_ids, read_researcher_name_ids
+)
+
+@pytest.mark.parametrize('value, expected', [
+    ('57201194512', '57201194512'),
+    (' "57201194512" ', '57201194512'),
+    ('57201194512.0', '57201194512'),
+    (57201194512, '57201194512'),
+    ('572 0119 4512', '57201194512'),
+    ('Scopus ID', None),
+    ('', None),
+    (None, None),
+])
+def test_normalize_scopus_id(value, expected):
+    assert normalize_scopus_id(value) == expected
+
+def test_reconcile_ids():
+    result = reconcile_ids(
+        ['57000000003', '57000000001', '57000000001.0', 'n/a', '57000000004'],
+        ['57000000001', '57000000002', ' 57000000004 '],
+    )
+    assert result == {
+        'targets': 3,
+        'existing': 3,
+        'already_present': 2,
+        'to_import': ['57000000003'],
+        'to_remove': ['57000000002'],
+    }
+
+def test_researcher_export_ids_and_names():
+    export = researchers_csv(MockSciValState(researchers=3)).encode('utf-8')
+    # Researchers carrying several IDs list them in one cell
+    export += b'"Multi, Person","57100000001|57100000002",4\n'
+    assert read_existing_scopus_ids(export) == ['57000000000', '57000000001', '57000000002', '57100000001', '57100000002']
+    assert read_researcher_name_ids(export) == {
+        'Researcher0000, Test': '57000000000',
+        'Researcher0001, Test': '57000000001',
+        'Researcher0002, Test': '57000000002',
+        'Multi, Person': '57100000001',
+    }
+
+def test_load_target_ids_dedupes_and_reports_invalid(tmp_path):
+    targets = tmp_path / 'researcher_ids.csv'
+    targets.write_text('researcher_id\n57000000001\n57000000002.0\n57000000001\nabc\n\n', encoding='utf-8')
+    assert load_target_ids(targets) == {'ids': ['57000000001', '57000000002'], 'rows': 4, 'duplicates': 1, 'invalid': ['abc']}
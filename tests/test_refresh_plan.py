@@ -0,0 +1,65 @@
+"""Which researchers a refresh re-extracts, and in what order"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from download_catalog import connect, catalog_file
+from refresh import plan_refresh, NEVER_EXTRACTED, DATA_UPDATED, MAX_AGE, PROBE
+
+def export_path(download_dir, name):
+    return download_dir / f"Authors_collaborating_with_{name.replace(' ', '_')}.csv"
+
+def republish(path):
+    """Turn an export into one taken after SciVal's next data release"""
+    text = path.read_text(encoding='utf-8-sig')
+    text = text.replace('Date last updated,16 July 2025', 'Date last updated,20 August 2025')
+    path.write_text(text.replace('Date exported,28 July 2025', 'Date exported,21 August 2025'), encoding='utf-8-sig')
+
+@pytest.fixture
+def catalog(sample_exports, tmp_path):
+    """Catalog of the sample exports, with Liu and Yuan re-exported after a newer data release"""
+    for name in ('Liu, Chunhua', 'Yuan, Zhiguo'):
+        republish(export_path(sample_exports, name))
+    conn = connect(tmp_path / 'catalog.sqlite')
+    for path in sorted(sample_exports.glob('*.csv')):
+        catalog_file(conn, path)
+    yield conn
+    conn.close()
+
+def manifest_for(download_dir, extracted_days_ago):
+    now = datetime.now()
+    return {'researchers': {
+        name: {'file_path': str(export_path(download_dir, name)), 'extracted_at': (now - timedelta(days=days)).isoformat()}
+        for name, days in extracted_days_ago.items()
+    }}
+
+def researchers(*names):
+    return [{'position': n, 'name': name, 'uri': None} for n, name in enumerate(names, 1)]
+
+def test_plan_reasons_and_order(sample_exports, catalog):
+    export_path(sample_exports, 'Wang, Wenxiong').unlink()
+    manifest = manifest_for(sample_exports, {
+        'Leung, Michael Kwok Hi': 1,  # recent, but taken before the August release
+        'Liu, Chunhua': 40,           # current release, older than REFRESH_MAX_AGE_DAYS
+        'Yuan, Zhiguo': 1,            # current and recent
+        'Wang, Wenxiong': 1,          # checkpointed, but the file is gone
+    })
+    plan = plan_refresh(
+        researchers('Yuan, Zhiguo', 'Liu, Chunhua', 'Leung, Michael Kwok Hi', 'Horton, Benjamin Peter', 'Wang, Wenxiong'),
+        manifest, catalog, max_age_days=30,
+    )
+    assert [(item['researcher']['name'], item['reason']) for item in plan] == [
+        ('Horton, Benjamin Peter', NEVER_EXTRACTED),
+        ('Wang, Wenxiong', NEVER_EXTRACTED),
+        ('Leung, Michael Kwok Hi', DATA_UPDATED),
+        ('Liu, Chunhua', MAX_AGE),
+    ]
+    assert plan[2]['date_last_updated'] == '2025-07-16'
+
+def test_probe_when_nothing_is_stale(sample_exports, catalog):
+    manifest = manifest_for(sample_exports, {'Liu, Chunhua': 3, 'Yuan, Zhiguo': 1})
+    plan = plan_refresh(researchers('Yuan, Zhiguo', 'Liu, Chunhua'), manifest, catalog, max_age_days=30)
+    # The oldest extraction is spent on detecting the next data release
+    assert [(item['researcher']['name'], item['reason']) for item in plan] == [('Liu, Chunhua', PROBE)]
+    assert plan_refresh(researchers('Yuan, Zhiguo'), manifest, catalog, max_age_days=30, probe=False) == []
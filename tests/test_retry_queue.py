@@ -0,0 +1,48 @@
+"""Retry queue reasons, backoff bounds and persistence"""
+
+import asyncio
+import json
+
+import pytest
+
+import retry_queue
+from retry_queue import (
+    backoff_delay, classify_exception, record_failure, resolve, pending, load_retry_queue,
+    TIMEOUT, CONNECTION, EXCEPTION, NOT_FOUND, EXTRACT_FAILED,
+)
+
+@pytest.mark.parametrize('error, reason', [
+    (asyncio.TimeoutError(), TIMEOUT),
+    (TimeoutError('overview page did not load'), TIMEOUT),
+    (ConnectionResetError(), CONNECTION),
+    (type('ConnectionClosedError', (Exception,), {})(), CONNECTION),
+    (RuntimeError('Save button not found'), EXCEPTION),
+])
+def test_classify_exception(error, reason):
+    assert classify_exception(error) == reason
+
+def test_backoff_doubles_with_jitter_and_caps():
+    for attempt, ceiling in [(1, 2), (2, 4), (3, 8), (4, 16), (10, 30)]:
+        delays = [backoff_delay(attempt, base_delay=2, max_delay=30) for _ in range(200)]
+        # Jitter keeps each delay in the upper half of the capped exponential step
+        assert ceiling / 2 <= min(delays) and max(delays) <= ceiling
+
+def test_failures_persist_and_resolve(isolated_retry_queue):
+    record_failure('extract', 'Doe, Jane', EXTRACT_FAILED, payload={'position': 3}, error=RuntimeError('boom'))
+    record_failure('extract', 'Doe, Jane', TIMEOUT, attempts=2)
+    record_failure('import', '57000000009', NOT_FOUND)
+
+    entry, = pending('extract')
+    assert (entry['reason'], entry['attempts'], entry['payload']) == (TIMEOUT, 3, {'position': 3})
+    # Unknown IDs are permanent and only listed on request
+    assert pending('import') == []
+    assert [e['key'] for e in pending('import', include_permanent=True)] == ['57000000009']
+
+    # A fresh process reads the same queue back from disk
+    path = isolated_retry_queue._queue['path']
+    retry_queue._queue['data'] = None
+    assert set(load_retry_queue(path)['entries']) == {'extract:Doe, Jane', 'import:57000000009'}
+
+    resolve('extract', 'Doe, Jane')
+    with open(path, encoding='utf-8') as f:
+        assert list(json.load(f)['entries']) == ['import:57000000009']
@@ -0,0 +1,49 @@
+"""ensure_logged_in reuses a saved session and only falls back to the full login when it is rejected"""
+
+import asyncio
+
+import pytest
+
+import login
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Replace the browser steps of ensure_logged_in - restored / logged_in set what each step returns"""
+    calls = {'restore': 0, 'login': 0, 'save': [], 'restored': None, 'logged_in': 'fresh-tab'}
+
+    async def restore_session(browser, cookies_file):
+        calls['restore'] += 1
+        return calls['restored']
+
+    async def full_login(browser):
+        calls['login'] += 1
+        return calls['logged_in']
+
+    async def save_session(browser, cookies_file):
+        calls['save'].append(cookies_file)
+
+    monkeypatch.setattr(login, 'restore_session', restore_session)
+    monkeypatch.setattr(login, 'login', full_login)
+    monkeypatch.setattr(login, 'save_session', save_session)
+    monkeypatch.setattr(login, 'REUSE_SESSION', True)
+    return calls
+
+def test_valid_saved_session_skips_the_login(calls):
+    calls['restored'] = 'saved-tab'
+    assert asyncio.run(login.ensure_logged_in(None, 'cookies.dat')) == 'saved-tab'
+    assert (calls['login'], calls['save']) == (0, [])
+
+def test_rejected_session_logs_in_and_saves_the_new_cookies(calls):
+    assert asyncio.run(login.ensure_logged_in(None, 'cookies.dat')) == 'fresh-tab'
+    assert (calls['restore'], calls['login'], calls['save']) == (1, 1, ['cookies.dat'])
+
+def test_failed_login_saves_nothing(calls):
+    calls['logged_in'] = None
+    assert asyncio.run(login.ensure_logged_in(None, 'cookies.dat')) is None
+    assert calls['save'] == []
+
+def test_session_reuse_off_always_logs_in(calls, monkeypatch):
+    monkeypatch.setattr(login, 'REUSE_SESSION', False)
+    calls['restored'] = 'saved-tab'
+    assert asyncio.run(login.ensure_logged_in(None, 'cookies.dat')) == 'fresh-tab'
+    assert (calls['restore'], calls['save']) == (0, [])
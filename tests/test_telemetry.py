@@ -0,0 +1,35 @@
+"""Step duration summaries, live and read back from a run's telemetry file"""
+
+import pytest
+
+import telemetry
+from telemetry import summarize_durations, summarize_spans, load_spans, latest_run_file
+
+def test_nearest_rank_percentiles():
+    summary = summarize_durations({'step': [float(n) for n in range(20, 0, -1)], 'once': [0.25]})
+    assert summary['step'] == {'count': 20, 'p50_s': 10.0, 'p95_s': 19.0, 'max_s': 20.0, 'total_s': 210.0}
+    assert summary['once'] == {'count': 1, 'p50_s': 0.25, 'p95_s': 0.25, 'max_s': 0.25, 'total_s': 0.25}
+
+@pytest.fixture
+def run_state(monkeypatch):
+    """Keep start_run from leaking its file and counters into other tests"""
+    for key in ('run_id', 'path', 'durations', 'outcomes'):
+        monkeypatch.setitem(telemetry._run, key, telemetry._run[key])
+
+def test_report_from_file_matches_the_live_summary(run_state, tmp_path):
+    path = telemetry.start_run(tmp_path)
+    for n in range(4):
+        with telemetry.span('extract.researcher', researcher_index=n) as record:
+            if n == 2:
+                record['outcome'] = 'failed'
+    with pytest.raises(RuntimeError):
+        with telemetry.span('login.full'):
+            raise RuntimeError('no form')
+    live = telemetry.end_run()
+
+    assert latest_run_file(tmp_path) == path
+    from_file = summarize_spans(load_spans(path))
+    assert from_file.keys() == live.keys() == {'extract.researcher', 'login.full'}
+    assert from_file['extract.researcher']['outcomes'] == live['extract.researcher']['outcomes'] == {'ok': 3, 'failed': 1}
+    assert from_file['login.full']['outcomes'] == {'error': 1}
+    assert from_file['extract.researcher']['count'] == 4
@@ -0,0 +1,101 @@
+"""Condition-based waits for SciVal automation"""
+
+import asyncio
+import json
+import nodriver as uc
+from config import WAIT_TIMEOUT, WAIT_POLL_INTERVAL, NETWORK_IDLE_TIME
+
+async def wait_for_js(tab, predicate, timeout=WAIT_TIMEOUT, poll_interval=WAIT_POLL_INTERVAL, description=None):
+    """Poll a JavaScript expression until it is truthy - returns False once the deadline passes"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    expression = f"""
+        (function() {{
+            try {{
+                return !!({predicate});
+            }} catch (error) {{
+                return false;
+            }}
+        }})()
+    """
+
+    while True:
+        try:
+            if await tab.evaluate(expression) is True:
+                return True
+        except Exception:
+            # Page may be mid-navigation, keep polling until the deadline
+            pass
+
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            print(f"⚠ Timed out after {timeout}s waiting for {description or predicate.strip()}")
+            return False
+
+        await asyncio.sleep(min(poll_interval, remaining))
+
+async def wait_for_selector(tab, selector, timeout=WAIT_TIMEOUT, poll_interval=WAIT_POLL_INTERVAL, visible=False):
+    """Wait until a CSS selector matches an element (optionally a visible one)"""
+    predicate = f"document.querySelector({json.dumps(selector)})"
+    if visible:
+        predicate = f"(el => el && el.getClientRects().length > 0)({predicate})"
+    return await wait_for_js(tab, predicate, timeout, poll_interval, description=f"selector {selector}")
+
+async def wait_for_xpath(tab, xpath, timeout=WAIT_TIMEOUT, poll_interval=WAIT_POLL_INTERVAL):
+    """Wait until an XPath expression matches a node"""
+    predicate = (
+        f"document.evaluate({json.dumps(xpath)}, document, null, "
+        "XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue"
+    )
+    return await wait_for_js(tab, predicate, timeout, poll_interval, description=f"xpath {xpath}")
+
+async def wait_for_network_idle(tab, idle_time=NETWORK_IDLE_TIME, timeout=WAIT_TIMEOUT, poll_interval=WAIT_POLL_INTERVAL):
+    """Wait until the document is loaded and no request has been in flight for idle_time seconds"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    in_flight = set()
+    last_change = [loop.time()]
+
+    # Counted from CDP Network events - the resource timing buffer stops growing at 250 entries on busy pages
+    def on_request(event, connection=None):
+        if event.type_ != uc.cdp.network.ResourceType.EVENT_SOURCE:  # server-sent event streams never finish
+            in_flight.add(event.request_id)
+        last_change[0] = loop.time()
+
+    def on_done(event, connection=None):
+        # Requests already running when the wait started finish unseen here, but still count as activity
+        in_flight.discard(event.request_id)
+        last_change[0] = loop.time()
+
+    handlers = [
+        (uc.cdp.network.RequestWillBeSent, on_request),
+        (uc.cdp.network.LoadingFinished, on_done),
+        (uc.cdp.network.LoadingFailed, on_done),
+    ]
+    for event_type, handler in handlers:
+        tab.add_handler(event_type, handler)
+
+    try:
+        await tab.send(uc.cdp.network.enable())
+        while True:
+            try:
+                ready_state = await tab.evaluate("document.readyState")
+            except Exception:
+                ready_state = None
+
+            now = loop.time()
+            if ready_state == 'complete' and not in_flight and now - last_change[0] >= idle_time:
+                return True
+
+            remaining = deadline - now
+            if remaining <= 0:
+                print(f"⚠ Timed out after {timeout}s waiting for network idle ({len(in_flight)} requests in flight)")
+                return False
+
+            await asyncio.sleep(min(poll_interval, remaining))
+    except Exception as e:
+        print(f"⚠ Could not watch network activity: {e}")
+        return False
+    finally:
+        for event_type, handler in handlers:
+            tab.remove_handler(event_type, handler)